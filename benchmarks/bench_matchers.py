@@ -0,0 +1,110 @@
+"""Compares descriptor matchers by time and alignment quality.
+
+Run it from the root of the repository::
+
+    python -m benchmarks.bench_matchers
+
+Real photos from ``tests/data/user_licenses`` have no ground truth, so the corner error
+is measured against the homography found by the brute force matcher.
+Synthetic photos are the template warped by a known homography.
+"""
+
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import cv2
+import numpy as np
+
+from document_recognition.photo_pre_processors.synchronous.homography_cv2_ import (
+    CV2HomographyPhotoPreProcessorByTemplate,
+    read_image_from_pathlike,
+)
+from document_recognition.photo_pre_processors.synchronous.matchers_cv2_ import (
+    BaseDescriptorMatcher,
+    BruteForceMatcher,
+    FlannLshMatcher,
+    KnnRatioMatcher,
+)
+from document_recognition.template import Template
+
+DATA_DIR = Path(__file__).parent.parent / "tests" / "data"
+REPEAT = 3
+SYNTHETIC_COUNT = 3
+
+MATCHERS: Dict[str, BaseDescriptorMatcher] = {
+    "brute force": BruteForceMatcher(),
+    "flann lsh": FlannLshMatcher(),
+    "knn ratio": KnnRatioMatcher(),
+}
+
+
+def corners_error(template: np.ndarray, m: np.ndarray, reference: np.ndarray) -> float:
+    """Mean distance between the template corners mapped back to the photo by both homographies."""
+    height, width = template.shape[:2]
+    corners = np.float32([[0, 0], [width, 0], [width, height], [0, height]])
+    corners = corners.reshape(-1, 1, 2)
+    found = cv2.perspectiveTransform(corners, np.linalg.inv(m))
+    expected = cv2.perspectiveTransform(corners, np.linalg.inv(reference))
+    return float(np.linalg.norm(found - expected, axis=2).mean())
+
+
+def synthetic_photos(template: np.ndarray) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """Returns template warped by random perspective transforms and the inverse transforms."""
+    rng = np.random.default_rng(0)
+    height, width = template.shape[:2]
+    corners = np.float32([[0, 0], [width, 0], [width, height], [0, height]])
+    photos = []
+    for _ in range(SYNTHETIC_COUNT):
+        shifted = corners * 1.5 + rng.uniform(-40, 40, size=corners.shape) + 100
+        m = cv2.getPerspectiveTransform(corners, shifted.astype(np.float32))
+        photo = cv2.warpPerspective(
+            template, m, (int(width * 1.5) + 200, int(height * 1.5) + 200)
+        )
+        photos.append((photo, np.linalg.inv(m)))
+    return photos
+
+
+def main() -> None:
+    template = Template.from_xml(DATA_DIR / "template.xml")
+    template.path = DATA_DIR / "template.png"
+    template_image = read_image_from_pathlike(template.path)
+
+    photos = [
+        (path.name, read_image_from_pathlike(path), None)
+        for path in sorted((DATA_DIR / "user_licenses").glob("*"))
+    ]
+    photos += [
+        (f"synthetic {i}", photo, m)
+        for i, (photo, m) in enumerate(synthetic_photos(template_image))
+    ]
+
+    pre_processors = {
+        name: CV2HomographyPhotoPreProcessorByTemplate(
+            template=template, matcher=matcher
+        )
+        for name, matcher in MATCHERS.items()
+    }
+
+    print(
+        f"{'photo':<14}{'matcher':<14}{'time, ms':>10}{'inliers':>10}{'corner error, px':>18}"
+    )
+    for photo_name, photo, truth in photos:
+        points, des = pre_processors["brute force"]._detect(photo)
+        reference = truth
+        for name, pre_processor in pre_processors.items():
+            start = time.perf_counter()
+            for _ in range(REPEAT):
+                report = pre_processor._find_homography(points, des)
+            elapsed = (time.perf_counter() - start) / REPEAT * 1000
+            if reference is None:
+                reference = report.homography
+            error = corners_error(template_image, report.homography, reference)
+            print(
+                f"{photo_name:<14}{name:<14}{elapsed:>10.1f}"
+                f"{f'{report.inliers}/{report.matches}':>10}{error:>18.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Compares recognition of many stored responses one by one and by ``recognize_batch``.
+
+Run it from the root of the repository::
+
+    python -m benchmarks.bench_recognize_batch
+"""
+
+import random
+import timeit
+from typing import List
+
+import numpy as np
+
+from document_recognition.backends import ColumnarApiResponse
+from document_recognition.recognizers.synchronous.driver_license_recognizer import (
+    DriverLicenseRecognizerByTemplate,
+)
+from document_recognition.template import Coordinates, Data, Size, Template
+
+WIDTH, HEIGHT = 617, 366
+FIELDS = ("name", "patronymic", "birthday", "issue_date", "code", "abode")
+TYPES = {"birthday": "datetime", "issue_date": "datetime"}
+RESPONSE_COUNTS = (100, 1000, 10000)
+WORDS_PER_RESPONSE = 80
+
+
+def make_template(rng: random.Random) -> Template:
+    objects = []
+    for name in FIELDS:
+        x, y = rng.uniform(0, WIDTH - 200), rng.uniform(0, HEIGHT - 30)
+        objects.append(
+            Data(
+                name=name,
+                type=TYPES.get(name, "str"),
+                coordinates=Coordinates(x, y, x + 200, y + 30),
+            )
+        )
+    return Template(path="", size=Size(WIDTH, HEIGHT, 3), objects=objects)
+
+
+def make_responses(count: int, rng: random.Random) -> List[ColumnarApiResponse]:
+    responses = []
+    for _ in range(count):
+        corners = np.array(
+            [
+                (rng.uniform(0, WIDTH - 40), rng.uniform(0, HEIGHT - 15))
+                for _ in range(WORDS_PER_RESPONSE)
+            ]
+        )
+        vertices = np.stack(
+            [corners, corners + (40, 0), corners + (40, 15), corners + (0, 15)], axis=1
+        )
+        responses.append(
+            ColumnarApiResponse(
+                texts=[f"word{i}" for i in range(WORDS_PER_RESPONSE)],
+                vertices=vertices,
+            )
+        )
+    return responses
+
+
+def main() -> None:
+    rng = random.Random(0)
+    recognizer = DriverLicenseRecognizerByTemplate(make_template(rng))
+    print(f"{'responses':>10}{'loop, ms':>12}{'batch, ms':>12}{'speedup':>10}")
+    for count in RESPONSE_COUNTS:
+        responses = make_responses(count, rng)
+        assert recognizer.recognize_batch(responses) == [
+            recognizer(response) for response in responses
+        ]
+
+        number = max(1, 2000 // count)
+        loop_time = timeit.timeit(
+            lambda: [recognizer(response) for response in responses], number=number
+        )
+        batch_time = timeit.timeit(
+            lambda: recognizer.recognize_batch(responses), number=number
+        )
+        print(
+            f"{count:>10}{loop_time / number * 1000:>12.1f}"
+            f"{batch_time / number * 1000:>12.1f}{loop_time / batch_time:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
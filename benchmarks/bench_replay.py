@@ -0,0 +1,86 @@
+"""Replays a corpus of recorded responses through the recognition pipeline.
+
+Run it from the root of the repository::
+
+    python -m benchmarks.bench_replay
+"""
+
+import random
+import tempfile
+import time
+from io import BytesIO
+from pathlib import Path
+
+from document_recognition.backends import ApiResponse, BaseSyncBackend, PathLike
+from document_recognition.backends.base import TextAnnotations, Vertices
+from document_recognition.backends.corpus import CorpusReader, CorpusWriter
+from document_recognition.backends.synchronous.record_replay_backend import (
+    RecordingBackend,
+    ReplayBackend,
+)
+from document_recognition.recognizers.synchronous.driver_license_recognizer import (
+    DriverLicenseRecognizerByTemplate,
+)
+from document_recognition.sync_client import SyncDocumentRecognition
+from document_recognition.template import Template
+
+TEMPLATE_XML = Path(__file__).parent.parent / "tests" / "data" / "template.xml"
+DOCUMENTS = 20000
+WORDS_PER_DOCUMENT = 60
+
+
+class SyntheticBackend(BaseSyncBackend):
+    """Stands for the real backend while the corpus is recorded."""
+
+    def __init__(self, rng: random.Random) -> None:
+        self.rng = rng
+
+    def recognize_document(self, image_path: PathLike) -> ApiResponse:
+        annotations = []
+        for i in range(WORDS_PER_DOCUMENT):
+            x, y = self.rng.randint(0, 600), self.rng.randint(0, 350)
+            annotations.append(
+                TextAnnotations(
+                    text=f"word{i}",
+                    vertices=[
+                        Vertices(x, y),
+                        Vertices(x + 40, y),
+                        Vertices(x + 40, y + 15),
+                        Vertices(x, y + 15),
+                    ],
+                )
+            )
+        return ApiResponse(text_annotations=annotations, text="")
+
+    def recognize_document_from_url(self, url: str) -> ApiResponse:
+        raise NotImplementedError
+
+
+def photo(i: int) -> BytesIO:
+    return BytesIO(f"photo {i}".encode())
+
+
+def main() -> None:
+    recognizer = DriverLicenseRecognizerByTemplate(Template.from_xml(TEMPLATE_XML))
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "responses.corpus"
+        with CorpusWriter(path) as corpus:
+            backend = RecordingBackend(SyntheticBackend(random.Random(0)), corpus)
+            for i in range(DOCUMENTS):
+                backend.recognize_document(photo(i))
+
+        start = time.perf_counter()
+        with CorpusReader(path) as corpus:
+            opened = time.perf_counter()
+            client = SyncDocumentRecognition(backend=ReplayBackend(corpus))
+            for i in range(DOCUMENTS):
+                client.recognize_document(photo(i), recognizer=recognizer)
+        end = time.perf_counter()
+
+        print(f"corpus: {DOCUMENTS} responses, {path.stat().st_size / 2**20:.1f} MiB")
+        print(f"index built in {(opened - start) * 1000:.1f} ms")
+        print(f"replayed {DOCUMENTS / (end - opened):.0f} documents/s")
+
+
+if __name__ == "__main__":
+    main()
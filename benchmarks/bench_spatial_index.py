@@ -0,0 +1,69 @@
+"""Compares assignment of words to template fields by scanning and by the grid index.
+
+Run it from the root of the repository::
+
+    python -m benchmarks.bench_spatial_index
+"""
+
+import random
+import timeit
+from typing import List, Tuple
+
+from document_recognition.recognizers.spatial_index import TemplateGridIndex
+from document_recognition.template import Coordinates, Data
+
+WIDTH, HEIGHT = 2000, 1400
+FIELD_COUNTS = (7, 50, 200, 1000)
+WORD_COUNTS = (100, 1000, 10000)
+
+
+def make_fields(count: int, rng: random.Random) -> List[Data]:
+    fields = []
+    for i in range(count):
+        x, y = rng.uniform(0, WIDTH - 200), rng.uniform(0, HEIGHT - 40)
+        coordinates = Coordinates(
+            x, y, x + rng.uniform(20, 200), y + rng.uniform(10, 40)
+        )
+        fields.append(Data(name=f"field_{i}", type="str", coordinates=coordinates))
+    return fields
+
+
+def scan(
+    fields: List[Data], text_infos: List[Tuple[str, float, float]]
+) -> List[List[str]]:
+    """The assignment used by the recognizer before the index."""
+    return [
+        [
+            text
+            for text, x_center, y_center in text_infos
+            if field.coordinates.x_min <= x_center <= field.coordinates.x_max
+            if field.coordinates.y_min <= y_center <= field.coordinates.y_max
+        ]
+        for field in fields
+    ]
+
+
+def main() -> None:
+    rng = random.Random(0)
+    print(f"{'fields':>8}{'words':>8}{'scan, ms':>12}{'index, ms':>12}{'speedup':>10}")
+    for field_count in FIELD_COUNTS:
+        fields = make_fields(field_count, rng)
+        index = TemplateGridIndex(fields)
+        for word_count in WORD_COUNTS:
+            text_infos = [
+                (str(i), rng.uniform(0, WIDTH), rng.uniform(0, HEIGHT))
+                for i in range(word_count)
+            ]
+            assert index.assign(text_infos) == scan(fields, text_infos)
+
+            number = max(1, 20000 // (field_count * word_count // 100 + 1))
+            scan_time = timeit.timeit(lambda: scan(fields, text_infos), number=number)
+            index_time = timeit.timeit(lambda: index.assign(text_infos), number=number)
+            print(
+                f"{field_count:>8}{word_count:>8}{scan_time / number * 1000:>12.3f}"
+                f"{index_time / number * 1000:>12.3f}{scan_time / index_time:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,11 @@
 import inspect
+from asyncio import get_running_loop
+from concurrent.futures import Executor
 from typing import Union, Optional, Callable, Any
 
 from document_recognition.backends import BaseAsyncBackend, PathLike, ApiResponse
+from document_recognition.backends.cache import image_key
+from document_recognition.fetch import ImageFetcher, default_fetcher
 from document_recognition.photo_pre_processors.base import (
     SyncPreProcessorType,
     AsyncPreProcessorType,
@@ -11,16 +15,38 @@ from document_recognition.recognizers.base import (
     AsyncRecognizerType,
     T,
 )
+from document_recognition.utils import SingleFlight
 
 
 def _is_async(f: Callable[..., Any]) -> bool:
     if inspect.isawaitable(f) or inspect.iscoroutinefunction(f):
         return True
+    # instances with async __call__, e.g. async pre processors and recognizers
+    return inspect.iscoroutinefunction(getattr(f, "__call__", None))
 
 
 class AsyncDocumentRecognition:
-    def __init__(self, backend: BaseAsyncBackend) -> None:
+    def __init__(
+        self,
+        backend: BaseAsyncBackend,
+        pre_processor_executor: Optional[Executor] = None,
+        *,
+        deduplicate: bool = False,
+        fetcher: Optional[ImageFetcher] = None,
+    ) -> None:
+        """
+        :param backend: async backend
+        :param pre_processor_executor: executor to run sync pre processors in,
+            so they don't block the event loop. If None, default executor will be used
+        :param deduplicate: concurrent recognitions of the same photo with the same
+            recognizer and pre processor run once, and all callers get the same document
+        :param fetcher: downloads photos of urls which are pre processed. If None, a shared one is used
+        """
         self.backend = backend
+        self.pre_processor_executor = pre_processor_executor
+        self.deduplicate = deduplicate
+        self.fetcher = fetcher
+        self._flights = SingleFlight()
 
     async def recognize_document(
         self,
@@ -29,13 +55,67 @@ class AsyncDocumentRecognition:
         recognizer: Union[SyncRecognizerType[T], AsyncRecognizerType[T]],
         pre_processor_of_photo: Optional[
             Union[SyncPreProcessorType, AsyncPreProcessorType]
-        ] = None
+        ] = None,
+    ) -> T:
+        if not self.deduplicate:
+            return await self._recognize_document(
+                image_path, recognizer, pre_processor_of_photo
+            )
+
+        key, image_path = await get_running_loop().run_in_executor(
+            self.pre_processor_executor, image_key, image_path
+        )
+        # the objects are alive while their recognition is in flight, so their ids are unique
+        return await self._flights.do(
+            (key, id(recognizer), id(pre_processor_of_photo)),
+            lambda: self._recognize_document(
+                image_path, recognizer, pre_processor_of_photo
+            ),
+        )
+
+    async def recognize_document_from_url(
+        self,
+        url: str,
+        *,
+        recognizer: Union[SyncRecognizerType[T], AsyncRecognizerType[T]],
+        pre_processor_of_photo: Optional[
+            Union[SyncPreProcessorType, AsyncPreProcessorType]
+        ] = None,
+    ) -> T:
+        """Recognizes the photo of the url.
+
+        If the photo is pre processed, it's downloaded in the default executor,
+        otherwise the url is passed to the backend, which may let the API fetch it.
+        """
+        if pre_processor_of_photo:
+            fetcher = self.fetcher or default_fetcher()
+            image = await get_running_loop().run_in_executor(None, fetcher.fetch, url)
+            return await self.recognize_document(
+                image,
+                recognizer=recognizer,
+                pre_processor_of_photo=pre_processor_of_photo,
+            )
+
+        api_response = await self.backend.recognize_document_from_url(url)
+        if _is_async(recognizer):
+            return await recognizer(api_response)
+        return recognizer(api_response)
+
+    async def _recognize_document(
+        self,
+        image_path: PathLike,
+        recognizer: Union[SyncRecognizerType[T], AsyncRecognizerType[T]],
+        pre_processor_of_photo: Optional[
+            Union[SyncPreProcessorType, AsyncPreProcessorType]
+        ],
     ) -> T:
         if pre_processor_of_photo:
             if _is_async(pre_processor_of_photo):
                 image_path = await pre_processor_of_photo(image_path)
             else:
-                image_path = pre_processor_of_photo(image_path)
+                image_path = await get_running_loop().run_in_executor(
+                    self.pre_processor_executor, pre_processor_of_photo, image_path
+                )
 
         api_response = await self.backend.recognize_document(image_path)
 
@@ -3,4 +3,5 @@ from document_recognition.backends.base import (
     BaseAsyncBackend,
     PathLike,
     ApiResponse,
+    ColumnarApiResponse,
 )
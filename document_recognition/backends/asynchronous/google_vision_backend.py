@@ -0,0 +1,137 @@
+from asyncio import get_running_loop
+from concurrent.futures import Executor
+from functools import partial
+from io import BytesIO
+from typing import Any, Callable, Dict, Optional
+
+from google.cloud import vision
+from google.cloud.vision_v1 import ImageAnnotatorAsyncClient
+
+from document_recognition.backends.base import BaseAsyncBackend, PathLike
+from document_recognition.backends.payload import PayloadPolicy
+from document_recognition.backends.synchronous.google_vision_backend import (
+    convert_response,
+    image_source,
+    is_url_fetch_error,
+    raise_for_image_error,
+)
+from document_recognition.fetch import ImageFetcher, default_fetcher, is_public_url
+from document_recognition.image import read_image_bytes
+from document_recognition.recognizers.base import ApiResponse
+
+
+class AsyncGoogleVisionBackend(BaseAsyncBackend):
+    """Google vision backend on the asyncio gRPC client.
+
+    Requests don't occupy threads while they wait for the API, so the number of
+    concurrent documents isn't limited by an executor. The executor is used only
+    to read files, encode images and convert large responses.
+    """
+
+    def __init__(
+        self,
+        image_annotator_client: ImageAnnotatorAsyncClient,
+        *,
+        columnar: bool = False,
+        lazy: bool = False,
+        timeout: Optional[float] = None,
+        executor: Optional[Executor] = None,
+        offload_threshold: int = 300,
+        fetcher: Optional[ImageFetcher] = None,
+        pass_through: Callable[[str], bool] = is_public_url,
+        payload_policy: Optional[PayloadPolicy] = None,
+    ) -> None:
+        """
+        :param image_annotator_client: async google vision client
+        :param columnar: return :class:`ColumnarApiResponse`
+        :param lazy: return :class:`LazyApiResponse`, which converts only the parts of
+            the response recognizers access, and gives the block hierarchy with confidences
+        :param timeout: deadline of a request in seconds. If None, default of the client is used
+        :param executor: executor for blocking work. If None, default executor will be used
+        :param offload_threshold: responses with at least this number of annotations
+            are converted in the executor, so they don't block the event loop
+        :param fetcher: downloads images of urls the API can't fetch. If None, a shared one is used
+        :param pass_through: returns whether the url is passed to the API to fetch it itself
+        :param payload_policy: downscales and re-encodes images in the executor before
+            they are sent. Vertices are mapped back to the original image
+        """
+        self.image_annotator_client = image_annotator_client
+        self.columnar = columnar
+        self.lazy = lazy
+        self.timeout = timeout
+        self.executor = executor
+        self.offload_threshold = offload_threshold
+        self.fetcher = fetcher
+        self.pass_through = pass_through
+        self.payload_policy = payload_policy
+
+    async def _read(self, image_path: PathLike) -> bytes:
+        if isinstance(image_path, BytesIO):
+            return image_path.read()
+        # files may block and decoded images are encoded on read
+        return await get_running_loop().run_in_executor(
+            self.executor, read_image_bytes, image_path
+        )
+
+    async def _annotate(
+        self, image: Dict[str, Any], timeout: Optional[float]
+    ) -> vision.AnnotateImageResponse:
+        request = {
+            "image": image,
+            "features": [{"type_": vision.Feature.Type.DOCUMENT_TEXT_DETECTION}],
+        }
+        if timeout is None:
+            timeout = self.timeout
+        kwargs = {} if timeout is None else {"timeout": timeout}
+        response = await self.image_annotator_client.batch_annotate_images(
+            request={"requests": [request]}, **kwargs
+        )
+        return response.responses[0]
+
+    async def _convert(self, response: vision.AnnotateImageResponse) -> ApiResponse:
+        raise_for_image_error(response)
+        convert = partial(convert_response, columnar=self.columnar, lazy=self.lazy)
+        # lazy responses aren't converted here, so they are never offloaded
+        if self.lazy or len(response.text_annotations) < self.offload_threshold:
+            return convert(response)
+        return await get_running_loop().run_in_executor(
+            self.executor, convert, response
+        )
+
+    async def recognize_document(
+        self, image_path: PathLike, *, timeout: Optional[float] = None
+    ) -> ApiResponse:
+        """
+        :param image_path: image to recognize
+        :param timeout: deadline of this request in seconds, overrides the backend one
+        """
+        if self.payload_policy is not None:
+            prepared = await get_running_loop().run_in_executor(
+                self.executor, self.payload_policy.prepare, image_path
+            )
+            response = await self._annotate({"content": prepared.content}, timeout)
+            return prepared.restore(await self._convert(response))
+
+        response = await self._annotate(
+            {"content": await self._read(image_path)}, timeout
+        )
+        return await self._convert(response)
+
+    async def recognize_document_from_url(
+        self, url: str, *, timeout: Optional[float] = None
+    ) -> ApiResponse:
+        """
+        :param url: url of the image to recognize
+        :param timeout: deadline of every request in seconds, overrides the backend one
+        """
+        if self.pass_through(url):
+            response = await self._annotate({"source": image_source(url)}, timeout)
+            if url.startswith("gs://") or not is_url_fetch_error(response):
+                return await self._convert(response)
+            # the API couldn't fetch the url, e.g. the host blocks it, so it's downloaded here
+
+        fetcher = self.fetcher or default_fetcher()
+        image = await get_running_loop().run_in_executor(
+            self.executor, fetcher.fetch, url
+        )
+        return await self.recognize_document(image, timeout=timeout)
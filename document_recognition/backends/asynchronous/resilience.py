@@ -0,0 +1,320 @@
+"""Load control for OCR backends.
+
+:class:`ResilientBackend` wraps a backend with an adaptive concurrency limit,
+a request rate limit, retries with jittered exponential backoff and hedged
+requests, so bursts don't turn into storms of quota and deadline errors.
+"""
+
+import asyncio
+import collections
+import random
+import time
+from concurrent.futures import Executor
+from io import BytesIO
+from pathlib import Path
+from typing import Awaitable, Callable, Deque, Optional, Tuple, Type, Union
+
+import numpy as np
+from google.api_core import exceptions
+
+from document_recognition.backends.asynchronous import AsyncBackendWrapper
+from document_recognition.backends.base import (
+    ApiResponse,
+    BaseAsyncBackend,
+    BaseSyncBackend,
+    PathLike,
+)
+from document_recognition.image import DecodedImage
+
+RETRYABLE_ERRORS: Tuple[Type[BaseException], ...] = (
+    exceptions.ResourceExhausted,
+    exceptions.DeadlineExceeded,
+    exceptions.ServiceUnavailable,
+    asyncio.TimeoutError,
+    TimeoutError,
+)
+
+
+class AIMDLimiter:
+    """Concurrency limit with additive increase and multiplicative decrease.
+
+    The limit grows by ``increase`` per ``limit`` successful requests, i.e. by
+    about ``increase`` per round trip, and is multiplied by ``backoff`` when the
+    service signals overload. Requests over the limit wait in FIFO order.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 8,
+        *,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        increase: float = 1.0,
+        backoff: float = 0.5,
+    ) -> None:
+        """
+        :param initial_limit: number of concurrent requests at the start
+        :param min_limit: the limit is never decreased below it
+        :param max_limit: the limit is never increased above it
+        :param increase: increase of the limit per round trip without overload
+        :param backoff: factor the limit is multiplied by on overload
+        """
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError(
+                "Limits must be 1 <= min_limit <= initial_limit <= max_limit"
+            )
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.backoff = backoff
+        self._in_flight = 0
+        self._waiters: Deque["asyncio.Future[None]"] = collections.deque()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def _wake(self) -> None:
+        # slots are handed to the waiters, so a request arriving meanwhile can't take them
+        while self._waiters and self._in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self._in_flight += 1
+                waiter.set_result(None)
+
+    async def acquire(self) -> None:
+        if not self._waiters and self._in_flight < int(self.limit):
+            self._in_flight += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # the slot was already handed to this request, so it's passed on
+                self._in_flight -= 1
+                self._wake()
+            else:
+                self._waiters.remove(waiter)
+            raise
+
+    def release(self, *, succeeded: bool = True, overloaded: bool = False) -> None:
+        """
+        :param succeeded: the request succeeded, which increases the limit
+        :param overloaded: the request failed because the service is overloaded,
+            which decreases the limit. Other outcomes don't change it
+        """
+        self._in_flight -= 1
+        if overloaded:
+            self.limit = max(self.min_limit, self.limit * self.backoff)
+        elif succeeded:
+            self.limit = min(self.max_limit, self.limit + self.increase / self.limit)
+        self._wake()
+
+
+class TokenBucket:
+    """Rate limit of ``rate`` requests per second with bursts of ``burst`` requests.
+
+    Tokens are reserved in the order of the calls, so waiting requests are served
+    in FIFO order and the bucket doesn't need a lock.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int = 1,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        :param rate: tokens added per second
+        :param burst: capacity of the bucket
+        :param clock: returns the current time in seconds
+        """
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self._tokens = float(burst)
+        self._updated = clock()
+
+    def reserve(self) -> float:
+        """Takes a token and returns the number of seconds until it's available."""
+        now = self.clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        self._tokens -= 1
+        return max(0.0, -self._tokens / self.rate)
+
+    async def take(self) -> None:
+        delay = self.reserve()
+        if delay <= 0:
+            return
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self._tokens += 1
+            raise
+
+
+class LatencyTracker:
+    """Latencies of the last ``window`` successful requests."""
+
+    def __init__(self, window: int = 256, min_samples: int = 20) -> None:
+        """
+        :param window: number of latencies kept
+        :param min_samples: quantiles aren't estimated from fewer latencies
+        """
+        self.min_samples = min_samples
+        self._latencies: Deque[float] = collections.deque(maxlen=window)
+
+    def add(self, latency: float) -> None:
+        self._latencies.append(latency)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Returns the quantile of the latencies, or None if there are too few of them."""
+        if len(self._latencies) < self.min_samples:
+            return None
+        return float(np.quantile(np.fromiter(self._latencies, float), q))
+
+
+class ResilientBackend(BaseAsyncBackend):
+    """Backend which protects the wrapped backend and the service from overload.
+
+    Every request waits for the concurrency limiter and the rate limiter. Requests
+    failing with retryable errors are retried after a jittered exponential backoff,
+    and these errors shrink the concurrency limit. If ``hedge_quantile`` is set,
+    a second request is sent when the first one is slower than that quantile of
+    recent latencies, and the first response wins.
+
+    Sync backends are wrapped with
+    :class:`~document_recognition.backends.asynchronous.AsyncBackendWrapper` first.
+    Their calls can't be interrupted, so timed out and losing hedged calls still
+    occupy an executor thread until they finish.
+    """
+
+    def __init__(
+        self,
+        backend: Union[BaseAsyncBackend, BaseSyncBackend],
+        *,
+        limiter: Optional[AIMDLimiter] = None,
+        rate_limiter: Optional[TokenBucket] = None,
+        max_attempts: int = 3,
+        base_delay: float = 0.1,
+        max_delay: float = 2.0,
+        timeout: Optional[float] = None,
+        hedge_quantile: Optional[float] = None,
+        latency_tracker: Optional[LatencyTracker] = None,
+        retryable: Tuple[Type[BaseException], ...] = RETRYABLE_ERRORS,
+        executor: Optional[Executor] = None,
+    ) -> None:
+        """
+        :param backend: backend to send requests to
+        :param limiter: limit of concurrent requests. If None, a new :class:`AIMDLimiter` is used
+        :param rate_limiter: limit of the request rate. If None, the rate isn't limited
+        :param max_attempts: number of attempts of a request, including the first one
+        :param base_delay: backoff before the first retry in seconds, doubled on every retry
+        :param max_delay: maximum backoff in seconds
+        :param timeout: timeout of every attempt in seconds. If None, attempts aren't timed out
+        :param hedge_quantile: quantile of latencies after which a hedged request is sent,
+            e.g. 0.95. If None, requests aren't hedged
+        :param latency_tracker: latencies hedging is based on. If None, a new one is used
+        :param retryable: errors which are retried and signal overload
+        :param executor: executor for reading files and calls of sync backends.
+            If None, default executor will be used
+        """
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        if isinstance(backend, BaseSyncBackend):
+            backend = AsyncBackendWrapper(backend, executor=executor)
+        self.backend = backend
+        self.limiter = limiter or AIMDLimiter()
+        self.rate_limiter = rate_limiter
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.timeout = timeout
+        self.hedge_quantile = hedge_quantile
+        self.latency_tracker = latency_tracker or LatencyTracker()
+        self.retryable = retryable
+        self.executor = executor
+
+    async def _send(self, call: Callable[[], Awaitable[ApiResponse]]) -> ApiResponse:
+        await self.limiter.acquire()
+        succeeded = overloaded = False
+        try:
+            if self.rate_limiter is not None:
+                await self.rate_limiter.take()
+            started = time.monotonic()
+            if self.timeout is None:
+                response = await call()
+            else:
+                response = await asyncio.wait_for(call(), self.timeout)
+            self.latency_tracker.add(time.monotonic() - started)
+            succeeded = True
+            return response
+        except self.retryable:
+            overloaded = True
+            raise
+        finally:
+            # cancelled hedges and other errors release the slot without adjusting the limit
+            self.limiter.release(succeeded=succeeded, overloaded=overloaded)
+
+    async def _attempt(self, call: Callable[[], Awaitable[ApiResponse]]) -> ApiResponse:
+        hedge_after = None
+        if self.hedge_quantile is not None:
+            hedge_after = self.latency_tracker.quantile(self.hedge_quantile)
+        if hedge_after is None:
+            return await self._send(call)
+
+        first = asyncio.ensure_future(self._send(call))
+        pending = {first}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=hedge_after)
+            if done:
+                return first.result()
+            pending.add(asyncio.ensure_future(self._send(call)))
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+            # both requests failed, the error of the first one is raised
+            return first.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def _backoff(self, attempt: int) -> float:
+        # full jitter spreads the retries of concurrent requests
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+    async def _call(self, call: Callable[[], Awaitable[ApiResponse]]) -> ApiResponse:
+        for attempt in range(self.max_attempts - 1):
+            try:
+                return await self._attempt(call)
+            except self.retryable:
+                await asyncio.sleep(self._backoff(attempt))
+        return await self._attempt(call)
+
+    async def _replayable(self, image_path: PathLike) -> Callable[[], PathLike]:
+        """Returns a factory of the image, which can be sent several times."""
+        if isinstance(image_path, (str, Path, DecodedImage)):
+            return lambda: image_path
+        if isinstance(image_path, BytesIO):
+            content = image_path.read()
+        else:
+            content = await asyncio.get_running_loop().run_in_executor(
+                self.executor, image_path.read
+            )
+        return lambda: BytesIO(content)
+
+    async def recognize_document(self, image_path: PathLike) -> ApiResponse:
+        image = await self._replayable(image_path)
+        return await self._call(lambda: self.backend.recognize_document(image()))
+
+    async def recognize_document_from_url(self, url: str) -> ApiResponse:
+        return await self._call(lambda: self.backend.recognize_document_from_url(url))
@@ -0,0 +1,40 @@
+from asyncio import get_running_loop
+from concurrent.futures import Executor
+from typing import Optional
+
+from document_recognition.backends.base import ApiResponse, BaseAsyncBackend, PathLike
+from document_recognition.backends.cache import image_key
+from document_recognition.utils import SingleFlight
+
+
+class SingleFlightBackend(BaseAsyncBackend):
+    """Backend which sends concurrent requests for the same image only once.
+
+    Images are keyed by the hash of their bytes, and a request for an image
+    already in flight awaits the response of the first one. Responses are shared
+    by the waiters, so they must not be modified.
+    """
+
+    def __init__(
+        self, backend: BaseAsyncBackend, executor: Optional[Executor] = None
+    ) -> None:
+        """
+        :param backend: backend to send requests to
+        :param executor: executor for reading and hashing images. If None, default executor will be used
+        """
+        self.backend = backend
+        self.executor = executor
+        self._flights = SingleFlight()
+
+    async def recognize_document(self, image_path: PathLike) -> ApiResponse:
+        key, image_path = await get_running_loop().run_in_executor(
+            self.executor, image_key, image_path
+        )
+        return await self._flights.do(
+            ("image", key), lambda: self.backend.recognize_document(image_path)
+        )
+
+    async def recognize_document_from_url(self, url: str) -> ApiResponse:
+        return await self._flights.do(
+            ("url", url), lambda: self.backend.recognize_document_from_url(url)
+        )
@@ -1,9 +1,16 @@
 import abc
+import asyncio
+import warnings
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Union, BinaryIO, List, Optional
+from typing import Union, BinaryIO, List, Optional, Callable, Dict, Any, Sequence
 
-PathLike = Union[str, Path, BinaryIO]
+import numpy as np
+
+from document_recognition.fetch import default_fetcher
+from document_recognition.image import DecodedImage
+
+PathLike = Union[str, Path, BinaryIO, DecodedImage]
 
 
 @dataclass
@@ -30,14 +37,174 @@ class ApiResponse:
     text: Optional[str] = None
 
 
+def vertices_centers(vertices: np.ndarray) -> np.ndarray:
+    """Returns centers of ``(n, k, 2)`` vertices padded with NaN as ``(n, 2)`` array.
+
+    A center is the middle between the smallest and the largest vertices compared
+    as ``(x, y)`` tuples, which is the center of the box for axis-aligned boxes.
+    """
+    if not vertices.size:
+        return np.full((len(vertices), 2), np.nan)
+    x = vertices[:, :, 0]
+    y = vertices[:, :, 1]
+    with warnings.catch_warnings():
+        # annotations without vertices have no center
+        warnings.simplefilter("ignore", RuntimeWarning)
+        x_min = np.nanmin(x, axis=1, keepdims=True)
+        x_max = np.nanmax(x, axis=1, keepdims=True)
+        y_at_x_min = np.nanmin(np.where(x == x_min, y, np.nan), axis=1)
+        y_at_x_max = np.nanmax(np.where(x == x_max, y, np.nan), axis=1)
+    return np.stack(
+        [(x_min[:, 0] + x_max[:, 0]) / 2, (y_at_x_min + y_at_x_max) / 2], axis=1
+    )
+
+
+class ColumnarApiResponse(ApiResponse):
+    """Compact response with texts in one list and vertices in one ``(n, k, 2)`` array.
+
+    It avoids building thousands of small objects for dense documents.
+    :attr:`text_annotations` is still available and is built on the first access.
+    """
+
+    def __init__(
+        self,
+        texts: List[str],
+        vertices: np.ndarray,
+        text: Optional[str] = None,
+        *,
+        confidence: Optional[np.ndarray] = None,
+        locale: Optional[List[Optional[str]]] = None,
+        load_optional_columns: Optional[Callable[[], Dict[str, Any]]] = None,
+    ) -> None:
+        """
+        :param texts: text of every annotation
+        :param vertices: vertices of every annotation as ``(n, k, 2)`` array
+        :param text: full text of the document
+        :param confidence: confidence of every annotation
+        :param locale: locale of every annotation
+        :param load_optional_columns: returns a dict with ``confidence`` and ``locale`` columns.
+            It's called only when one of them is accessed and wasn't passed
+        """
+        self.texts = texts
+        self.vertices = vertices
+        self.text = text
+        self._confidence = confidence
+        self._locale = locale
+        self._load_optional_columns = load_optional_columns
+        self._text_annotations: Optional[List[TextAnnotations]] = None
+
+    @classmethod
+    def from_text_annotations(
+        cls, text_annotations: Sequence[TextAnnotations], text: Optional[str] = None
+    ) -> "ColumnarApiResponse":
+        vertex_count = max((len(a.vertices) for a in text_annotations), default=0)
+        vertices = np.full((len(text_annotations), vertex_count, 2), np.nan)
+        for i, annotation in enumerate(text_annotations):
+            for j, vertex in enumerate(annotation.vertices):
+                vertices[i, j] = vertex.x, vertex.y
+        response = cls(
+            texts=[a.text for a in text_annotations],
+            vertices=vertices,
+            text=text,
+            confidence=np.array(
+                [
+                    np.nan if a.confidence is None else a.confidence
+                    for a in text_annotations
+                ]
+            ),
+            locale=[a.locale for a in text_annotations],
+        )
+        response._text_annotations = list(text_annotations)
+        return response
+
+    def _ensure_optional_columns(self) -> None:
+        if self._load_optional_columns is None:
+            return
+        columns = self._load_optional_columns()
+        self._load_optional_columns = None
+        if self._confidence is None:
+            self._confidence = columns.get("confidence")
+        if self._locale is None:
+            self._locale = columns.get("locale")
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # the loader usually holds the raw response, which can't be pickled
+        self._ensure_optional_columns()
+        return self.__dict__.copy()
+
+    @property
+    def confidence(self) -> Optional[np.ndarray]:
+        if self._confidence is None:
+            self._ensure_optional_columns()
+        return self._confidence
+
+    @property
+    def locale(self) -> Optional[List[Optional[str]]]:
+        if self._locale is None:
+            self._ensure_optional_columns()
+        return self._locale
+
+    @property
+    def text_annotations(self) -> List[TextAnnotations]:  # type: ignore[override]
+        if self._text_annotations is None:
+            confidence = self.confidence
+            locale = self.locale
+            self._text_annotations = [
+                TextAnnotations(
+                    text=text,
+                    vertices=[
+                        Vertices(x=x, y=y)
+                        for x, y in vertices.tolist()
+                        if x == x  # skip padding
+                    ],
+                    locale=None if locale is None else locale[i],
+                    confidence=(
+                        None
+                        if confidence is None or np.isnan(confidence[i])
+                        else float(confidence[i])
+                    ),
+                )
+                for i, (text, vertices) in enumerate(zip(self.texts, self.vertices))
+            ]
+        return self._text_annotations
+
+    def scaled(self, scale_x: float, scale_y: float) -> "ColumnarApiResponse":
+        """Returns the response with the vertices multiplied by the scales."""
+        response = ColumnarApiResponse(
+            texts=self.texts,
+            vertices=self.vertices * np.array([scale_x, scale_y]),
+            text=self.text,
+            confidence=self._confidence,
+            locale=self._locale,
+            load_optional_columns=self._load_optional_columns,
+        )
+        return response
+
+    def bounding_boxes(self) -> np.ndarray:
+        """Returns ``x_min, y_min, x_max, y_max`` of every annotation as ``(n, 4)`` array."""
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            return np.concatenate(
+                [np.nanmin(self.vertices, axis=1), np.nanmax(self.vertices, axis=1)],
+                axis=1,
+            )
+
+    def centers(self) -> np.ndarray:
+        """Returns centers of the annotations as ``(n, 2)`` array, as template recognizers see them."""
+        return vertices_centers(self.vertices)
+
+
 class BaseSyncBackend(abc.ABC):
     @abc.abstractmethod
     def recognize_document(self, image_path: PathLike) -> ApiResponse:
         raise NotImplementedError
 
-    @abc.abstractmethod
     def recognize_document_from_url(self, url: str) -> ApiResponse:
-        raise NotImplementedError
+        """Downloads the image and recognizes it.
+
+        Backends whose API can fetch urls itself should override it.
+        """
+        return self.recognize_document(default_fetcher().fetch(url))
 
 
 class BaseAsyncBackend(abc.ABC):
@@ -45,6 +212,12 @@ class BaseAsyncBackend(abc.ABC):
     async def recognize_document(self, image_path: PathLike) -> ApiResponse:
         raise NotImplementedError
 
-    @abc.abstractmethod
     async def recognize_document_from_url(self, url: str) -> ApiResponse:
-        raise NotImplementedError
+        """Downloads the image in the default executor and recognizes it.
+
+        Backends whose API can fetch urls itself should override it.
+        """
+        image = await asyncio.get_running_loop().run_in_executor(
+            None, default_fetcher().fetch, url
+        )
+        return await self.recognize_document(image)
@@ -0,0 +1,296 @@
+import dataclasses
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from asyncio import get_running_loop
+from collections import OrderedDict
+from concurrent.futures import Executor
+from io import BytesIO
+from pathlib import Path
+from typing import Callable, Optional, Tuple, Union
+
+from document_recognition.backends import serialization
+from document_recognition.backends.base import (
+    ApiResponse,
+    BaseAsyncBackend,
+    BaseSyncBackend,
+    PathLike,
+)
+from document_recognition.image import DecodedImage, read_image_bytes
+
+_SUFFIX = ".response"
+
+
+def content_key(content: Union[bytes, memoryview]) -> str:
+    """Returns the cache key of the image bytes."""
+    return hashlib.sha256(content).hexdigest()
+
+
+def image_key(image_path: PathLike) -> Tuple[str, PathLike]:
+    """Returns the cache key of the bytes sent for the image and the image to send.
+
+    Files are read once, so the returned image is their content, which can be
+    sent to the backend instead of reading the file again.
+    """
+    if isinstance(image_path, DecodedImage):
+        # the encoded bytes are cached by the image, so they are hashed without copying
+        return content_key(image_path.getbuffer()), image_path
+    content = read_image_bytes(image_path)
+    return content_key(content), BytesIO(content)
+
+
+@dataclasses.dataclass
+class CacheStats:
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.disk_hits
+
+    @property
+    def hit_ratio(self) -> float:
+        requests = self.hits + self.misses
+        return self.hits / requests if requests else 0.0
+
+
+class ResponseCache:
+    """Responses by the hash of the image, in a bounded LRU in memory in front of a directory.
+
+    Responses on disk are stored in a compact binary format, see
+    :mod:`document_recognition.backends.serialization`. Entries older than ``ttl``
+    aren't returned, and the least recently used files are removed when the directory
+    grows over ``max_disk_bytes``. Responses returned from memory are shared, so they
+    must not be modified.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[Union[str, Path]] = None,
+        *,
+        max_memory_items: int = 1024,
+        max_disk_bytes: Optional[int] = None,
+        ttl: Optional[float] = None,
+        compress: bool = True,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """
+        :param directory: directory of the disk tier. If None, responses are kept only in memory
+        :param max_memory_items: number of responses kept in memory
+        :param max_disk_bytes: size of the disk tier. If None, it isn't limited
+        :param ttl: seconds a response is valid. If None, it doesn't expire
+        :param compress: compress responses on disk
+        :param clock: current time in seconds, used for the ttl
+        """
+        self.directory = None if directory is None else Path(directory)
+        self.max_memory_items = max_memory_items
+        self.max_disk_bytes = max_disk_bytes
+        self.ttl = ttl
+        self.compress = compress
+        self.clock = clock
+        self.stats = CacheStats()
+        self._memory: "OrderedDict[str, Tuple[float, ApiResponse]]" = OrderedDict()
+        # sizes of the files on disk, from the least recently used
+        self._files: "OrderedDict[str, int]" = OrderedDict()
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._scan_directory()
+
+    def _scan_directory(self) -> None:
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(_SUFFIX):
+                stat = entry.stat()
+                entries.append(
+                    (stat.st_mtime, entry.name[: -len(_SUFFIX)], stat.st_size)
+                )
+        for _, key, size in sorted(entries):
+            self._files[key] = size
+            self._disk_bytes += size
+
+    def _path(self, key: str) -> Path:
+        assert self.directory is not None
+        return self.directory / (key + _SUFFIX)
+
+    def _is_expired(self, stored_at: float) -> bool:
+        return self.ttl is not None and self.clock() - stored_at > self.ttl
+
+    def _remember(self, key: str, stored_at: float, response: ApiResponse) -> None:
+        self._memory[key] = (stored_at, response)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    def get_from_memory(self, key: str) -> Optional[ApiResponse]:
+        """Returns the response if it's in memory, without touching the disk or the stats of misses."""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            stored_at, response = entry
+            if self._is_expired(stored_at):
+                del self._memory[key]
+                if self.directory is not None:
+                    self._remove_file(key)
+                self.stats.expirations += 1
+                return None
+            self._memory.move_to_end(key)
+            self.stats.memory_hits += 1
+            return response
+
+    def _read_file(self, key: str) -> Optional[Tuple[float, ApiResponse]]:
+        path = self._path(key)
+        try:
+            stored_at = path.stat().st_mtime
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        try:
+            return stored_at, serialization.loads(data)
+        except ValueError:
+            # a broken file is a miss, it's replaced by the next response
+            return None
+
+    def get(self, key: str) -> Optional[ApiResponse]:
+        response = self.get_from_memory(key)
+        if response is not None:
+            return response
+
+        entry = None if self.directory is None else self._read_file(key)
+        with self._lock:
+            if entry is not None and self._is_expired(entry[0]):
+                self._remove_file(key)
+                self.stats.expirations += 1
+                entry = None
+            if entry is None:
+                self.stats.misses += 1
+                return None
+            stored_at, response = entry
+            self.stats.disk_hits += 1
+            if key in self._files:
+                self._files.move_to_end(key)
+            self._remember(key, stored_at, response)
+        return response
+
+    def _remove_file(self, key: str) -> None:
+        size = self._files.pop(key, None)
+        if size is not None:
+            self._disk_bytes -= size
+        try:
+            os.unlink(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def _write_file(self, key: str, data: bytes) -> None:
+        assert self.directory is not None
+        # written to a temporary file first, so readers never see a half-written response
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(data)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def set(self, key: str, response: ApiResponse) -> None:
+        stored_at = self.clock()
+        data = None
+        if self.directory is not None:
+            data = serialization.dumps(response, compress=self.compress)
+            self._write_file(key, data)
+            os.utime(self._path(key), (stored_at, stored_at))
+
+        with self._lock:
+            self._remember(key, stored_at, response)
+            if data is None:
+                return
+            self._disk_bytes -= self._files.pop(key, 0)
+            self._files[key] = len(data)
+            self._disk_bytes += len(data)
+            if self.max_disk_bytes is not None:
+                while self._disk_bytes > self.max_disk_bytes and len(self._files) > 1:
+                    oldest = next(iter(self._files))
+                    self._remove_file(oldest)
+                    self._memory.pop(oldest, None)
+                    self.stats.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            for key in list(self._files):
+                self._remove_file(key)
+
+
+class CachedBackend(BaseSyncBackend):
+    """Backend which returns cached responses for images sent before.
+
+    Images are keyed by the hash of the bytes sent to the backend, so a re-uploaded
+    photo doesn't cost another request.
+    """
+
+    def __init__(self, backend: BaseSyncBackend, cache: ResponseCache) -> None:
+        """
+        :param backend: backend to call on a miss
+        :param cache: cache of the responses
+        """
+        self.backend = backend
+        self.cache = cache
+
+    def recognize_document(self, image_path: PathLike) -> ApiResponse:
+        key, image_path = image_key(image_path)
+        response = self.cache.get(key)
+        if response is None:
+            response = self.backend.recognize_document(image_path)
+            self.cache.set(key, response)
+        return response
+
+    def recognize_document_from_url(self, url: str) -> ApiResponse:
+        # the content behind the url isn't known, so it isn't cached
+        return self.backend.recognize_document_from_url(url)
+
+
+class AsyncCachedBackend(BaseAsyncBackend):
+    """Async version of :class:`CachedBackend`.
+
+    Memory hits are returned on the event loop; hashing and the disk tier run in the executor.
+    """
+
+    def __init__(
+        self,
+        backend: BaseAsyncBackend,
+        cache: ResponseCache,
+        executor: Optional[Executor] = None,
+    ) -> None:
+        """
+        :param backend: backend to call on a miss
+        :param cache: cache of the responses
+        :param executor: executor for hashing and disk access. If None, default executor will be used
+        """
+        self.backend = backend
+        self.cache = cache
+        self.executor = executor
+
+    async def recognize_document(self, image_path: PathLike) -> ApiResponse:
+        loop = get_running_loop()
+        key, image_path = await loop.run_in_executor(
+            self.executor, image_key, image_path
+        )
+        response = self.cache.get_from_memory(key)
+        if response is not None:
+            return response
+        response = await loop.run_in_executor(self.executor, self.cache.get, key)
+        if response is None:
+            response = await self.backend.recognize_document(image_path)
+            await loop.run_in_executor(self.executor, self.cache.set, key, response)
+        return response
+
+    async def recognize_document_from_url(self, url: str) -> ApiResponse:
+        return await self.backend.recognize_document_from_url(url)
@@ -0,0 +1,151 @@
+"""Append-only corpus of recorded responses.
+
+The file starts with a header, followed by records of the sha256 key,
+the size of the payload and the response serialized by
+:mod:`document_recognition.backends.serialization`. Records are only appended,
+so recording never rewrites the file, and a record cut off by a crash is ignored.
+"""
+
+import hashlib
+import mmap
+import struct
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple, Union
+
+from document_recognition.backends import serialization
+from document_recognition.backends.base import ApiResponse
+
+HEADER = b"DRCORPUS\x01"
+
+_RECORD = struct.Struct("<32sI")
+
+
+def url_key(url: str) -> str:
+    """Returns the key of the response of the url."""
+    return hashlib.sha256(b"url:" + url.encode()).hexdigest()
+
+
+def _records(buffer: Any) -> Iterator[Tuple[str, int, int]]:
+    """Yields key, start and length of the payload of every complete record."""
+    size = len(buffer)
+    offset = len(HEADER)
+    while offset + _RECORD.size <= size:
+        key, length = _RECORD.unpack_from(buffer, offset)
+        start = offset + _RECORD.size
+        if start + length > size:
+            return  # cut off by a crash while recording
+        yield key.hex(), start, length
+        offset = start + length
+
+
+def _complete_size(path: Path) -> int:
+    """Returns the size of the corpus without a record cut off at its end."""
+    with open(path, "rb") as file:
+        if file.read(len(HEADER)) != HEADER:
+            raise ValueError(f"{path} isn't a corpus file")
+        if file.seek(0, 2) == len(HEADER):
+            return len(HEADER)
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            size = len(HEADER)
+            for _, start, length in _records(buffer):
+                size = start + length
+            return size
+
+
+class CorpusWriter:
+    """Appends responses to a corpus file, creating it if needed.
+
+    A record cut off at the end of an existing file by a crash is truncated,
+    so the new records are appended right after the last complete one.
+    """
+
+    def __init__(self, path: Union[str, Path], *, compress: bool = True) -> None:
+        """
+        :param path: path of the corpus file
+        :param compress: compress responses
+        """
+        self.path = Path(path)
+        self.compress = compress
+        self._lock = threading.Lock()
+        self._file = open(self.path, "ab")
+        if self._file.tell() == 0:
+            self._file.write(HEADER)
+            self._file.flush()
+        else:
+            size = _complete_size(self.path)
+            if size < self._file.tell():
+                self._file.truncate(size)
+
+    def append(self, key: str, response: ApiResponse) -> None:
+        """Appends the response of the image with the key, which is a sha256 hex digest."""
+        payload = serialization.dumps(response, compress=self.compress)
+        record = _RECORD.pack(bytes.fromhex(key), len(payload)) + payload
+        with self._lock:
+            self._file.write(record)
+            self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "CorpusWriter":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+
+class CorpusReader:
+    """Memory-mapped corpus with an index of the records by their keys.
+
+    Only the record headers are read to build the index, and responses are loaded
+    from the mapping when they are requested. If a key is recorded several times,
+    the last record is used.
+    """
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        """
+        :param path: path of the corpus file
+        """
+        self.path = Path(path)
+        with open(self.path, "rb") as file:
+            if file.read(len(HEADER)) != HEADER:
+                raise ValueError(f"{self.path} isn't a corpus file")
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._index: Dict[str, Tuple[int, int]] = {}
+        self._build_index()
+
+    def _build_index(self) -> None:
+        for key, start, length in _records(self._mmap):
+            self._index[key] = (start, length)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._index
+
+    def keys(self) -> Iterator[str]:
+        return iter(self._index)
+
+    def get(self, key: str) -> Optional[ApiResponse]:
+        entry = self._index.get(key)
+        if entry is None:
+            return None
+        start, length = entry
+        return serialization.loads(self._mmap[start : start + length])
+
+    def __iter__(self) -> Iterator[Tuple[str, ApiResponse]]:
+        for key in self._index:
+            response = self.get(key)
+            assert response is not None
+            yield key, response
+
+    def close(self) -> None:
+        self._mmap.close()
+
+    def __enter__(self) -> "CorpusReader":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
@@ -0,0 +1,224 @@
+"""Lazy view of google vision responses.
+
+Converting every annotation of a dense document costs more than parsing it, while
+many recognizers need only a part of the response, e.g. regex recognizers read
+only the full text. :class:`LazyApiResponse` keeps the protobuf response and
+converts only the parts which are accessed.
+"""
+
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from google.cloud import vision
+
+from document_recognition.backends.base import (
+    ColumnarApiResponse,
+    TextAnnotations,
+    Vertices,
+)
+
+_BreakType = vision.TextAnnotation.DetectedBreak.BreakType
+
+_BREAKS = {
+    _BreakType.SPACE: " ",
+    _BreakType.SURE_SPACE: " ",
+    _BreakType.EOL_SURE_SPACE: "\n",
+    _BreakType.HYPHEN: "-\n",
+    _BreakType.LINE_BREAK: "\n",
+}
+
+
+def polygons_to_array(polygons: Sequence[List[Tuple[float, float]]]) -> np.ndarray:
+    """Stacks polygons into ``(n, k, 2)`` array, padding shorter ones with NaN."""
+    vertex_count = max((len(polygon) for polygon in polygons), default=0)
+    if all(len(polygon) == vertex_count for polygon in polygons):
+        return np.array(polygons, dtype=np.float64).reshape(
+            len(polygons), vertex_count, 2
+        )
+    vertices = np.full((len(polygons), vertex_count, 2), np.nan)
+    for i, polygon in enumerate(polygons):
+        if polygon:
+            vertices[i, : len(polygon)] = polygon
+    return vertices
+
+
+def optional_columns(
+    text_annotations: Sequence[vision.EntityAnnotation],
+) -> Dict[str, Any]:
+    return {
+        "confidence": np.array([a.confidence for a in text_annotations], np.float64),
+        "locale": [a.locale or None for a in text_annotations],
+    }
+
+
+def _columnar_api_response(
+    texts: List[str],
+    vertices: np.ndarray,
+    text: Optional[str],
+    confidence: Optional[np.ndarray],
+    locale: Optional[List[Optional[str]]],
+) -> ColumnarApiResponse:
+    return ColumnarApiResponse(
+        texts=texts, vertices=vertices, text=text, confidence=confidence, locale=locale
+    )
+
+
+@dataclass
+class Word:
+    text: str
+    vertices: List[Vertices]
+    confidence: float
+
+
+@dataclass
+class Paragraph:
+    text: str
+    vertices: List[Vertices]
+    confidence: float
+    words: List[Word]
+
+
+@dataclass
+class Block:
+    text: str
+    vertices: List[Vertices]
+    confidence: float
+    paragraphs: List[Paragraph]
+    page: int = 0
+
+
+class LazyApiResponse(ColumnarApiResponse):
+    """Columnar response which converts the protobuf response on access.
+
+    :attr:`text` reads only the full text, :attr:`texts` and :attr:`vertices` convert
+    only the text annotations, and :attr:`blocks` converts the page hierarchy with
+    confidences of blocks, paragraphs and words. Every part is converted once.
+    The response is pickled as a plain :class:`ColumnarApiResponse`.
+    """
+
+    def __init__(
+        self,
+        response: vision.AnnotateImageResponse,
+        *,
+        scale_x: float = 1.0,
+        scale_y: float = 1.0,
+    ) -> None:
+        """
+        :param response: response of the API
+        :param scale_x: factor the x coordinates of the response are multiplied by
+        :param scale_y: factor the y coordinates of the response are multiplied by
+        """
+        self._response = response
+        self._scale_x = scale_x
+        self._scale_y = scale_y
+        self._confidence = None
+        self._locale = None
+        self._load_optional_columns = lambda: optional_columns(
+            self._response.text_annotations
+        )
+        self._text_annotations: Optional[List[TextAnnotations]] = None
+
+    @cached_property
+    def text(self) -> Optional[str]:  # type: ignore[override]
+        return self._response.full_text_annotation.text
+
+    @cached_property
+    def texts(self) -> List[str]:  # type: ignore[override]
+        return [a.description for a in self._response.text_annotations]
+
+    @cached_property
+    def vertices(self) -> np.ndarray:  # type: ignore[override]
+        vertices = polygons_to_array(
+            [
+                [(vertex.x, vertex.y) for vertex in a.bounding_poly.vertices]
+                for a in self._response.text_annotations
+            ]
+        )
+        if self._scale_x != 1 or self._scale_y != 1:
+            vertices *= np.array([self._scale_x, self._scale_y])
+        return vertices
+
+    def _scale(self, bounding_poly: vision.BoundingPoly) -> List[Vertices]:
+        return [
+            Vertices(x=vertex.x * self._scale_x, y=vertex.y * self._scale_y)
+            for vertex in bounding_poly.vertices
+        ]
+
+    def _word(self, word: vision.Word) -> Tuple[Word, str]:
+        """Returns the word and the break after it."""
+        symbols = word.symbols
+        text = "".join(symbol.text for symbol in symbols)
+        separator = ""
+        if symbols:
+            separator = _BREAKS.get(symbols[-1].property.detected_break.type_, "")
+        converted = Word(
+            text=text,
+            vertices=self._scale(word.bounding_box),
+            confidence=word.confidence,
+        )
+        return converted, separator
+
+    def _paragraph(self, paragraph: vision.Paragraph) -> Paragraph:
+        words = []
+        parts = []
+        for word in paragraph.words:
+            converted, separator = self._word(word)
+            words.append(converted)
+            parts.append(converted.text + separator)
+        return Paragraph(
+            text="".join(parts).rstrip(),
+            vertices=self._scale(paragraph.bounding_box),
+            confidence=paragraph.confidence,
+            words=words,
+        )
+
+    @cached_property
+    def blocks(self) -> List[Block]:
+        """Blocks of all pages with their paragraphs and words."""
+        blocks = []
+        for page_number, page in enumerate(self._response.full_text_annotation.pages):
+            for block in page.blocks:
+                paragraphs = [self._paragraph(p) for p in block.paragraphs]
+                blocks.append(
+                    Block(
+                        text="\n".join(p.text for p in paragraphs),
+                        vertices=self._scale(block.bounding_box),
+                        confidence=block.confidence,
+                        paragraphs=paragraphs,
+                        page=page_number,
+                    )
+                )
+        return blocks
+
+    @property
+    def words(self) -> List[Word]:
+        """Words of all blocks in the reading order."""
+        return [
+            word
+            for block in self.blocks
+            for paragraph in block.paragraphs
+            for word in paragraph.words
+        ]
+
+    def scaled(self, scale_x: float, scale_y: float) -> "LazyApiResponse":
+        return LazyApiResponse(
+            self._response,
+            scale_x=self._scale_x * scale_x,
+            scale_y=self._scale_y * scale_y,
+        )
+
+    def to_columnar(self) -> ColumnarApiResponse:
+        """Returns the converted text annotations as a plain columnar response."""
+        return _columnar_api_response(*self.__reduce__()[1])
+
+    def __reduce__(self) -> Any:
+        # the protobuf response isn't kept, only what recognizers can read
+        return _columnar_api_response, (
+            self.texts,
+            self.vertices,
+            self.text,
+            self.confidence,
+            self.locale,
+        )
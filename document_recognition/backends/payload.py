@@ -0,0 +1,183 @@
+"""Budgeting of the images sent to OCR.
+
+Raw photos are much larger than OCR needs, so they're downscaled and re-encoded
+before the upload. Vertices of the response are mapped back to the pixels of the
+original image, so recognizers don't know the image was changed.
+"""
+
+import dataclasses
+import math
+from typing import Optional, Sequence
+
+import cv2
+import numpy as np
+
+from document_recognition.backends.base import (
+    ApiResponse,
+    ColumnarApiResponse,
+    PathLike,
+    Vertices,
+)
+from document_recognition.image import (
+    DecodedImage,
+    encode_image,
+    encode_params,
+    read_image_bytes,
+)
+
+# how many times the image is downscaled further if no codec fits the budget
+_MAX_SHRINKS = 8
+
+
+def scale_response(
+    response: ApiResponse, scale_x: float, scale_y: float
+) -> ApiResponse:
+    """Returns the response with the vertices multiplied by the scales."""
+    if scale_x == 1 and scale_y == 1:
+        return response
+    if isinstance(response, ColumnarApiResponse):
+        return response.scaled(scale_x, scale_y)
+    return ApiResponse(
+        text_annotations=[
+            dataclasses.replace(
+                annotation,
+                vertices=[
+                    Vertices(x=vertex.x * scale_x, y=vertex.y * scale_y)
+                    for vertex in annotation.vertices
+                ],
+            )
+            for annotation in response.text_annotations
+        ],
+        text=response.text,
+    )
+
+
+@dataclasses.dataclass(frozen=True)
+class PreparedImage:
+    """Image as it's sent, with the scales from its pixels to the original ones."""
+
+    content: bytes
+    scale_x: float = 1.0
+    scale_y: float = 1.0
+
+    def restore(self, response: ApiResponse) -> ApiResponse:
+        """Maps the vertices of the response of this image to the original image."""
+        return scale_response(response, self.scale_x, self.scale_y)
+
+
+class PayloadPolicy:
+    """Limits the size of the images sent to OCR.
+
+    Images larger than ``max_pixels`` are downscaled keeping the aspect ratio.
+    Then they are encoded with the first codec which fits into ``max_bytes``, at the
+    highest quality which fits, found by binary search. If no codec fits, the image
+    is downscaled further. Images which already fit are sent as they are,
+    so they don't lose quality to re-encoding.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_pixels: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        codecs: Sequence[str] = (".jpg",),
+        min_quality: int = 50,
+        max_quality: int = 95,
+        grayscale: bool = False,
+    ) -> None:
+        """
+        :param max_pixels: maximum width * height of the sent image. If None, it isn't limited
+        :param max_bytes: maximum size of the sent image. If None, it isn't limited
+        :param codecs: extensions of the formats to try in order, e.g. ``.jpg``, ``.webp``, ``.png``
+        :param min_quality: lowest quality of lossy codecs the search may choose
+        :param max_quality: highest quality of lossy codecs
+        :param grayscale: send the image in grayscale, which OCR doesn't need colors for
+        """
+        if not codecs:
+            raise ValueError("At least one codec is required")
+        if not 0 <= min_quality <= max_quality <= 100:
+            raise ValueError("Qualities must be 0 <= min_quality <= max_quality <= 100")
+        self.max_pixels = max_pixels
+        self.max_bytes = max_bytes
+        self.codecs = tuple(codecs)
+        self.min_quality = min_quality
+        self.max_quality = max_quality
+        self.grayscale = grayscale
+
+    def _fits(self, size: int) -> bool:
+        return self.max_bytes is None or size <= self.max_bytes
+
+    def _encode_lossy(self, pixels: np.ndarray, codec: str) -> Optional[bytes]:
+        """Returns the image at the highest quality which fits, or None."""
+        best = encode_image(pixels, codec, self.max_quality).tobytes()
+        if self._fits(len(best)):
+            return best
+        best = None
+        low, high = self.min_quality, self.max_quality - 1
+        while low <= high:
+            quality = (low + high) // 2
+            content = encode_image(pixels, codec, quality).tobytes()
+            if self._fits(len(content)):
+                best = content
+                low = quality + 1
+            else:
+                high = quality - 1
+        return best
+
+    def _encode(self, pixels: np.ndarray) -> Optional[bytes]:
+        for codec in self.codecs:
+            if encode_params(codec, self.max_quality):
+                content = self._encode_lossy(pixels, codec)
+            else:
+                content = encode_image(pixels, codec).tobytes()
+            if content is not None and self._fits(len(content)):
+                return content
+        return None
+
+    def prepare(self, image_path: PathLike) -> PreparedImage:
+        """Returns the image to send in place of the given one."""
+        if isinstance(image_path, DecodedImage):
+            pixels = image_path.pixels
+            original = None
+        else:
+            original = read_image_bytes(image_path)
+            if (
+                self.max_pixels is None
+                and not self.grayscale
+                and self._fits(len(original))
+            ):
+                return PreparedImage(original)
+            pixels = cv2.imdecode(np.frombuffer(original, np.uint8), cv2.IMREAD_COLOR)
+            if pixels is None:
+                raise ValueError("Failed to decode image")
+
+        height, width = pixels.shape[:2]
+        factor = 1.0
+        if self.max_pixels is not None and width * height > self.max_pixels:
+            factor = math.sqrt(self.max_pixels / (width * height))
+        elif not self.grayscale:
+            if original is None:
+                # decoded images are encoded with their own codec first
+                original = image_path.read()
+            if self._fits(len(original)):
+                return PreparedImage(original)
+
+        if self.grayscale and pixels.ndim == 3:
+            pixels = cv2.cvtColor(pixels, cv2.COLOR_BGR2GRAY)
+
+        for _ in range(_MAX_SHRINKS + 1):
+            resized = pixels
+            if factor < 1:
+                size = (max(1, int(width * factor)), max(1, int(height * factor)))
+                resized = cv2.resize(pixels, size, interpolation=cv2.INTER_AREA)
+            content = self._encode(resized)
+            if content is not None:
+                return PreparedImage(
+                    content,
+                    scale_x=width / resized.shape[1],
+                    scale_y=height / resized.shape[0],
+                )
+            factor *= 0.75
+        raise ValueError(
+            f"Failed to fit {width}x{height} image into {self.max_bytes} bytes"
+        )
@@ -0,0 +1,244 @@
+"""Compact binary format of :class:`ApiResponse`.
+
+The response is stored by columns: texts as one utf-8 blob with their lengths,
+the number of vertices of every annotation and the flat coordinates, which are
+stored as int32 when they are all integers, as they are in google vision responses.
+Optional fields are stored only if at least one annotation has them.
+The whole payload is compressed with zlib unless it's disabled.
+"""
+
+import struct
+import zlib
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from document_recognition.backends.base import (
+    ApiResponse,
+    ColumnarApiResponse,
+    TextAnnotations,
+    Vertices,
+)
+
+MAGIC = b"DRR"
+VERSION = 1
+
+_HEADER = struct.Struct("<3sBB")
+_COMPRESSED = 1
+
+_COLUMNAR = 1
+_HAS_TEXT = 2
+
+# optional columns in the order they are stored, by their bit
+_STRING_COLUMNS = ("locale", "mid")
+_FLOAT_COLUMNS = ("confidence", "score", "topicality")
+
+
+class _Writer:
+    def __init__(self) -> None:
+        self.parts: List[bytes] = []
+
+    def uint(self, value: int) -> None:
+        self.parts.append(struct.pack("<I", value))
+
+    def array(self, array: np.ndarray) -> None:
+        self.parts.append(np.ascontiguousarray(array).tobytes())
+
+    def strings(self, strings: Sequence[Optional[str]]) -> None:
+        encoded = [None if s is None else s.encode() for s in strings]
+        self.array(
+            np.array([-1 if s is None else len(s) for s in encoded], dtype="<i4")
+        )
+        self.parts.append(b"".join(s for s in encoded if s is not None))
+        self.uint(0)  # keeps the blob boundary checkable
+
+    def getvalue(self) -> bytes:
+        return b"".join(self.parts)
+
+
+class _Reader:
+    def __init__(self, data: bytes) -> None:
+        self.data = memoryview(data)
+        self.offset = 0
+
+    def take(self, size: int) -> memoryview:
+        if self.offset + size > len(self.data):
+            raise ValueError("Serialized response is truncated")
+        chunk = self.data[self.offset : self.offset + size]
+        self.offset += size
+        return chunk
+
+    def uint(self) -> int:
+        return struct.unpack("<I", self.take(4))[0]
+
+    def array(self, dtype: str, count: int) -> np.ndarray:
+        dtype = np.dtype(dtype)
+        return np.frombuffer(self.take(dtype.itemsize * count), dtype=dtype).copy()
+
+    def strings(self, count: int) -> List[Optional[str]]:
+        lengths = self.array("<i4", count).tolist()
+        blob = bytes(self.take(sum(length for length in lengths if length > 0)))
+        if self.uint() != 0:
+            raise ValueError("Serialized response is corrupted")
+        strings: List[Optional[str]] = []
+        position = 0
+        for length in lengths:
+            if length < 0:
+                strings.append(None)
+            else:
+                strings.append(blob[position : position + length].decode())
+                position += length
+        return strings
+
+
+def _columns(
+    response: ApiResponse,
+) -> Tuple[List[str], np.ndarray, np.ndarray, dict]:
+    """Returns texts, vertex counts, flat coordinates and present optional columns."""
+    if isinstance(response, ColumnarApiResponse):
+        present = ~np.isnan(response.vertices[:, :, 0])
+        columns = {}
+        if response.locale is not None:
+            columns["locale"] = list(response.locale)
+        if response.confidence is not None:
+            columns["confidence"] = np.asarray(response.confidence, np.float64)
+        return (
+            list(response.texts),
+            present.sum(axis=1),
+            response.vertices[present].reshape(-1, 2),
+            columns,
+        )
+
+    annotations = response.text_annotations
+    columns = {}
+    for name in _STRING_COLUMNS:
+        values = [getattr(a, name) for a in annotations]
+        if any(value is not None for value in values):
+            columns[name] = values
+    for name in _FLOAT_COLUMNS:
+        values = [getattr(a, name) for a in annotations]
+        if any(value is not None for value in values):
+            columns[name] = np.array(
+                [np.nan if value is None else value for value in values], np.float64
+            )
+    return (
+        [a.text for a in annotations],
+        np.array([len(a.vertices) for a in annotations]),
+        np.array(
+            [(v.x, v.y) for a in annotations for v in a.vertices], np.float64
+        ).reshape(-1, 2),
+        columns,
+    )
+
+
+def dumps(response: ApiResponse, *, compress: bool = True) -> bytes:
+    """Serializes the response. Columnar responses stay columnar when they are loaded."""
+    texts, vertex_counts, coordinates, columns = _columns(response)
+    writer = _Writer()
+    flags = (_COLUMNAR if isinstance(response, ColumnarApiResponse) else 0) | (
+        _HAS_TEXT if response.text is not None else 0
+    )
+    column_bits = 0
+    for bit, name in enumerate(_STRING_COLUMNS + _FLOAT_COLUMNS):
+        if name in columns:
+            column_bits |= 1 << bit
+    writer.parts.append(bytes([flags, column_bits]))
+    writer.uint(len(texts))
+    if response.text is not None:
+        writer.strings([response.text])
+    writer.strings(texts)
+    writer.array(np.asarray(vertex_counts, dtype="<u2"))
+
+    is_integer = bool(
+        np.all(np.isfinite(coordinates))
+        and np.all(coordinates == np.round(coordinates))
+        and np.all(np.abs(coordinates) < 2**31)
+    )
+    writer.parts.append(b"i" if is_integer else b"d")
+    writer.array(coordinates.astype("<i4" if is_integer else "<f8"))
+
+    for name in _STRING_COLUMNS:
+        if name in columns:
+            writer.strings(columns[name])
+    for name in _FLOAT_COLUMNS:
+        if name in columns:
+            writer.array(columns[name].astype("<f8"))
+
+    payload = writer.getvalue()
+    if compress:
+        payload = zlib.compress(payload, 1)
+    return _HEADER.pack(MAGIC, VERSION, _COMPRESSED if compress else 0) + payload
+
+
+def loads(data: bytes) -> ApiResponse:
+    """Loads a response serialized by :func:`dumps`."""
+    if len(data) < _HEADER.size:
+        raise ValueError("Serialized response is truncated")
+    magic, version, header_flags = _HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Data isn't a serialized response of a supported version")
+    payload = data[_HEADER.size :]
+    if header_flags & _COMPRESSED:
+        try:
+            payload = zlib.decompress(payload)
+        except zlib.error as e:
+            raise ValueError("Serialized response is corrupted") from e
+
+    reader = _Reader(payload)
+    flags, column_bits = reader.take(2)
+    count = reader.uint()
+    text = reader.strings(1)[0] if flags & _HAS_TEXT else None
+    texts = reader.strings(count)
+    vertex_counts = reader.array("<u2", count)
+    dtype = bytes(reader.take(1))
+    if dtype not in (b"i", b"d"):
+        raise ValueError("Serialized response is corrupted")
+    coordinates = reader.array(
+        "<i4" if dtype == b"i" else "<f8", 2 * int(vertex_counts.sum())
+    ).reshape(-1, 2)
+
+    columns = {}
+    for bit, name in enumerate(_STRING_COLUMNS):
+        if column_bits >> bit & 1:
+            columns[name] = reader.strings(count)
+    for bit, name in enumerate(_FLOAT_COLUMNS, start=len(_STRING_COLUMNS)):
+        if column_bits >> bit & 1:
+            columns[name] = reader.array("<f8", count)
+    if reader.offset != len(payload):
+        raise ValueError("Serialized response is corrupted")
+
+    if flags & _COLUMNAR:
+        vertex_count = int(vertex_counts.max(initial=0))
+        vertices = np.full((count, vertex_count, 2), np.nan)
+        vertices[np.arange(vertex_count) < vertex_counts[:, None]] = coordinates
+        return ColumnarApiResponse(
+            texts=texts,
+            vertices=vertices,
+            text=text,
+            confidence=columns.get("confidence"),
+            locale=columns.get("locale"),
+        )
+
+    ends = np.cumsum(vertex_counts).tolist()
+    points = coordinates.tolist()
+    optional = {
+        name: values if isinstance(values, list) else values.tolist()
+        for name, values in columns.items()
+    }
+    return ApiResponse(
+        text_annotations=[
+            TextAnnotations(
+                text=text_of_annotation,
+                vertices=[Vertices(x=x, y=y) for x, y in points[end - n : end]],
+                **{
+                    name: (None if value != value else value)
+                    for name, values in optional.items()
+                    for value in (values[i],)
+                },
+            )
+            for i, (text_of_annotation, n, end) in enumerate(
+                zip(texts, vertex_counts.tolist(), ends)
+            )
+        ],
+        text=text,
+    )
@@ -0,0 +1,176 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from google.api_core import exceptions
+from google.cloud import vision
+from google.cloud.vision_v1 import ImageAnnotatorClient
+
+from document_recognition.backends.base import PathLike
+from document_recognition.backends.payload import PayloadPolicy, PreparedImage
+from document_recognition.backends.synchronous.google_vision_backend import (
+    GoogleVisionBackend,
+    raise_for_image_error,
+)
+from document_recognition.image import read_image_bytes
+from document_recognition.recognizers.base import ApiResponse
+
+# maximum number of images in one batch_annotate_images request
+MAX_BATCH_SIZE = 16
+
+_STOP = object()
+
+# request, future of the response and the image it was prepared from, if any
+_Request = Tuple[Dict[str, Any], "Future[ApiResponse]", Optional[PreparedImage]]
+
+
+class BatchingGoogleVisionBackend(GoogleVisionBackend):
+    """Google vision backend that sends concurrent requests in batches.
+
+    Calls of :meth:`recognize_document` from different threads are collected by
+    a dispatcher thread and sent by one ``batch_annotate_images`` request, when
+    ``max_batch_size`` images are collected or ``max_linger`` seconds passed since
+    the first one. Errors of single images are raised only by their calls.
+    """
+
+    def __init__(
+        self,
+        image_annotator_client: ImageAnnotatorClient,
+        *,
+        columnar: bool = False,
+        lazy: bool = False,
+        max_batch_size: int = MAX_BATCH_SIZE,
+        max_linger: float = 0.05,
+        max_batches_in_flight: int = 4,
+        payload_policy: Optional[PayloadPolicy] = None,
+    ) -> None:
+        """
+        :param image_annotator_client: google vision client
+        :param columnar: return :class:`ColumnarApiResponse`
+        :param lazy: return :class:`LazyApiResponse`
+        :param max_batch_size: maximum number of images in one request, at most 16
+        :param max_linger: seconds to wait for more images after the first one of a batch
+        :param max_batches_in_flight: number of batch requests sent at the same time
+        :param payload_policy: downscales and re-encodes images in the calling thread
+            before they are queued. Vertices are mapped back to the original image
+        """
+        if not 1 <= max_batch_size <= MAX_BATCH_SIZE:
+            raise ValueError(f"max_batch_size must be from 1 to {MAX_BATCH_SIZE}")
+        super().__init__(
+            image_annotator_client,
+            columnar=columnar,
+            lazy=lazy,
+            payload_policy=payload_policy,
+        )
+        self.max_batch_size = max_batch_size
+        self.max_linger = max_linger
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._sender = ThreadPoolExecutor(
+            max_workers=max_batches_in_flight,
+            thread_name_prefix="google-vision-batch",
+        )
+        self._dispatcher: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _collect(self, first: _Request) -> Tuple[List[_Request], bool]:
+        """Returns a batch started by the request and whether the backend is closed."""
+        batch = [first]
+        deadline = time.monotonic() + self.max_linger
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            try:
+                item = (
+                    self._queue.get(timeout=timeout)
+                    if timeout > 0
+                    else self._queue.get_nowait()
+                )
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _dispatch(self) -> None:
+        stopped = False
+        while not stopped:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch, stopped = self._collect(item)
+            self._sender.submit(self._send, batch)
+
+    def _send(self, batch: List[_Request]) -> None:
+        batch = [item for item in batch if item[1].set_running_or_notify_cancel()]
+        if not batch:
+            return
+        try:
+            response = self.image_annotator_client.batch_annotate_images(
+                request={"requests": [request for request, _, _ in batch]}
+            )
+        except Exception as e:
+            for _, future, _ in batch:
+                future.set_exception(e)
+            return
+
+        for (_, future, prepared), image_response in zip(batch, response.responses):
+            try:
+                raise_for_image_error(image_response)
+                api_response = self._to_api_response(image_response)
+                if prepared is not None:
+                    api_response = prepared.restore(api_response)
+                future.set_result(api_response)
+            except Exception as e:
+                future.set_exception(e)
+        for _, future, _ in batch[len(response.responses) :]:
+            future.set_exception(
+                exceptions.InternalServerError("No response for the image in the batch")
+            )
+
+    def submit(self, image_path: PathLike) -> "Future[ApiResponse]":
+        """Queues the image and returns the future of its response."""
+        prepared = None
+        if self.payload_policy is not None:
+            prepared = self.payload_policy.prepare(image_path)
+            content = prepared.content
+        else:
+            # unlike annotate_image, batch requests don't read local files themselves
+            content = read_image_bytes(image_path)
+        request = {
+            "image": {"content": content},
+            "features": [{"type_": vision.Feature.Type.DOCUMENT_TEXT_DETECTION}],
+        }
+        future: "Future[ApiResponse]" = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Backend is closed")
+            if self._dispatcher is None:
+                self._dispatcher = threading.Thread(
+                    target=self._dispatch, name="google-vision-dispatcher", daemon=True
+                )
+                self._dispatcher.start()
+            self._queue.put((request, future, prepared))
+        return future
+
+    def recognize_document(self, image_path: PathLike) -> ApiResponse:
+        return self.submit(image_path).result()
+
+    def close(self) -> None:
+        """Sends the queued images and stops the dispatcher."""
+        with self._lock:
+            self._closed = True
+            dispatcher = self._dispatcher
+            if dispatcher is not None:
+                self._queue.put(_STOP)
+        if dispatcher is not None:
+            dispatcher.join()
+        self._sender.shutdown(wait=True)
+
+    def __enter__(self) -> "BatchingGoogleVisionBackend":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
@@ -1,6 +1,9 @@
 from pathlib import Path
+from typing import Any, Callable, Dict, Optional
 
+from google.api_core import exceptions
 from google.cloud import vision
+from google.rpc import code_pb2
 from google.cloud.vision_v1 import ImageAnnotatorClient
 
 from document_recognition.backends.base import (
@@ -9,40 +12,163 @@ from document_recognition.backends.base import (
     TextAnnotations,
     Vertices,
     BaseAsyncBackend,
+    ColumnarApiResponse,
 )
+from document_recognition.backends.lazy_response import (
+    LazyApiResponse,
+    optional_columns,
+    polygons_to_array,
+)
+from document_recognition.backends.payload import PayloadPolicy
+from document_recognition.fetch import ImageFetcher, default_fetcher, is_public_url
 from document_recognition.recognizers.base import ApiResponse
 
 
+def raise_for_image_error(response: vision.AnnotateImageResponse) -> None:
+    """Raises the error of the image in a batch response as google api exception."""
+    if response.error.code:
+        raise exceptions.from_grpc_status(response.error.code, response.error.message)
+
+
+# codes of the errors the API returns when it can't download an image uri itself
+_URL_FETCH_ERROR_CODES = (
+    code_pb2.DEADLINE_EXCEEDED,
+    code_pb2.PERMISSION_DENIED,
+)
+
+
+def is_url_fetch_error(response: vision.AnnotateImageResponse) -> bool:
+    """Returns whether the API failed to download the image uri of the request.
+
+    Only these errors are worth downloading the image locally. Other errors,
+    e.g. bad image data, would fail again and make a second billable call.
+    """
+    return (
+        response.error.code in _URL_FETCH_ERROR_CODES
+        and "url" in response.error.message.lower()
+    )
+
+
+def image_source(url: str) -> Dict[str, str]:
+    """Returns the image source of the url, which is fetched by the API itself."""
+    if url.startswith("gs://"):
+        return {"gcs_image_uri": url}
+    return {"image_uri": url}
+
+
+def to_api_response(response: vision.AnnotateImageResponse) -> ApiResponse:
+    return ApiResponse(
+        text_annotations=[
+            TextAnnotations(
+                text=text_annotation.description,
+                vertices=[
+                    Vertices(
+                        x=vertex.x,
+                        y=vertex.y,
+                    )
+                    for vertex in text_annotation.bounding_poly.vertices
+                ],
+            )
+            for text_annotation in response.text_annotations
+        ],
+        text=response.full_text_annotation.text,
+    )
+
+
+def convert_response(
+    response: vision.AnnotateImageResponse,
+    *,
+    columnar: bool = False,
+    lazy: bool = False,
+) -> ApiResponse:
+    """Converts the response to the kind of :class:`ApiResponse` a backend returns."""
+    if lazy:
+        return LazyApiResponse(response)
+    if columnar:
+        return to_columnar_api_response(response)
+    return to_api_response(response)
+
+
+def to_columnar_api_response(
+    response: vision.AnnotateImageResponse,
+) -> ColumnarApiResponse:
+    text_annotations = response.text_annotations
+    return ColumnarApiResponse(
+        texts=[text_annotation.description for text_annotation in text_annotations],
+        vertices=polygons_to_array(
+            [
+                [
+                    (vertex.x, vertex.y)
+                    for vertex in text_annotation.bounding_poly.vertices
+                ]
+                for text_annotation in text_annotations
+            ]
+        ),
+        text=response.full_text_annotation.text,
+        load_optional_columns=lambda: optional_columns(text_annotations),
+    )
+
+
 class GoogleVisionBackend(BaseSyncBackend):
-    def __init__(self, image_annotator_client: ImageAnnotatorClient) -> None:
+    def __init__(
+        self,
+        image_annotator_client: ImageAnnotatorClient,
+        *,
+        columnar: bool = False,
+        lazy: bool = False,
+        fetcher: Optional[ImageFetcher] = None,
+        pass_through: Callable[[str], bool] = is_public_url,
+        payload_policy: Optional[PayloadPolicy] = None,
+    ) -> None:
+        """
+        :param image_annotator_client: google vision client
+        :param columnar: return :class:`ColumnarApiResponse`, which is cheaper to build
+            and to process for dense documents
+        :param lazy: return :class:`LazyApiResponse`, which converts only the parts of
+            the response recognizers access, and gives the block hierarchy with confidences
+        :param fetcher: downloads images of urls the API can't fetch. If None, a shared one is used
+        :param pass_through: returns whether the url is passed to the API to fetch it itself
+        :param payload_policy: downscales and re-encodes images before they are sent.
+            Vertices are mapped back to the original image
+        """
         self.image_annotator_client = image_annotator_client
+        self.columnar = columnar
+        self.lazy = lazy
+        self.fetcher = fetcher
+        self.pass_through = pass_through
+        self.payload_policy = payload_policy
+
+    def _to_api_response(self, response: vision.AnnotateImageResponse) -> ApiResponse:
+        return convert_response(response, columnar=self.columnar, lazy=self.lazy)
+
+    def _annotate(self, image: Dict[str, Any]) -> vision.AnnotateImageResponse:
+        payload = {
+            "image": image,
+            "features": [{"type_": vision.Feature.Type.DOCUMENT_TEXT_DETECTION}],
+        }
+        return self.image_annotator_client.annotate_image(payload)
 
     def recognize_document(self, image_path: PathLike) -> ApiResponse:
+        if self.payload_policy is not None:
+            prepared = self.payload_policy.prepare(image_path)
+            response = self._annotate({"content": prepared.content})
+            return prepared.restore(self._to_api_response(response))
+
         if isinstance(image_path, (str, Path)):
             path = {"source": {"filename": str(image_path)}}
         else:
+            # decoded images are encoded only here, right before they're sent
             path = {"content": image_path.read()}
-        payload = {
-            "image": path,
-            "features": [{"type_": vision.Feature.Type.DOCUMENT_TEXT_DETECTION}],
-        }
-        response = self.image_annotator_client.annotate_image(payload)
-        return ApiResponse(
-            text_annotations=[
-                TextAnnotations(
-                    text=text_annotation.description,
-                    vertices=[
-                        Vertices(
-                            x=vertex.x,
-                            y=vertex.y,
-                        )
-                        for vertex in text_annotation.bounding_poly.vertices
-                    ],
-                )
-                for text_annotation in response.text_annotations
-            ],
-            text=response.full_text_annotation.text,
-        )
+        response = self._annotate(path)
+        return self._to_api_response(response)
 
     def recognize_document_from_url(self, url: str) -> ApiResponse:
-        raise NotImplementedError
+        if self.pass_through(url):
+            response = self._annotate({"source": image_source(url)})
+            if url.startswith("gs://") or not is_url_fetch_error(response):
+                raise_for_image_error(response)
+                return self._to_api_response(response)
+            # the API couldn't fetch the url, e.g. the host blocks it, so it's downloaded here
+
+        fetcher = self.fetcher or default_fetcher()
+        return self.recognize_document(fetcher.fetch(url))
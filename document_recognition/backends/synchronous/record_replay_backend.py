@@ -0,0 +1,56 @@
+from document_recognition.backends.base import ApiResponse, BaseSyncBackend, PathLike
+from document_recognition.backends.cache import image_key
+from document_recognition.backends.corpus import CorpusReader, CorpusWriter, url_key
+
+
+class RecordingBackend(BaseSyncBackend):
+    """Backend which appends every response of the wrapped backend to a corpus.
+
+    Responses are keyed by the hash of the image bytes, or of the url,
+    so they can be served by :class:`ReplayBackend` later.
+    """
+
+    def __init__(self, backend: BaseSyncBackend, corpus: CorpusWriter) -> None:
+        """
+        :param backend: backend to record
+        :param corpus: corpus to append the responses to
+        """
+        self.backend = backend
+        self.corpus = corpus
+
+    def recognize_document(self, image_path: PathLike) -> ApiResponse:
+        key, image_path = image_key(image_path)
+        response = self.backend.recognize_document(image_path)
+        self.corpus.append(key, response)
+        return response
+
+    def recognize_document_from_url(self, url: str) -> ApiResponse:
+        response = self.backend.recognize_document_from_url(url)
+        self.corpus.append(url_key(url), response)
+        return response
+
+
+class ReplayBackend(BaseSyncBackend):
+    """Backend which serves recorded responses without the network.
+
+    Images which weren't recorded raise :class:`KeyError`.
+    """
+
+    def __init__(self, corpus: CorpusReader) -> None:
+        """
+        :param corpus: corpus recorded by :class:`RecordingBackend`
+        """
+        self.corpus = corpus
+
+    def _get(self, key: str, source: str) -> ApiResponse:
+        response = self.corpus.get(key)
+        if response is None:
+            raise KeyError(f"No response is recorded for {source}")
+        return response
+
+    def recognize_document(self, image_path: PathLike) -> ApiResponse:
+        key, _ = image_key(image_path)
+        return self._get(key, f"image {key}")
+
+    def recognize_document_from_url(self, url: str) -> ApiResponse:
+        return self._get(url_key(url), url)
@@ -1,6 +1,10 @@
 import dataclasses
 from datetime import datetime
-from typing import Optional
+from typing import Callable, ClassVar, Dict, Optional
+
+
+def normalize_abode(abode: str) -> str:
+    return abode.title().strip(".")
 
 
 @dataclasses.dataclass
@@ -16,10 +20,20 @@ class DriverLicense:
 
     abode: Optional[str] = None
 
-    def __post_init__(self):
-        if self.name:
-            self.name = self.name.title()
-        if self.patronymic:
-            self.patronymic = self.patronymic.title()
-        if self.abode:
-            self.abode = self.abode.title().strip(".")
+    # normalizations of the non-empty text fields. Template parse plans apply them
+    # while converting the fields and pass ``normalized=True``
+    NORMALIZERS: ClassVar[Dict[str, Callable[[str], str]]] = {
+        "name": str.title,
+        "patronymic": str.title,
+        "abode": normalize_abode,
+    }
+
+    normalized: dataclasses.InitVar[bool] = False
+
+    def __post_init__(self, normalized: bool):
+        if normalized:
+            return
+        for name, normalize in self.NORMALIZERS.items():
+            value = getattr(self, name)
+            if value:
+                setattr(self, name, normalize(value))
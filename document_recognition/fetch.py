@@ -0,0 +1,122 @@
+import ipaddress
+import threading
+from io import BytesIO
+from typing import Optional
+from urllib.parse import urlsplit
+
+import urllib3
+
+# hosts with these suffixes are never reachable from the outside
+_PRIVATE_SUFFIXES = (".local", ".localhost", ".internal", ".lan", ".home.arpa")
+
+
+class FetchError(IOError):
+    """The image couldn't be downloaded."""
+
+
+class ImageTooLarge(FetchError):
+    """The image is larger than the allowed size."""
+
+
+def is_public_url(url: str) -> bool:
+    """Returns whether the url can be fetched by the API itself.
+
+    Google cloud storage uris and http urls of public hosts are public. Urls with
+    credentials are never public, so the credentials aren't sent anywhere.
+    """
+    parsed = urlsplit(url)
+    if parsed.scheme == "gs":
+        return bool(parsed.netloc)
+    if parsed.scheme not in ("http", "https") or parsed.username or parsed.password:
+        return False
+    host = parsed.hostname
+    if not host:
+        return False
+    try:
+        return ipaddress.ip_address(host).is_global
+    except ValueError:
+        pass
+    return "." in host and not host.endswith(_PRIVATE_SUFFIXES)
+
+
+class ImageFetcher:
+    """Downloads images over a pool of keep-alive connections.
+
+    The body is streamed into one buffer in chunks, and the download is stopped as
+    soon as it's larger than ``max_bytes``, so a huge or endless response doesn't
+    exhaust the memory.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_bytes: int = 20 * 2**20,
+        timeout: float = 10.0,
+        chunk_size: int = 2**16,
+        max_redirects: int = 5,
+        pool_manager: Optional[urllib3.PoolManager] = None,
+    ) -> None:
+        """
+        :param max_bytes: maximum size of an image
+        :param timeout: timeout of connecting and of every read in seconds
+        :param chunk_size: size of the chunks the body is read by
+        :param max_redirects: maximum number of redirects followed
+        :param pool_manager: pool of the connections. If None, a new one is created
+        """
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.chunk_size = chunk_size
+        # redirects are followed, but failed requests aren't retried
+        self.pool_manager = pool_manager or urllib3.PoolManager(
+            num_pools=16,
+            maxsize=8,
+            retries=urllib3.Retry(
+                total=None, connect=0, read=0, status=0, other=0, redirect=max_redirects
+            ),
+        )
+
+    def fetch(self, url: str) -> BytesIO:
+        """Returns the image of the url as a buffer at position 0."""
+        try:
+            response = self.pool_manager.request(
+                "GET", url, preload_content=False, timeout=self.timeout
+            )
+        except urllib3.exceptions.HTTPError as e:
+            raise FetchError(f"Failed to fetch {url}: {e}") from e
+
+        try:
+            if not 200 <= response.status < 300:
+                raise FetchError(f"Failed to fetch {url}: HTTP {response.status}")
+            length = response.headers.get("Content-Length")
+            if length is not None and length.isdigit() and int(length) > self.max_bytes:
+                raise ImageTooLarge(f"Image at {url} has {length} bytes")
+
+            buffer = BytesIO()
+            for chunk in response.stream(self.chunk_size):
+                buffer.write(chunk)
+                if buffer.tell() > self.max_bytes:
+                    raise ImageTooLarge(
+                        f"Image at {url} is larger than {self.max_bytes} bytes"
+                    )
+        except BaseException as e:
+            # the rest of the body isn't read, so the connection isn't reused
+            response.close()
+            if isinstance(e, urllib3.exceptions.HTTPError):
+                raise FetchError(f"Failed to fetch {url}: {e}") from e
+            raise
+        response.release_conn()
+        buffer.seek(0)
+        return buffer
+
+
+_default_fetcher: Optional[ImageFetcher] = None
+_default_fetcher_lock = threading.Lock()
+
+
+def default_fetcher() -> ImageFetcher:
+    """Returns the fetcher shared by backends and clients which weren't given one."""
+    global _default_fetcher
+    with _default_fetcher_lock:
+        if _default_fetcher is None:
+            _default_fetcher = ImageFetcher()
+        return _default_fetcher
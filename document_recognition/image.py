@@ -0,0 +1,83 @@
+from functools import cached_property
+from pathlib import Path
+from typing import Any, List, Optional
+
+import cv2
+import numpy as np
+
+_QUALITY_FLAGS = {
+    ".jpg": cv2.IMWRITE_JPEG_QUALITY,
+    ".jpeg": cv2.IMWRITE_JPEG_QUALITY,
+    ".webp": cv2.IMWRITE_WEBP_QUALITY,
+}
+
+
+def encode_params(codec: str, quality: Optional[int] = None) -> List[int]:
+    """Returns ``cv2.imencode`` params for the codec. Quality is ignored by lossless codecs."""
+    flag = _QUALITY_FLAGS.get(codec.lower())
+    if quality is None or flag is None:
+        return []
+    return [flag, int(quality)]
+
+
+def encode_image(
+    pixels: np.ndarray, codec: str = ".jpg", quality: Optional[int] = None
+) -> np.ndarray:
+    is_success, buffer = cv2.imencode(codec, pixels, encode_params(codec, quality))
+    if not is_success:
+        raise ValueError(f"Failed to encode image to {codec}")
+    return buffer
+
+
+class DecodedImage:
+    """Decoded image, which is passed between stages without encoding.
+
+    The pixels are encoded only when the bytes are needed, usually at the network boundary,
+    and the result is cached. It can be passed anywhere a :data:`PathLike` is accepted.
+    """
+
+    def __init__(
+        self, pixels: np.ndarray, codec: str = ".jpg", quality: Optional[int] = None
+    ) -> None:
+        """
+        :param pixels: decoded image in BGR
+        :param codec: extension of the format used for encoding, e.g. ``.jpg``, ``.png``, ``.webp``
+        :param quality: quality of lossy codecs from 0 to 100. If None, codec default is used
+        """
+        self.pixels = pixels
+        self.codec = codec
+        self.quality = quality
+
+    @property
+    def width(self) -> int:
+        return self.pixels.shape[1]
+
+    @property
+    def height(self) -> int:
+        return self.pixels.shape[0]
+
+    @cached_property
+    def encoded(self) -> np.ndarray:
+        return encode_image(self.pixels, self.codec, self.quality)
+
+    def getbuffer(self) -> memoryview:
+        """Returns encoded bytes without copying them."""
+        return memoryview(self.encoded)
+
+    def read(self) -> bytes:
+        """Returns encoded bytes, so the image can be used where a binary file is expected."""
+        return self.encoded.tobytes()
+
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__name__}(width={self.width}, height={self.height}, "
+            f"codec={self.codec!r}, quality={self.quality!r})"
+        )
+
+
+def read_image_bytes(image_path: Any) -> bytes:
+    """Returns the bytes of a :data:`PathLike` image, as they are sent to a backend."""
+    if isinstance(image_path, (str, Path)):
+        with open(image_path, "rb") as file:
+            return file.read()
+    return image_path.read()
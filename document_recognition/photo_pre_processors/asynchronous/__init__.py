@@ -0,0 +1,166 @@
+import asyncio
+import os
+from asyncio import get_running_loop
+from concurrent.futures import Executor, ProcessPoolExecutor
+from io import BytesIO
+from multiprocessing.context import BaseContext
+from pathlib import Path
+from typing import Optional, Union, Any
+
+from document_recognition.backends.base import PathLike
+from document_recognition.image import DecodedImage
+from document_recognition.photo_pre_processors.base import (
+    BaseAsyncPhotoPreProcessor,
+    BaseSyncPhotoPreProcessor,
+)
+
+# pre processor of the current worker process, set once by the pool initializer
+_worker_pre_processor: Optional[BaseSyncPhotoPreProcessor] = None
+
+
+def _init_worker(pre_processor: BaseSyncPhotoPreProcessor) -> None:
+    global _worker_pre_processor
+    _worker_pre_processor = pre_processor
+    warm_up = getattr(pre_processor, "warm_up", None)
+    if warm_up is not None:
+        warm_up()
+
+
+def _pre_process_in_worker(
+    image_path: PathLike, destination: Optional[Union[str, Path]]
+) -> Optional[PathLike]:
+    assert _worker_pre_processor is not None, "worker isn't initialized"
+    return _worker_pre_processor(image_path, destination)
+
+
+def _read_file(path: Union[str, Path]) -> BytesIO:
+    with open(path, "rb") as file:
+        return BytesIO(file.read())
+
+
+def _write_file(path: Union[str, Path], result: Any) -> None:
+    with open(path, "wb") as file:
+        file.write(result.getbuffer())
+
+
+def _copy_to(destination: Any, result: Any) -> None:
+    destination.write(result.read())
+    destination.seek(0)
+
+
+class AsyncPhotoPreProcessorWrapper(BaseAsyncPhotoPreProcessor):
+    """Wrapper for sync pre processor that allows to use it in async context.
+
+    The pre processor runs in the executor and files are read and written
+    in the default executor, so the event loop is never blocked. The number of
+    photos being processed is limited, so a burst of uploads waits
+    instead of keeping all decoded photos in memory.
+    """
+
+    # read files in the default executor before passing them to the pre processor
+    _reads_files = True
+
+    def __init__(
+        self,
+        pre_processor: BaseSyncPhotoPreProcessor,
+        /,
+        executor: Optional[Executor] = None,
+        max_concurrency: Optional[int] = None,
+    ) -> None:
+        """
+        :param pre_processor: sync pre processor to wrap
+        :param executor: executor to run the pre processor in. If None, default executor will be used
+        :param max_concurrency: maximum number of photos processed at the same time.
+            If None, twice the number of cpus
+        """
+        if max_concurrency is None:
+            max_concurrency = 2 * (os.cpu_count() or 1)
+        self.pre_processor = pre_processor
+        self.executor = executor
+        self.max_concurrency = max_concurrency
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def _run(self, image_path: PathLike) -> "asyncio.Future[Any]":
+        return get_running_loop().run_in_executor(
+            self.executor, self.pre_processor, image_path
+        )
+
+    async def _pre_process(
+        self, image_path: PathLike, destination: Optional[PathLike]
+    ) -> PathLike:
+        loop = get_running_loop()
+        if self._reads_files and isinstance(image_path, (str, Path)):
+            image_path = await loop.run_in_executor(None, _read_file, image_path)
+
+        result = await self._run(image_path)
+
+        if destination is None:
+            return result
+        if isinstance(destination, (str, Path)):
+            await loop.run_in_executor(None, _write_file, destination, result)
+            return destination
+        await loop.run_in_executor(None, _copy_to, destination, result)
+        return destination
+
+    async def __call__(
+        self, image_path: PathLike, destination: Optional[PathLike] = None
+    ) -> PathLike:
+        if self._semaphore is None:
+            # created lazily to be bound to the running loop
+            self._semaphore = asyncio.BoundedSemaphore(self.max_concurrency)
+        async with self._semaphore:
+            return await self._pre_process(image_path, destination)
+
+
+class ProcessPoolPhotoPreProcessor(AsyncPhotoPreProcessorWrapper):
+    """Runs a synchronous pre processor in a process pool, so photos are processed on all cores.
+
+    The pre processor is pickled once per worker, when the worker starts,
+    and only photos and results are sent on every call.
+    """
+
+    # workers read files themselves, which is cheaper than sending their content
+    _reads_files = False
+
+    def __init__(
+        self,
+        pre_processor: BaseSyncPhotoPreProcessor,
+        /,
+        max_workers: Optional[int] = None,
+        mp_context: Optional[BaseContext] = None,
+        max_concurrency: Optional[int] = None,
+    ) -> None:
+        """
+        :param pre_processor: picklable sync pre processor to run in workers
+        :param max_workers: number of worker processes. If None, number of cpus is used
+        :param mp_context: multiprocessing context used to start workers
+        :param max_concurrency: maximum number of photos processed or waiting for a worker
+            at the same time. If None, twice the number of workers
+        """
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        if max_concurrency is None:
+            max_concurrency = 2 * max_workers
+        super().__init__(
+            pre_processor,
+            executor=ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=mp_context,
+                initializer=_init_worker,
+                initargs=(pre_processor,),
+            ),
+            max_concurrency=max_concurrency,
+        )
+
+    async def _run(self, image_path: PathLike) -> Any:  # type: ignore[override]
+        loop = get_running_loop()
+        if not isinstance(image_path, (str, Path, DecodedImage, BytesIO)):
+            # file objects can't be sent to another process, so their content is sent.
+            # They may block, so they are read in the default executor
+            image_path = BytesIO(await loop.run_in_executor(None, image_path.read))
+        return await loop.run_in_executor(
+            self.executor, _pre_process_in_worker, image_path, None
+        )
+
+    def shutdown(self, wait: bool = True) -> None:
+        self.executor.shutdown(wait=wait)
@@ -1,19 +1,56 @@
+import dataclasses
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from contextlib import contextmanager
 from functools import cached_property
 from io import BytesIO
 from pathlib import Path
-from typing import Optional, BinaryIO
+from typing import (
+    Optional,
+    BinaryIO,
+    Dict,
+    Any,
+    Tuple,
+    Sequence,
+    Union,
+    Iterable,
+    Iterator,
+    Set,
+    Deque,
+)
 
 import cv2
 import numpy as np
 
 from document_recognition.backends.base import PathLike
+from document_recognition.image import DecodedImage, encode_image
 from document_recognition.photo_pre_processors.base import BaseSyncPhotoPreProcessor
+from document_recognition.photo_pre_processors.synchronous.matchers_cv2_ import (
+    BaseDescriptorMatcher,
+    BruteForceMatcher,
+    CV2DescriptorMatcher,
+)
 from document_recognition.template import Template
 
 
 def read_image_from_pathlike(image_path: PathLike) -> np.ndarray:
+    if isinstance(image_path, DecodedImage):
+        return image_path.pixels
     if isinstance(image_path, (str, Path)):
         image = cv2.imread(str(image_path))
+    elif isinstance(image_path, BytesIO):
+        # decode straight from the buffer instead of copying it with read()
+        with image_path.getbuffer() as buffer:
+            image = cv2.imdecode(
+                np.frombuffer(buffer, np.uint8)[image_path.tell() :], 1
+            )
+        # consume the stream, as read() would
+        image_path.seek(0, 2)
     else:
         image = cv2.imdecode(np.frombuffer(image_path.read(), np.uint8), 1)
     if image is None:
@@ -21,10 +58,148 @@ def read_image_from_pathlike(image_path: PathLike) -> np.ndarray:
     return image
 
 
+# width of grayscale copies compared by the pre-check of already aligned scans
+PRECHECK_WIDTH = 128
+PRECHECK_ASPECT_TOLERANCE = 0.03
+
+# lower bound of the number of ORB features when it's adapted to the photo size
+MIN_FEATURES = 500
+
+_ORB_GETTERS = {
+    "nfeatures": "getMaxFeatures",
+    "scaleFactor": "getScaleFactor",
+    "nlevels": "getNLevels",
+    "edgeThreshold": "getEdgeThreshold",
+    "firstLevel": "getFirstLevel",
+    "WTA_K": "getWTA_K",
+    "scoreType": "getScoreType",
+    "patchSize": "getPatchSize",
+    "fastThreshold": "getFastThreshold",
+}
+
+
+def orb_parameters(orb: cv2.ORB) -> Dict[str, Any]:
+    """Returns the parameters of the ORB detector as keyword arguments of ``cv2.ORB_create``."""
+    return {name: getattr(orb, getter)() for name, getter in _ORB_GETTERS.items()}
+
+
+def keypoints_to_array(keypoints: Sequence[cv2.KeyPoint]) -> np.ndarray:
+    return np.array(
+        [
+            (*kp.pt, kp.size, kp.angle, kp.response, kp.octave, kp.class_id)
+            for kp in keypoints
+        ],
+        dtype=np.float32,
+    ).reshape(-1, 7)
+
+
+def array_to_keypoints(array: np.ndarray) -> Tuple[cv2.KeyPoint, ...]:
+    return tuple(
+        cv2.KeyPoint(
+            x=float(x),
+            y=float(y),
+            size=float(size),
+            angle=float(angle),
+            response=float(response),
+            octave=int(octave),
+            class_id=int(class_id),
+        )
+        for x, y, size, angle, response, octave, class_id in array
+    )
+
+
+def _save_array_atomically(path: Path, array: np.ndarray) -> None:
+    # write to a temporary file first, so concurrent workers never load a half-written cache
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            np.save(file, array)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+@dataclasses.dataclass
+class AlignmentReport:
+    """Quality of the alignment of a photo to the template."""
+
+    homography: np.ndarray
+    """homography from the photo to the template"""
+    matches: int = 0
+    """number of matches passed to RANSAC"""
+    inliers: int = 0
+    """number of RANSAC inliers"""
+    reprojection_error: float = 0.0
+    """mean distance in template pixels between inlier photo keypoints mapped
+    by the homography and their template keypoints"""
+    is_identity: bool = False
+    """the photo is already aligned, so it's only resized to the template size"""
+    skipped_features: bool = False
+    """the photo passed the pre-check, so no keypoints were detected"""
+
+    @property
+    def inlier_ratio(self) -> float:
+        return self.inliers / self.matches if self.matches else 0.0
+
+
+# template keypoints and descriptors shared by all pre processors of the process,
+# so copies unpickled in a worker compute or load them only once
+_TEMPLATE_FEATURES: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+
+
+def _precheck_thumbnail(img: np.ndarray) -> np.ndarray:
+    if img.ndim == 3:
+        img = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    height = max(1, round(PRECHECK_WIDTH * img.shape[0] / img.shape[1]))
+    return cv2.resize(img, (PRECHECK_WIDTH, height), interpolation=cv2.INTER_AREA)
+
+
+_cv2_threads_lock = threading.Lock()
+_cv2_threads_users = 0
+_cv2_threads_previous = 0
+
+
+@contextmanager
+def _limit_cv2_threads(num_threads: int) -> Iterator[None]:
+    """Limits the number of threads of OpenCV, which is a global setting of the process.
+
+    Nested and concurrent usages share the limit of the first one,
+    and the previous value is restored when the last one exits.
+    """
+    global _cv2_threads_users, _cv2_threads_previous
+    with _cv2_threads_lock:
+        if not _cv2_threads_users:
+            _cv2_threads_previous = cv2.getNumThreads()
+            cv2.setNumThreads(num_threads)
+        _cv2_threads_users += 1
+    try:
+        yield
+    finally:
+        with _cv2_threads_lock:
+            _cv2_threads_users -= 1
+            if not _cv2_threads_users:
+                cv2.setNumThreads(_cv2_threads_previous)
+
+
 class TemplateImage:
-    def __init__(self, image_path: PathLike, orb: cv2.ORB):
+    """Template image with lazily computed keypoints and descriptors.
+
+    If ``cache_dir`` is passed, keypoints and descriptors are stored there
+    and loaded through a memory map on the next start instead of being recomputed.
+    The cache entry is keyed by the template pixels and the ORB parameters,
+    so changing any of them invalidates it.
+    """
+
+    def __init__(
+        self,
+        image_path: PathLike,
+        orb: cv2.ORB,
+        cache_dir: Optional[Union[str, Path]] = None,
+    ):
         self._image_path = image_path
         self._orb = orb
+        self._cache_dir = Path(cache_dir) if cache_dir is not None else None
 
     @cached_property
     def image(self) -> np.ndarray:
@@ -39,8 +214,86 @@ class TemplateImage:
         return self.image.shape[1]
 
     @cached_property
-    def kp_and_des(self) -> np.ndarray:
-        return self._orb.detectAndCompute(self.image, None)
+    def cache_key(self) -> str:
+        image = self.image
+        digest = hashlib.sha256()
+        digest.update(json.dumps(image.shape).encode())
+        digest.update(image.tobytes())
+        digest.update(json.dumps(orb_parameters(self._orb), sort_keys=True).encode())
+        return digest.hexdigest()
+
+    def _cache_paths(self) -> Tuple[Path, Path]:
+        assert self._cache_dir is not None
+        prefix = f"template-{self.cache_key}"
+        return (
+            self._cache_dir / f"{prefix}.keypoints.npy",
+            self._cache_dir / f"{prefix}.descriptors.npy",
+        )
+
+    def _load_from_cache(self) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        keypoints_path, descriptors_path = self._cache_paths()
+        try:
+            keypoints = np.load(keypoints_path, mmap_mode="r")
+            descriptors = np.load(descriptors_path, mmap_mode="r")
+        except (OSError, ValueError):
+            return None
+        if len(keypoints) != len(descriptors):
+            return None
+        return keypoints, descriptors
+
+    def _save_to_cache(self, keypoints: np.ndarray, descriptors: np.ndarray) -> None:
+        keypoints_path, descriptors_path = self._cache_paths()
+        self._cache_dir.mkdir(parents=True, exist_ok=True)
+        _save_array_atomically(descriptors_path, descriptors)
+        _save_array_atomically(keypoints_path, keypoints)
+
+    @cached_property
+    def _keypoints_array_and_des(self) -> Tuple[np.ndarray, np.ndarray]:
+        features = _TEMPLATE_FEATURES.get(self.cache_key)
+        if features is None:
+            features = _TEMPLATE_FEATURES[self.cache_key] = self._compute_features()
+        return features
+
+    def _compute_features(self) -> Tuple[np.ndarray, np.ndarray]:
+        if self._cache_dir is not None:
+            cached = self._load_from_cache()
+            if cached is not None:
+                return cached
+
+        kp, des = self._orb.detectAndCompute(self.image, None)
+        keypoints = keypoints_to_array(kp)
+        if des is None:
+            des = np.empty((0, self._orb.descriptorSize()), dtype=np.uint8)
+
+        if self._cache_dir is not None:
+            self._save_to_cache(keypoints, des)
+        return keypoints, des
+
+    @cached_property
+    def points(self) -> np.ndarray:
+        """Coordinates of the keypoints as a ``(n, 2)`` float32 array."""
+        return np.ascontiguousarray(self._keypoints_array_and_des[0][:, :2])
+
+    @property
+    def descriptors(self) -> np.ndarray:
+        return self._keypoints_array_and_des[1]
+
+    @cached_property
+    def kp_and_des(self) -> Tuple[Tuple[cv2.KeyPoint, ...], np.ndarray]:
+        keypoints, des = self._keypoints_array_and_des
+        return array_to_keypoints(keypoints), des
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # cached properties aren't pickled, they are taken from the per-process cache instead
+        return {
+            "_image_path": self._image_path,
+            "_orb": orb_parameters(self._orb),
+            "_cache_dir": self._cache_dir,
+        }
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        state["_orb"] = cv2.ORB_create(**state["_orb"])
+        self.__dict__.update(state)
 
 
 class CV2HomographyPhotoPreProcessorByTemplate(BaseSyncPhotoPreProcessor):
@@ -50,63 +303,373 @@ class CV2HomographyPhotoPreProcessorByTemplate(BaseSyncPhotoPreProcessor):
         orb: Optional[cv2.ORB] = None,
         bf: Optional[cv2.BFMatcher] = None,
         percent: float = 50,
+        cache_dir: Optional[Union[str, Path]] = None,
+        matcher: Optional[BaseDescriptorMatcher] = None,
+        coarse_to_fine: bool = False,
+        refine: bool = False,
+        features_per_pixel: Optional[float] = None,
+        coarse_area_ratio: float = 2.0,
+        codec: str = ".jpg",
+        quality: Optional[int] = None,
+        lazy_encoding: bool = False,
+        identity_tolerance: Optional[float] = 1.0,
+        precheck_threshold: Optional[float] = None,
     ) -> None:
+        """
+        :param template: template to align photos to
+        :param orb: ORB detector. If None, ORB with 30000 features will be used
+        :param bf: cv2 matcher wrapped into :class:`BruteForceMatcher`, kept for compatibility.
+            Ignored if ``matcher`` is passed
+        :param percent: percent of the best matches used to find the homography
+        :param cache_dir: directory to cache template keypoints and descriptors in.
+            If None, they are computed on the first call in every process
+        :param matcher: descriptor matcher strategy.
+            If None, brute force hamming matcher with cross check will be used
+        :param coarse_to_fine: find the homography on a copy of the photo downscaled
+            to about the template size and warp the original photo once
+        :param refine: after the homography is found, warp the photo into the template frame,
+            match it against the template again and correct the homography by the residual one
+        :param features_per_pixel: if passed, number of ORB features of a photo is proportional
+            to its area instead of the fixed ``orb`` number, which is used as the upper bound
+        :param coarse_area_ratio: area of the downscaled photo relative to the template area
+        :param codec: format of the result, e.g. ``.jpg``, ``.png``, ``.webp``
+        :param quality: quality of lossy codecs from 0 to 100. If None, codec default is used
+        :param lazy_encoding: if True and destination isn't passed, return
+            :class:`DecodedImage` which is encoded only when its bytes are needed
+        :param identity_tolerance: if the homography moves the photo corners less than
+            this number of template pixels compared to a plain resize, the photo is resized
+            instead of warped. If None, the photo is always warped
+        :param precheck_threshold: if passed, photos with the template aspect ratio are
+            compared with the template by normalized cross-correlation of small grayscale
+            copies, and photos scoring at least this value are resized without
+            detecting keypoints. Useful for already aligned scans
+        """
         if orb is None:
             orb = cv2.ORB_create(nfeatures=30000)
-        if bf is None:
-            bf = cv2.BFMatcher(cv2.NORM_HAMMING, crossCheck=True)
+        if matcher is None:
+            matcher = BruteForceMatcher(matcher=bf)
 
+        self.template = template
         self.orb = orb
-        self.bf = bf
-        self.template_img = TemplateImage(str(template.path), orb=orb)
+        self.matcher = matcher
+        self.template_img = TemplateImage(
+            str(template.path), orb=orb, cache_dir=cache_dir
+        )
         self.percent = percent
+        self.coarse_to_fine = coarse_to_fine
+        self.refine = refine
+        self.features_per_pixel = features_per_pixel
+        self.coarse_area_ratio = coarse_area_ratio
+        self.codec = codec
+        self.quality = quality
+        self.lazy_encoding = lazy_encoding
+        self.identity_tolerance = identity_tolerance
+        self.precheck_threshold = precheck_threshold
+        self._local = threading.local()
 
-    def __call__(
-        self,
-        image_path: PathLike,
-        destination: Optional[PathLike] = None,
-        seek: bool = True,
-    ) -> Optional[BinaryIO]:
-        if destination is None:
-            destination = BytesIO()
+    @property
+    def bf(self) -> cv2.DescriptorMatcher:
+        """cv2 matcher of :attr:`matcher`, kept for compatibility."""
+        if not isinstance(self.matcher, CV2DescriptorMatcher):
+            raise AttributeError(f"{type(self.matcher).__name__} has no cv2 matcher")
+        return self.matcher.matcher
 
-        # read the image
-        img = read_image_from_pathlike(image_path)
+    @bf.setter
+    def bf(self, bf: cv2.DescriptorMatcher) -> None:
+        self.matcher = BruteForceMatcher(matcher=bf)
+        # matchers of the threads are clones of the old one
+        self._local = threading.local()
 
-        # detect the keypoints and compute the descriptors
-        kp, des = self.orb.detectAndCompute(img, None)
-        template_kp, template_des = self.template_img.kp_and_des
+    def warm_up(self) -> None:
+        """Loads or computes the template features, so the first call isn't slower than others."""
+        self.template_img.points  # noqa
+        if self.precheck_threshold is not None:
+            self._precheck_template  # noqa
 
-        # match the descriptors
-        matches = self.bf.match(des, template_des)
-        # sort the matches in the order of their distance
-        matches = sorted(matches, key=lambda x: x.distance)
+    def __getstate__(self) -> Dict[str, Any]:
+        # cv2 objects can't be pickled, so only the parameters of the detector are sent
+        state = self.__dict__.copy()
+        state["orb"] = orb_parameters(self.orb)
+        del state["_local"]
+        return state
 
-        # get the good matches
-        good = matches[: int(len(matches) * (self.percent / 100))]
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        state["orb"] = cv2.ORB_create(**state["orb"])
+        state["_local"] = threading.local()
+        self.__dict__.update(state)
 
-        # get the coordinates of the good matches
-        src_points = np.float32([kp[m.queryIdx].pt for m in good]).reshape(-1, 1, 2)
-        dst_points = np.float32([template_kp[m.trainIdx].pt for m in good]).reshape(
-            -1, 1, 2
+    def _local_orb(self) -> cv2.ORB:
+        """ORB detector of the current thread, cv2 detectors aren't shared between threads."""
+        orb = getattr(self._local, "orb", None)
+        if orb is None:
+            orb = self._local.orb = cv2.ORB_create(**orb_parameters(self.orb))
+        return orb
+
+    def _local_matcher(self) -> BaseDescriptorMatcher:
+        """Matcher of the current thread."""
+        matcher = getattr(self._local, "matcher", None)
+        if matcher is None:
+            matcher = self._local.matcher = self.matcher.clone()
+        return matcher
+
+    def _detector_for(self, img: np.ndarray) -> cv2.ORB:
+        if self.features_per_pixel is None:
+            return self._local_orb()
+        parameters = orb_parameters(self.orb)
+        parameters["nfeatures"] = int(
+            np.clip(
+                img.shape[0] * img.shape[1] * self.features_per_pixel,
+                MIN_FEATURES,
+                parameters["nfeatures"],
+            )
         )
+        return cv2.ORB_create(**parameters)
+
+    def _detect(self, img: np.ndarray) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """Returns coordinates of the keypoints as ``(n, 2)`` array and their descriptors."""
+        kp, des = self._detector_for(img).detectAndCompute(img, None)
+        points = np.array([k.pt for k in kp], dtype=np.float32).reshape(-1, 2)
+        return points, des
+
+    def _find_homography(
+        self, points: np.ndarray, des: Optional[np.ndarray]
+    ) -> AlignmentReport:
+        """Finds the homography from the photo to the template by RANSAC."""
+        if des is None or not len(des):
+            raise ValueError("Could not find a homography")
+        template_des = self.template_img.descriptors
+
+        # match the descriptors and keep the best of them
+        good = self._local_matcher().match(des, template_des).best(self.percent)
+
+        # get the coordinates of the good matches
+        src_points = points[good.query_idx].reshape(-1, 1, 2)
+        dst_points = self.template_img.points[good.train_idx].reshape(-1, 1, 2)
 
         # compute the homography matrix
         try:
-            m, _ = cv2.findHomography(src_points, dst_points, cv2.RANSAC, 5.0)
+            m, mask = cv2.findHomography(src_points, dst_points, cv2.RANSAC, 5.0)
         except cv2.error:
             raise ValueError("Could not find a homography")
+        if m is None:
+            raise ValueError("Could not find a homography")
 
-        # apply the homography matrix
-        img_scan = cv2.warpPerspective(
+        inliers = mask.ravel().astype(bool)
+        reprojection_error = 0.0
+        if inliers.any():
+            projected = cv2.perspectiveTransform(src_points[inliers], m)
+            reprojection_error = float(
+                np.linalg.norm(projected - dst_points[inliers], axis=2).mean()
+            )
+        return AlignmentReport(
+            homography=m,
+            matches=len(good),
+            inliers=int(inliers.sum()),
+            reprojection_error=reprojection_error,
+        )
+
+    def _detect_coarse(
+        self, img: np.ndarray
+    ) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """Detects keypoints on a downscaled copy and maps them back to the original size."""
+        height, width = img.shape[:2]
+        template_area = self.template_img.width * self.template_img.height
+        scale = np.sqrt(self.coarse_area_ratio * template_area / (width * height))
+        if scale >= 1:
+            return self._detect(img)
+
+        small = cv2.resize(img, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        points, des = self._detect(small)
+        # scaling the points is the same as rescaling the matrix found on the small copy
+        points *= np.float32([width / small.shape[1], height / small.shape[0]])
+        return points, des
+
+    def _refine_homography(self, img: np.ndarray, m: np.ndarray) -> np.ndarray:
+        """Corrects the homography by matching the photo warped into the template frame."""
+        img_scan = self._warp(img, m)
+        try:
+            residual = self._find_homography(*self._detect(img_scan))
+        except ValueError:
+            return m
+        return residual.homography @ m
+
+    def _detect_features(
+        self, img: np.ndarray
+    ) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """Detects keypoints used to find the homography of the photo."""
+        if self.coarse_to_fine:
+            return self._detect_coarse(img)
+        return self._detect(img)
+
+    def _resize_matrix(self, img: np.ndarray) -> np.ndarray:
+        """Homography which only resizes the photo to the template size."""
+        height, width = img.shape[:2]
+        return np.diag(
+            [self.template_img.width / width, self.template_img.height / height, 1.0]
+        )
+
+    @cached_property
+    def _precheck_template(self) -> np.ndarray:
+        return _precheck_thumbnail(self.template_img.image)
+
+    def _looks_aligned(self, img: np.ndarray) -> bool:
+        """Cheap check whether the photo is an already aligned scan of the template."""
+        if self.precheck_threshold is None:
+            return False
+        height, width = img.shape[:2]
+        template_aspect = self.template_img.width / self.template_img.height
+        if abs(width / height - template_aspect) > PRECHECK_ASPECT_TOLERANCE:
+            return False
+        score = cv2.matchTemplate(
+            _precheck_thumbnail(img), self._precheck_template, cv2.TM_CCOEFF_NORMED
+        )[0, 0]
+        return score >= self.precheck_threshold
+
+    def _is_near_identity(self, img: np.ndarray, m: np.ndarray) -> bool:
+        if self.identity_tolerance is None:
+            return False
+        height, width = img.shape[:2]
+        corners = np.float32([[0, 0], [width, 0], [width, height], [0, height]])
+        corners = corners.reshape(-1, 1, 2)
+        found = cv2.perspectiveTransform(corners, m)
+        expected = cv2.perspectiveTransform(corners, self._resize_matrix(img))
+        return float(np.abs(found - expected).max()) <= self.identity_tolerance
+
+    def _estimate_homography(
+        self,
+        img: np.ndarray,
+        features: Optional[Tuple[np.ndarray, Optional[np.ndarray]]] = None,
+    ) -> AlignmentReport:
+        """
+        :param img: the photo
+        :param features: already detected keypoints and descriptors of the photo
+        """
+        if self._looks_aligned(img):
+            return AlignmentReport(
+                homography=self._resize_matrix(img),
+                is_identity=True,
+                skipped_features=True,
+            )
+
+        # detect the keypoints and compute the descriptors
+        if features is None:
+            features = self._detect_features(img)
+
+        report = self._find_homography(*features)
+        if self.refine:
+            report.homography = self._refine_homography(img, report.homography)
+        report.is_identity = self._is_near_identity(img, report.homography)
+        return report
+
+    def _warp(self, img: np.ndarray, m: np.ndarray) -> np.ndarray:
+        return cv2.warpPerspective(
             img, m, (self.template_img.width, self.template_img.height)
         )
 
+    def _apply(self, img: np.ndarray, report: AlignmentReport) -> np.ndarray:
+        if not report.is_identity:
+            return self._warp(img, report.homography)
+        size = (self.template_img.width, self.template_img.height)
+        if img.shape[1::-1] == size:
+            return img
+        return cv2.resize(img, size, interpolation=cv2.INTER_AREA)
+
+    def align(self, image_path: PathLike) -> Tuple[np.ndarray, AlignmentReport]:
+        """Returns the photo aligned to the template and the report of the alignment."""
+        img = read_image_from_pathlike(image_path)
+        report = self._estimate_homography(img)
+        return self._apply(img, report), report
+
+    def _write_result(
+        self,
+        img_scan: np.ndarray,
+        destination: Optional[PathLike] = None,
+        seek: bool = True,
+    ) -> Optional[Union[BinaryIO, DecodedImage]]:
+        if destination is None:
+            if self.lazy_encoding:
+                return DecodedImage(img_scan, codec=self.codec, quality=self.quality)
+            destination = BytesIO()
+
         if isinstance(destination, (str, Path)):
             cv2.imwrite(destination, img_scan)
             return
-        is_success, buffer = cv2.imencode(".jpg", img_scan)
-        destination.write(buffer)
+        destination.write(memoryview(encode_image(img_scan, self.codec, self.quality)))
         if seek:
             destination.seek(0)
         return destination
+
+    def __call__(
+        self,
+        image_path: PathLike,
+        destination: Optional[PathLike] = None,
+        seek: bool = True,
+    ) -> Optional[Union[BinaryIO, DecodedImage]]:
+        img_scan, _ = self.align(image_path)
+        return self._write_result(img_scan, destination, seek)
+
+    def process_many(
+        self,
+        images: Iterable[PathLike],
+        *,
+        max_workers: Optional[int] = None,
+        ordered: bool = True,
+        max_in_flight: Optional[int] = None,
+    ) -> Iterator[Tuple[int, Optional[Union[BinaryIO, DecodedImage]]]]:
+        """Processes photos in a thread pool and yields their indexes and results.
+
+        OpenCV releases the GIL while detecting, matching and warping, so the photos
+        are processed in parallel. Every thread has its own detector and matcher, and
+        OpenCV's own threads are limited, so that threads don't oversubscribe the cores.
+
+        :param images: photos to process, the iterable is consumed lazily
+        :param max_workers: number of threads. If None, number of cpus is used
+        :param ordered: yield results in the order of the photos or as they are completed
+        :param max_in_flight: maximum number of photos submitted and not yielded yet,
+            which bounds the memory used by decoded photos. If None, twice ``max_workers``
+        """
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        if max_in_flight is None:
+            max_in_flight = 2 * max_workers
+        self.warm_up()
+
+        num_threads = max(1, (os.cpu_count() or 1) // max_workers)
+        pending: Union[Deque[Future], Set[Future]] = deque() if ordered else set()
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            try:
+                for index, image in enumerate(images):
+                    future = executor.submit(
+                        self._process_indexed, index, image, num_threads
+                    )
+                    if ordered:
+                        pending.append(future)
+                    else:
+                        pending.add(future)
+                    if len(pending) >= max_in_flight:
+                        yield from self._pop_results(pending, ordered)
+                while pending:
+                    yield from self._pop_results(pending, ordered)
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def _process_indexed(
+        self, index: int, image: PathLike, num_threads: int
+    ) -> Tuple[int, Optional[Union[BinaryIO, DecodedImage]]]:
+        # the limit is held only while a photo is processed, so the caller's code
+        # between the yielded results runs with its own setting
+        with _limit_cv2_threads(num_threads):
+            return index, self(image)
+
+    @staticmethod
+    def _pop_results(
+        pending: Union[Deque[Future], Set[Future]], ordered: bool
+    ) -> Iterator[Tuple[int, Optional[Union[BinaryIO, DecodedImage]]]]:
+        if ordered:
+            yield pending.popleft().result()
+            return
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            pending.remove(future)
+            yield future.result()
@@ -0,0 +1,208 @@
+import abc
+from dataclasses import dataclass
+from typing import Optional, Sequence, Dict, Any
+
+import cv2
+import numpy as np
+
+FLANN_INDEX_LSH = 6
+
+
+@dataclass
+class Matches:
+    """Descriptor matches stored as parallel NumPy arrays."""
+
+    query_idx: np.ndarray
+    train_idx: np.ndarray
+    distance: np.ndarray
+
+    @classmethod
+    def empty(cls) -> "Matches":
+        return cls(
+            query_idx=np.empty(0, dtype=np.int32),
+            train_idx=np.empty(0, dtype=np.int32),
+            distance=np.empty(0, dtype=np.float32),
+        )
+
+    @classmethod
+    def from_dmatches(cls, matches: Sequence[cv2.DMatch]) -> "Matches":
+        if not matches:
+            return cls.empty()
+        array = np.array(
+            [(m.queryIdx, m.trainIdx, m.distance) for m in matches], dtype=np.float64
+        )
+        return cls(
+            query_idx=array[:, 0].astype(np.int32),
+            train_idx=array[:, 1].astype(np.int32),
+            distance=array[:, 2].astype(np.float32),
+        )
+
+    def __len__(self) -> int:
+        return len(self.distance)
+
+    def take(self, indices: np.ndarray) -> "Matches":
+        return Matches(
+            query_idx=self.query_idx[indices],
+            train_idx=self.train_idx[indices],
+            distance=self.distance[indices],
+        )
+
+    def best(self, percent: float) -> "Matches":
+        """Returns the best ``percent`` of the matches, ordered by distance.
+
+        Uses partial selection, so only the selected matches are sorted.
+        """
+        count = int(len(self) * (percent / 100))
+        if count <= 0:
+            return Matches.empty()
+        if count < len(self):
+            indices = np.argpartition(self.distance, count - 1)[:count]
+        else:
+            indices = np.arange(len(self))
+        indices = indices[np.argsort(self.distance[indices], kind="stable")]
+        return self.take(indices)
+
+
+class BaseDescriptorMatcher(abc.ABC):
+    """Base class for matchers of binary descriptors of a photo against the template."""
+
+    @abc.abstractmethod
+    def match(self, query_des: np.ndarray, train_des: np.ndarray) -> Matches:
+        raise NotImplementedError
+
+    def clone(self) -> "BaseDescriptorMatcher":
+        """Returns a matcher with the same parameters to be used from another thread.
+
+        Matchers without mutable state may return themselves.
+        """
+        return self
+
+
+class CV2DescriptorMatcher(BaseDescriptorMatcher):
+    """Base class for matchers backed by a cv2 matcher.
+
+    The cv2 matcher can't be pickled, so it's created lazily from the parameters
+    of the strategy and isn't pickled, which allows to send the strategy to worker processes.
+    """
+
+    def __init__(self, matcher: Optional[cv2.DescriptorMatcher] = None) -> None:
+        """
+        :param matcher: already created cv2 matcher. Such strategy can't be pickled
+        """
+        self._matcher = matcher
+        self._is_custom = matcher is not None
+
+    @abc.abstractmethod
+    def _create_matcher(self) -> cv2.DescriptorMatcher:
+        raise NotImplementedError
+
+    @property
+    def matcher(self) -> cv2.DescriptorMatcher:
+        if self._matcher is None:
+            self._matcher = self._create_matcher()
+        return self._matcher
+
+    def clone(self) -> "CV2DescriptorMatcher":
+        # cv2 matchers keep the train descriptors between calls, so they aren't shared
+        clone = object.__new__(type(self))
+        clone.__dict__.update(self.__dict__)
+        clone._matcher = self._matcher.clone(True) if self._is_custom else None
+        return clone
+
+    def __getstate__(self) -> Dict[str, Any]:
+        if self._is_custom:
+            raise TypeError(
+                f"{type(self).__name__} with a custom cv2 matcher can't be pickled, "
+                f"pass its parameters instead"
+            )
+        state = self.__dict__.copy()
+        state["_matcher"] = None
+        return state
+
+
+class BruteForceMatcher(CV2DescriptorMatcher):
+    """Exhaustive matcher with cross check. It's the most accurate and the slowest one."""
+
+    def __init__(
+        self,
+        norm_type: int = cv2.NORM_HAMMING,
+        cross_check: bool = True,
+        matcher: Optional[cv2.DescriptorMatcher] = None,
+    ) -> None:
+        """
+        :param norm_type: norm used to compare descriptors
+        :param cross_check: keep only matches which are the best in both directions
+        :param matcher: already created cv2 matcher. If passed, other params are ignored
+        """
+        super().__init__(matcher)
+        self.norm_type = norm_type
+        self.cross_check = cross_check
+
+    def _create_matcher(self) -> cv2.DescriptorMatcher:
+        return cv2.BFMatcher(self.norm_type, crossCheck=self.cross_check)
+
+    def match(self, query_des: np.ndarray, train_des: np.ndarray) -> Matches:
+        return Matches.from_dmatches(self.matcher.match(query_des, train_des))
+
+
+class FlannLshMatcher(CV2DescriptorMatcher):
+    """Approximate matcher based on the FLANN locality sensitive hashing index."""
+
+    def __init__(
+        self,
+        table_number: int = 6,
+        key_size: int = 12,
+        multi_probe_level: int = 1,
+        checks: int = 50,
+    ) -> None:
+        super().__init__()
+        self.table_number = table_number
+        self.key_size = key_size
+        self.multi_probe_level = multi_probe_level
+        self.checks = checks
+
+    def _create_matcher(self) -> cv2.DescriptorMatcher:
+        return cv2.FlannBasedMatcher(
+            {
+                "algorithm": FLANN_INDEX_LSH,
+                "table_number": self.table_number,
+                "key_size": self.key_size,
+                "multi_probe_level": self.multi_probe_level,
+            },
+            {"checks": self.checks},
+        )
+
+    def match(self, query_des: np.ndarray, train_des: np.ndarray) -> Matches:
+        # LSH may return no neighbours for some descriptors, so knnMatch with k=1 is used
+        knn_matches = self.matcher.knnMatch(query_des, train_des, k=1)
+        return Matches.from_dmatches([m[0] for m in knn_matches if m])
+
+
+class KnnRatioMatcher(CV2DescriptorMatcher):
+    """Matcher which keeps only matches passing the Lowe's ratio test."""
+
+    def __init__(
+        self,
+        ratio: float = 0.75,
+        matcher: Optional[cv2.DescriptorMatcher] = None,
+    ) -> None:
+        """
+        :param ratio: maximum ratio between the distances to the best and the second-best neighbour
+        :param matcher: cv2 matcher used to find two nearest neighbours.
+            If None, brute force hamming matcher will be used
+        """
+        super().__init__(matcher)
+        self.ratio = ratio
+
+    def _create_matcher(self) -> cv2.DescriptorMatcher:
+        return cv2.BFMatcher(cv2.NORM_HAMMING)
+
+    def match(self, query_des: np.ndarray, train_des: np.ndarray) -> Matches:
+        knn_matches = [
+            m for m in self.matcher.knnMatch(query_des, train_des, k=2) if len(m) == 2
+        ]
+        if not knn_matches:
+            return Matches.empty()
+        best = Matches.from_dmatches([m[0] for m in knn_matches])
+        second_distance = np.array([m[1].distance for m in knn_matches], np.float32)
+        return best.take(best.distance < self.ratio * second_distance)
@@ -0,0 +1,161 @@
+from dataclasses import dataclass
+from functools import cached_property
+from typing import BinaryIO, Optional, Sequence, Tuple, Union
+
+import cv2
+import numpy as np
+
+from document_recognition.backends.base import PathLike
+from document_recognition.image import DecodedImage
+from document_recognition.photo_pre_processors.base import BaseSyncPhotoPreProcessor
+from document_recognition.photo_pre_processors.synchronous.homography_cv2_ import (
+    CV2HomographyPhotoPreProcessorByTemplate,
+    read_image_from_pathlike,
+)
+from document_recognition.photo_pre_processors.synchronous.matchers_cv2_ import (
+    FLANN_INDEX_LSH,
+)
+from document_recognition.template import Template
+
+
+@dataclass
+class TemplateMatch:
+    """Result of the classification of a photo."""
+
+    index: int
+    pre_processor: CV2HomographyPhotoPreProcessorByTemplate
+    votes: np.ndarray
+    """number of photo descriptors voted for each template"""
+
+    @property
+    def template(self) -> Template:
+        return self.pre_processor.template
+
+
+class CV2TemplateRegistry(BaseSyncPhotoPreProcessor):
+    """Finds the template of the photo among several ones and aligns the photo to it.
+
+    Descriptors of all templates are put into one LSH index, so keypoints of the photo
+    are computed once and matched in one pass regardless of the number of templates.
+    Every photo descriptor passing the ratio test votes for the template of its nearest
+    neighbour. Only the winning template is used to find the homography.
+    """
+
+    def __init__(
+        self,
+        pre_processors: Sequence[CV2HomographyPhotoPreProcessorByTemplate],
+        *,
+        ratio: float = 0.8,
+        min_votes: int = 10,
+        table_number: int = 6,
+        key_size: int = 12,
+        multi_probe_level: int = 1,
+    ) -> None:
+        """
+        :param pre_processors: pre processors of the templates. Their detectors
+            must produce descriptors of the same size
+        :param ratio: maximum ratio between the distances to the best and the second-best
+            neighbour for a descriptor to vote
+        :param min_votes: minimum number of votes of the winning template
+        :param table_number: number of hash tables of the LSH index
+        :param key_size: size of the hash key in bits
+        :param multi_probe_level: number of neighbouring buckets to search
+        """
+        if not pre_processors:
+            raise ValueError("At least one pre processor must be provided")
+
+        self.pre_processors = list(pre_processors)
+        self.ratio = ratio
+        self.min_votes = min_votes
+        self.table_number = table_number
+        self.key_size = key_size
+        self.multi_probe_level = multi_probe_level
+        # keypoints are detected once, so they are detected for the largest template
+        self._detecting_pre_processor = max(
+            self.pre_processors,
+            key=lambda p: p.template_img.width * p.template_img.height,
+        )
+
+    @cached_property
+    def _labels(self) -> np.ndarray:
+        """Index of the template of every descriptor in the combined index."""
+        return np.concatenate(
+            [
+                np.full(len(p.template_img.descriptors), i, dtype=np.int32)
+                for i, p in enumerate(self.pre_processors)
+            ]
+        )
+
+    @cached_property
+    def _index(self) -> cv2.DescriptorMatcher:
+        descriptors = [p.template_img.descriptors for p in self.pre_processors]
+        if len({d.shape[1] for d in descriptors}) != 1:
+            raise ValueError("Descriptors of all templates must have the same size")
+
+        index = cv2.FlannBasedMatcher(
+            {
+                "algorithm": FLANN_INDEX_LSH,
+                "table_number": self.table_number,
+                "key_size": self.key_size,
+                "multi_probe_level": self.multi_probe_level,
+            },
+            {},
+        )
+        index.add([np.ascontiguousarray(np.concatenate(descriptors))])
+        index.train()
+        return index
+
+    def warm_up(self) -> None:
+        """Computes the template features and builds the combined index."""
+        self._index  # noqa
+
+    def _classify(self, des: Optional[np.ndarray]) -> TemplateMatch:
+        votes = np.zeros(len(self.pre_processors), dtype=np.int64)
+        if des is not None and len(des):
+            knn_matches = [m for m in self._index.knnMatch(des, k=2) if len(m) == 2]
+            if knn_matches:
+                distances = np.array(
+                    [(m[0].distance, m[1].distance) for m in knn_matches], np.float32
+                )
+                train_idx = np.array([m[0].trainIdx for m in knn_matches], np.int64)
+                passed = distances[:, 0] < self.ratio * distances[:, 1]
+                votes = np.bincount(
+                    self._labels[train_idx[passed]], minlength=len(votes)
+                )
+
+        index = int(np.argmax(votes))
+        if votes[index] < self.min_votes:
+            raise ValueError("Could not find the template of the photo")
+        return TemplateMatch(
+            index=index, pre_processor=self.pre_processors[index], votes=votes
+        )
+
+    def classify(self, image_path: PathLike) -> TemplateMatch:
+        img = read_image_from_pathlike(image_path)
+        _, des = self._detecting_pre_processor._detect_features(img)
+        return self._classify(des)
+
+    def pre_process(
+        self,
+        image_path: PathLike,
+        destination: Optional[PathLike] = None,
+        seek: bool = True,
+    ) -> Tuple[TemplateMatch, Optional[Union[BinaryIO, DecodedImage]]]:
+        """Returns the found template and the photo aligned to it."""
+        img = read_image_from_pathlike(image_path)
+        features = self._detecting_pre_processor._detect_features(img)
+        match = self._classify(features[1])
+
+        pre_processor = match.pre_processor
+        report = pre_processor._estimate_homography(img, features=features)
+        img_scan = pre_processor._apply(img, report)
+        return match, pre_processor._write_result(img_scan, destination, seek)
+
+    def __call__(
+        self,
+        image_path: PathLike,
+        destination: Optional[PathLike] = None,
+        seek: bool = True,
+    ) -> Optional[Union[BinaryIO, DecodedImage]]:
+        _, result = self.pre_process(image_path, destination, seek)
+        return result
@@ -0,0 +1,187 @@
+import asyncio
+from asyncio import get_running_loop
+from concurrent.futures import Executor, ProcessPoolExecutor
+from multiprocessing.context import BaseContext
+from typing import Any, Iterable, List, Optional, Set, Tuple
+
+from document_recognition.backends.base import ApiResponse
+from document_recognition.recognizers.base import (
+    BaseAsyncRecognizer,
+    BaseSyncRecognizer,
+    T,
+)
+
+# recognizer of the current worker process, set once by the pool initializer
+_worker_recognizer: Optional[BaseSyncRecognizer] = None
+
+
+def _init_worker(recognizer: BaseSyncRecognizer) -> None:
+    global _worker_recognizer
+    _worker_recognizer = recognizer
+
+
+def _recognize_batch_in_worker(responses: List[ApiResponse]) -> List[Any]:
+    assert _worker_recognizer is not None, "worker isn't initialized"
+    return _worker_recognizer.recognize_batch(responses)
+
+
+class AsyncRecognizerWrapper(BaseAsyncRecognizer[T]):
+    """Wrapper for sync recognizer that allows to use it in async context.
+
+    Responses are micro-batched: calls made within ``linger`` seconds of each other
+    are recognized by one :meth:`BaseSyncRecognizer.recognize_batch` call in the executor,
+    so small documents don't pay for a round-trip each. If the batch fails,
+    its responses are recognized one by one, so only the calls of the bad
+    responses raise.
+    """
+
+    def __init__(
+        self,
+        recognizer: BaseSyncRecognizer[T],
+        /,
+        executor: Optional[Executor] = None,
+        max_batch_size: int = 64,
+        linger: float = 0.002,
+    ) -> None:
+        """
+        :param recognizer: sync recognizer to wrap
+        :param executor: executor to run the recognizer in. If None, default executor will be used
+        :param max_batch_size: maximum number of responses recognized in one round-trip
+        :param linger: seconds to wait for more responses before sending a batch
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be positive")
+        self.recognizer = recognizer
+        self.executor = executor
+        self.max_batch_size = max_batch_size
+        self.linger = linger
+        self._pending: List[Tuple[ApiResponse, "asyncio.Future[T]"]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set["asyncio.Task[None]"] = set()
+
+    def _run(self, responses: List[ApiResponse]) -> "asyncio.Future[List[T]]":
+        return get_running_loop().run_in_executor(
+            self.executor, self.recognizer.recognize_batch, responses
+        )
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch = [(r, f) for r, f in self._pending if not f.cancelled()]
+        self._pending = []
+        if not batch:
+            return
+        task = asyncio.ensure_future(self._recognize(batch))
+        # the loop keeps only weak references to tasks
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _recognize_one(self, response: ApiResponse) -> T:
+        documents = await self._run([response])
+        if len(documents) != 1:
+            raise RuntimeError(
+                f"Recognizer returned {len(documents)} documents for one response"
+            )
+        return documents[0]
+
+    async def _recognize_batch(self, responses: List[ApiResponse]) -> List[Any]:
+        """Returns documents of the responses, or the error of every bad response."""
+        try:
+            documents = await self._run(responses)
+            if len(documents) != len(responses):
+                raise RuntimeError(
+                    f"Recognizer returned {len(documents)} documents "
+                    f"for {len(responses)} responses"
+                )
+            return documents
+        except Exception as e:
+            if len(responses) == 1:
+                return [e]
+        # one bad response shouldn't fail the others, so they are retried one by one
+        return await asyncio.gather(
+            *(self._recognize_one(response) for response in responses),
+            return_exceptions=True,
+        )
+
+    async def _recognize(
+        self, batch: List[Tuple[ApiResponse, "asyncio.Future[T]"]]
+    ) -> None:
+        try:
+            documents = await self._recognize_batch([response for response, _ in batch])
+        except asyncio.CancelledError:
+            for _, future in batch:
+                future.cancel()
+            raise
+        for (_, future), document in zip(batch, documents):
+            if future.done():
+                continue
+            if isinstance(document, BaseException):
+                future.set_exception(document)
+            else:
+                future.set_result(document)
+
+    async def __call__(self, response: ApiResponse) -> T:
+        loop = get_running_loop()
+        future: "asyncio.Future[T]" = loop.create_future()
+        self._pending.append((response, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.linger, self._flush)
+        return await future
+
+    async def recognize_batch(self, responses: Iterable[ApiResponse]) -> List[T]:
+        """Recognizes the responses in batches of ``max_batch_size``, running concurrently."""
+        responses = list(responses)
+        batches = await asyncio.gather(
+            *(
+                self._run(responses[i : i + self.max_batch_size])
+                for i in range(0, len(responses), self.max_batch_size)
+            )
+        )
+        return [document for batch in batches for document in batch]
+
+
+class ProcessPoolRecognizer(AsyncRecognizerWrapper[T]):
+    """Runs a synchronous recognizer in a process pool, so documents are recognized on all cores.
+
+    The recognizer, with its compiled template, is pickled once per worker,
+    when the worker starts, and only batches of responses and documents are sent.
+    """
+
+    def __init__(
+        self,
+        recognizer: BaseSyncRecognizer[T],
+        /,
+        max_workers: Optional[int] = None,
+        mp_context: Optional[BaseContext] = None,
+        max_batch_size: int = 64,
+        linger: float = 0.002,
+    ) -> None:
+        """
+        :param recognizer: picklable sync recognizer to run in workers
+        :param max_workers: number of worker processes. If None, number of cpus is used
+        :param mp_context: multiprocessing context used to start workers
+        :param max_batch_size: maximum number of responses sent to a worker at once
+        :param linger: seconds to wait for more responses before sending a batch
+        """
+        super().__init__(
+            recognizer,
+            executor=ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=mp_context,
+                initializer=_init_worker,
+                initargs=(recognizer,),
+            ),
+            max_batch_size=max_batch_size,
+            linger=linger,
+        )
+
+    def _run(self, responses: List[ApiResponse]) -> "asyncio.Future[List[T]]":
+        return get_running_loop().run_in_executor(
+            self.executor, _recognize_batch_in_worker, responses
+        )
+
+    def shutdown(self, wait: bool = True) -> None:
+        self.executor.shutdown(wait=wait)
@@ -1,5 +1,6 @@
 import abc
-from typing import TypeVar, Generic, Union, Callable, Awaitable
+import asyncio
+from typing import TypeVar, Generic, Union, Callable, Awaitable, Iterable, List
 
 from document_recognition.backends.base import ApiResponse
 
@@ -22,6 +23,13 @@ class BaseSyncRecognizer(abc.ABC, Generic[T]):
     def __call__(self, response: ApiResponse) -> T:
         raise NotImplementedError
 
+    def recognize_batch(self, responses: Iterable[ApiResponse]) -> List[T]:
+        """Recognizes documents of many responses.
+
+        Recognizers that can process responses together should override it.
+        """
+        return [self(response) for response in responses]
+
 
 class BaseAsyncRecognizer(abc.ABC, Generic[T]):
     """Base class for all asynchronous recognizers, which are used to recognize documents.
@@ -32,3 +40,7 @@ class BaseAsyncRecognizer(abc.ABC, Generic[T]):
     @abc.abstractmethod
     async def __call__(self, response: ApiResponse) -> T:
         raise NotImplementedError
+
+    async def recognize_batch(self, responses: Iterable[ApiResponse]) -> List[T]:
+        """Recognizes documents of many responses concurrently."""
+        return list(await asyncio.gather(*(self(response) for response in responses)))
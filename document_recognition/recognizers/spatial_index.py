@@ -0,0 +1,114 @@
+from bisect import bisect_left
+from typing import Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+from document_recognition.template import Data
+
+
+def _axis_masks(
+    intervals: Sequence[Tuple[float, float]],
+) -> Tuple[List[float], List[int]]:
+    """Splits the axis by the edges of the intervals and returns the edges and
+    a bit mask of the intervals covering every slot.
+
+    Slot ``2 * i + 1`` is the edge ``i`` itself and slot ``2 * i`` is the open
+    range between the edges ``i - 1`` and ``i``, so inclusive bounds are kept exact.
+    """
+    edges = sorted({bound for interval in intervals for bound in interval})
+    masks = [0] * (2 * len(edges) + 1)
+    for i, (low, high) in enumerate(intervals):
+        bit = 1 << i
+        for slot in range(
+            2 * bisect_left(edges, low) + 1, 2 * bisect_left(edges, high) + 2
+        ):
+            masks[slot] |= bit
+    return edges, masks
+
+
+def _slot(edges: List[float], value: float) -> int:
+    i = bisect_left(edges, value)
+    if i < len(edges) and edges[i] == value:
+        return 2 * i + 1
+    return 2 * i
+
+
+class TemplateGridIndex:
+    """Grid over the edges of the template fields, compiled once per template.
+
+    Every axis is split by the field edges, and every slot keeps a bit mask of the
+    fields covering it, so the fields of a point are found by two binary searches and
+    a bitwise and, without scanning all fields.
+    """
+
+    def __init__(self, objects: Sequence[Data]) -> None:
+        self.objects = list(objects)
+        self._x_edges, self._x_masks = _axis_masks(
+            [(o.coordinates.x_min, o.coordinates.x_max) for o in self.objects]
+        )
+        self._y_edges, self._y_masks = _axis_masks(
+            [(o.coordinates.y_min, o.coordinates.y_max) for o in self.objects]
+        )
+        # x_min, x_max, y_min, y_max of every field, for vectorized assignment
+        self._boxes = np.array(
+            [
+                (
+                    o.coordinates.x_min,
+                    o.coordinates.x_max,
+                    o.coordinates.y_min,
+                    o.coordinates.y_max,
+                )
+                for o in self.objects
+            ],
+            dtype=np.float64,
+        ).reshape(-1, 4)
+
+    def fields_mask(self, x: float, y: float) -> int:
+        """Returns a bit mask of the indexes of the fields containing the point."""
+        return (
+            self._x_masks[_slot(self._x_edges, x)]
+            & self._y_masks[_slot(self._y_edges, y)]
+        )
+
+    def assign(self, text_infos: Iterable[Tuple[str, float, float]]) -> List[List[str]]:
+        """Returns the texts of every field, in the order of the template objects.
+
+        :param text_infos: texts and coordinates of their centers
+        """
+        texts: List[List[str]] = [[] for _ in self.objects]
+        for text, x_center, y_center in text_infos:
+            mask = self.fields_mask(x_center, y_center)
+            while mask:
+                lowest = mask & -mask
+                texts[lowest.bit_length() - 1].append(text)
+                mask ^= lowest
+        return texts
+
+    def assign_many(
+        self, texts: Sequence[str], centers: np.ndarray, offsets: np.ndarray
+    ) -> List[List[List[str]]]:
+        """Assigns the words of many documents at once.
+
+        Words of all documents are stacked, so every field is compared with all of them
+        by a few vectorized comparisons, and the words of the field are split back
+        by documents with a binary search.
+
+        :param texts: words of all documents, one after another
+        :param centers: ``(n, 2)`` array of the centers of the words
+        :param offsets: index of the first word of every document and the total number
+            of words at the end
+        :return: texts of every field of every document
+        """
+        offsets = np.asarray(offsets, dtype=np.intp)
+        x = centers[:, 0]
+        y = centers[:, 1]
+        result: List[List[List[str]]] = [[] for _ in range(len(offsets) - 1)]
+        for x_min, x_max, y_min, y_max in self._boxes:
+            inside = np.flatnonzero(
+                (x >= x_min) & (x <= x_max) & (y >= y_min) & (y <= y_max)
+            )
+            bounds = np.searchsorted(inside, offsets).tolist()
+            inside = inside.tolist()
+            for document, start, end in zip(result, bounds, bounds[1:]):
+                document.append([texts[i] for i in inside[start:end]])
+        return result
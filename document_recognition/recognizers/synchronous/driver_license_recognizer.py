@@ -1,16 +1,19 @@
 import re
-from typing import List, Tuple, Optional, Callable
+from typing import Optional, Callable
 
-from document_recognition.backends.base import TextAnnotations
 from document_recognition.entities.drive_license import DriverLicense
 from document_recognition.recognizers.base import BaseSyncRecognizer, ApiResponse, T
+from document_recognition.recognizers.synchronous.template_recognizer import TemplateRecognizer
 
 from document_recognition.template import Template
-from document_recognition.utils import type_or_none, int_or_none
+from document_recognition.utils import int_or_none
+
+
+ENGLISH_LETTERS_RE = re.compile(r"[a-zA-Z]")
 
 
 def strip_english_letters_and_whitespaces(text: str) -> str:
-    return re.sub(r"[a-zA-Z]", "", text).strip()
+    return ENGLISH_LETTERS_RE.sub("", text).strip()
 
 
 class DriverLicenseRecognizerByRegularExpression(BaseSyncRecognizer[DriverLicense]):
@@ -32,50 +35,25 @@ class DriverLicenseRecognizerByRegularExpression(BaseSyncRecognizer[DriverLicens
         )
 
 
-class DriverLicenseRecognizerByTemplate(BaseSyncRecognizer[DriverLicense]):
+class DriverLicenseRecognizerByTemplate(TemplateRecognizer[DriverLicense]):
     def __init__(
             self,
             template: Template,
             *,
             separator: str = " ",
             strip_characters: Callable[[str], str] = strip_english_letters_and_whitespaces,
+            batch_size: int = 10000,
     ) -> None:
-        self.template = template
-        self.separator = separator
-        self.strip_characters = strip_characters
-
-    @staticmethod
-    def _find_average_coordinates(
-            annotations: List[TextAnnotations],
-    ) -> List[Tuple[str, float, float]]:
-        text_infos = []
-        for word in annotations:
-            xmin, ymin = min((vertice.x, vertice.y) for vertice in word.vertices)
-            xmax, ymax = max((vertice.x, vertice.y) for vertice in word.vertices)
-
-            xcenter = (xmin + xmax) / 2
-            ycenter = (ymin + ymax) / 2
-
-            text_infos.append((word.text, xcenter, ycenter))
-        return text_infos
-
-    def __call__(self, response: ApiResponse) -> T:
-        """Parse the response and return DriverLicense object."""
-        text_infos = self._find_average_coordinates(response.text_annotations)
-
-        result_dict = {}
-        for template_object in self.template.objects:
-            name = template_object.name
-            coordinates = template_object.coordinates
-            texts = [
-                text
-                for text, x_center, y_center in text_infos
-                if coordinates.x_min <= x_center <= coordinates.x_max
-                if coordinates.y_min <= y_center <= coordinates.y_max
-            ]
-            result_dict[name] = type_or_none(
-                self.strip_characters(self.separator.join(texts)),
-                type_=template_object.type,
-            )
-
-        return DriverLicense(**result_dict)
+        """
+        :param template: template of the driver license
+        :param separator: separator of the words of a field
+        :param strip_characters: function applied to the joined words of a field
+        :param batch_size: number of responses stacked together by :meth:`recognize_batch`
+        """
+        super().__init__(
+            template,
+            DriverLicense,
+            separator=separator,
+            strip_characters=strip_characters,
+            batch_size=batch_size,
+        )
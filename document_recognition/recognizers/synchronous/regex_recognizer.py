@@ -0,0 +1,124 @@
+import re
+from typing import Any, Callable, Dict, List, Mapping, Optional, Pattern, Tuple
+
+from document_recognition.recognizers.base import BaseSyncRecognizer, ApiResponse, T
+from document_recognition.recognizers.template_plan import make_constructor
+
+
+class MultiPatternRecognizer(BaseSyncRecognizer[T]):
+    """Finds all fields of an entity in one scan of :attr:`ApiResponse.text`.
+
+    Patterns of the fields are combined into one alternation with a named group per field.
+    Overlapping matches are resolved deterministically:
+
+    - the leftmost match wins, and at the same position the field declared first wins;
+    - matches don't overlap, the scan continues after the end of the previous match;
+    - a field takes its first match, and then it's removed from the alternation,
+      so its later matches don't hide other fields.
+
+    Fields which aren't found are None.
+    """
+
+    def __init__(
+        self,
+        entity: Callable[..., T],
+        patterns: Mapping[str, str],
+        *,
+        post_processors: Optional[Mapping[str, Callable[[str], Any]]] = None,
+        flags: int = 0,
+    ) -> None:
+        """
+        :param entity: class of the entity, which is called with the fields as keyword arguments
+        :param patterns: regular expression of every field, in the order of priority
+        :param post_processors: functions applied to the matched text of the fields
+        :param flags: flags of the combined regular expression
+        """
+        if not patterns:
+            raise ValueError("At least one pattern must be provided")
+        post_processors = post_processors or {}
+        unknown = set(post_processors) - set(patterns)
+        if unknown:
+            raise ValueError(f"Post processors of unknown fields: {sorted(unknown)}")
+
+        self.entity = entity
+        self.patterns = dict(patterns)
+        self.flags = flags
+        self._names = list(self.patterns)
+        self._groups = {f"_field_{i}": i for i in range(len(self._names))}
+        self._post_processors = [post_processors.get(name) for name in self._names]
+        self._construct = make_constructor(entity, self._names)
+        # combined patterns of the fields which are still not found, by their bit mask
+        self._combined: Dict[int, Tuple[Pattern[str], Pattern[str]]] = {}
+        self._all_fields = (1 << len(self._names)) - 1
+        self._compile(self._all_fields)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # the generated constructor can't be pickled, so the recognizer is created again
+        return {
+            "entity": self.entity,
+            "patterns": self.patterns,
+            "post_processors": {
+                name: post_processor
+                for name, post_processor in zip(self._names, self._post_processors)
+                if post_processor is not None
+            },
+            "flags": self.flags,
+        }
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__init__(  # type: ignore[misc]
+            state["entity"],
+            state["patterns"],
+            post_processors=state["post_processors"],
+            flags=state["flags"],
+        )
+
+    def _compile(self, fields: int) -> Tuple[Pattern[str], Pattern[str]]:
+        """Returns the alternations of the fields to search and to name the match.
+
+        Capturing groups stop ``re`` from skipping positions by the first characters
+        of the alternatives, so the position of the next match is searched without
+        them and only the match itself is repeated with the named groups.
+        """
+        combined = self._combined.get(fields)
+        if combined is None:
+            indexes = [i for i in range(len(self._names)) if fields >> i & 1]
+            search = "|".join(f"(?:{self.patterns[self._names[i]]})" for i in indexes)
+            named = "|".join(
+                f"(?P<_field_{i}>{self.patterns[self._names[i]]})" for i in indexes
+            )
+            combined = self._combined[fields] = (
+                re.compile(search, self.flags),
+                re.compile(named, self.flags),
+            )
+        return combined
+
+    def find(self, text: str) -> List[Optional[str]]:
+        """Returns the matched text of every field."""
+        found: List[Optional[str]] = [None] * len(self._names)
+        fields = self._all_fields
+        position = 0
+        while fields and position <= len(text):
+            search, named = self._compile(fields)
+            match = search.search(text, position)
+            if match is None:
+                break
+            # the same alternatives in the same order match at the same position
+            match = named.match(text, match.start())
+            i = self._groups[match.lastgroup]
+            found[i] = match.group(match.lastgroup)
+            fields &= ~(1 << i)
+            # an empty match must not stop the scan
+            position = max(match.end(), match.start() + 1)
+        return found
+
+    def parse(self, text: str) -> T:
+        values = []
+        for value, post_processor in zip(self.find(text), self._post_processors):
+            if value is not None and post_processor is not None:
+                value = post_processor(value)
+            values.append(value)
+        return self._construct(values)
+
+    def __call__(self, response: ApiResponse) -> T:
+        return self.parse(response.text or "")
@@ -0,0 +1,188 @@
+import dataclasses
+from functools import lru_cache
+from typing import Any, Callable, Hashable, Iterable, List, Tuple, Type
+
+import numpy as np
+
+from document_recognition.backends.base import (
+    ColumnarApiResponse,
+    TextAnnotations,
+    vertices_centers,
+)
+from document_recognition.recognizers.base import BaseSyncRecognizer, ApiResponse, T
+from document_recognition.recognizers.template_plan import (
+    FieldFailure,
+    TemplateParsePlan,
+)
+from document_recognition.template import Template
+
+
+class _PlanKey:
+    """Hashable key of a parse plan, equal for templates with the same fields."""
+
+    __slots__ = ("template", "entity", "separator", "strip_characters", "_key")
+
+    def __init__(
+        self,
+        template: Template,
+        entity: Type[Any],
+        separator: str,
+        strip_characters: Callable[[str], str],
+    ) -> None:
+        self.template = template
+        self.entity = entity
+        self.separator = separator
+        self.strip_characters = strip_characters
+        self._key: Hashable = (
+            entity,
+            separator,
+            strip_characters,
+            tuple(
+                (o.name, o.type, dataclasses.astuple(o.coordinates))
+                for o in template.objects
+            ),
+        )
+
+    def __hash__(self) -> int:
+        return hash(self._key)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, _PlanKey) and self._key == other._key
+
+
+@lru_cache(maxsize=128)
+def _compile_plan(key: _PlanKey) -> TemplateParsePlan:
+    return TemplateParsePlan(
+        key.template,
+        key.entity,
+        separator=key.separator,
+        strip_characters=key.strip_characters,
+    )
+
+
+def validate_template_fields(template: Template, entity: Type[Any]) -> None:
+    """Checks that every template object is an init field of the entity dataclass."""
+    if not (isinstance(entity, type) and dataclasses.is_dataclass(entity)):
+        raise TypeError(f"{entity!r} isn't a dataclass")
+    fields = {field.name for field in dataclasses.fields(entity) if field.init}
+    unknown = [o.name for o in template.objects if o.name not in fields]
+    if unknown:
+        raise ValueError(
+            f"Template objects {unknown} aren't fields of {entity.__name__}"
+        )
+
+
+class TemplateRecognizer(BaseSyncRecognizer[T]):
+    """Recognizes any dataclass entity by the coordinates of its fields in a template.
+
+    The template is compiled into a parse plan when the recognizer is created:
+    the grid index of the fields, their converters and a constructor of the entity
+    with the fields written as keyword arguments. Plans are cached, so recognizers
+    created for the same template and entity share them.
+    """
+
+    def __init__(
+        self,
+        template: Template,
+        entity: Type[T],
+        *,
+        separator: str = " ",
+        strip_characters: Callable[[str], str] = str.strip,
+        batch_size: int = 10000,
+    ) -> None:
+        """
+        :param template: template of the document
+        :param entity: dataclass of the document. Names of the template objects
+            must be its fields
+        :param separator: separator of the words of a field
+        :param strip_characters: function applied to the joined words of a field
+        :param batch_size: number of responses stacked together by :meth:`recognize_batch`
+        """
+        validate_template_fields(template, entity)
+        self.template = template
+        self.entity = entity
+        self.separator = separator
+        self.strip_characters = strip_characters
+        self.batch_size = batch_size
+        self.plan: TemplateParsePlan[T] = _compile_plan(
+            _PlanKey(template, entity, separator, strip_characters)
+        )
+
+    @staticmethod
+    def _find_average_coordinates(
+        annotations: List[TextAnnotations],
+    ) -> List[Tuple[str, float, float]]:
+        text_infos = []
+        for word in annotations:
+            xmin, ymin = min((vertice.x, vertice.y) for vertice in word.vertices)
+            xmax, ymax = max((vertice.x, vertice.y) for vertice in word.vertices)
+
+            xcenter = (xmin + xmax) / 2
+            ycenter = (ymin + ymax) / 2
+
+            text_infos.append((word.text, xcenter, ycenter))
+        return text_infos
+
+    @staticmethod
+    def _find_average_coordinates_columnar(
+        response: ColumnarApiResponse,
+    ) -> List[Tuple[str, float, float]]:
+        centers = response.centers()
+        return list(zip(response.texts, centers[:, 0].tolist(), centers[:, 1].tolist()))
+
+    def parse(self, response: ApiResponse) -> Tuple[T, List[FieldFailure]]:
+        """Parse the response and return the entity and failed conversions."""
+        if isinstance(response, ColumnarApiResponse):
+            text_infos = self._find_average_coordinates_columnar(response)
+        else:
+            text_infos = self._find_average_coordinates(response.text_annotations)
+        return self.plan.execute(text_infos)
+
+    def __call__(self, response: ApiResponse) -> T:
+        """Parse the response and return the entity."""
+        document, _ = self.parse(response)
+        return document
+
+    def _parse_stacked(
+        self,
+        responses: List[ApiResponse],
+    ) -> List[Tuple[T, List[FieldFailure]]]:
+        texts: List[str] = []
+        vertices = []
+        offsets = [0]
+        for response in responses:
+            if not isinstance(response, ColumnarApiResponse):
+                response = ColumnarApiResponse.from_text_annotations(
+                    response.text_annotations
+                )
+            texts.extend(response.texts)
+            vertices.append(response.vertices)
+            offsets.append(len(texts))
+
+        # pad vertices of all responses to the same number, so centers are found at once
+        vertex_count = max(v.shape[1] for v in vertices)
+        stacked = np.full((len(texts), vertex_count, 2), np.nan)
+        for start, end, v in zip(offsets, offsets[1:], vertices):
+            stacked[start:end, : v.shape[1]] = v
+        return self.plan.execute_many(
+            texts, vertices_centers(stacked), np.array(offsets)
+        )
+
+    def parse_batch(
+        self,
+        responses: Iterable[ApiResponse],
+    ) -> List[Tuple[T, List[FieldFailure]]]:
+        """Parse many responses, stacking words of ``batch_size`` responses together."""
+        results = []
+        batch = []
+        for response in responses:
+            batch.append(response)
+            if len(batch) == self.batch_size:
+                results.extend(self._parse_stacked(batch))
+                batch = []
+        if batch:
+            results.extend(self._parse_stacked(batch))
+        return results
+
+    def recognize_batch(self, responses: Iterable[ApiResponse]) -> List[T]:
+        return [document for document, _ in self.parse_batch(responses)]
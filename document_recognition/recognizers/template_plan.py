@@ -0,0 +1,181 @@
+import dataclasses
+import keyword
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generic,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+import numpy as np
+
+from document_recognition.recognizers.base import T
+from document_recognition.recognizers.spatial_index import TemplateGridIndex
+from document_recognition.template import Template
+from document_recognition.utils import CONVERTERS
+
+
+@dataclasses.dataclass
+class FieldFailure:
+    """Text of a field which couldn't be converted to the type of the field."""
+
+    name: str
+    type: str
+    text: str
+
+
+def make_constructor(
+    entity: Callable[..., T],
+    names: Sequence[str],
+    constants: Optional[Dict[str, Any]] = None,
+) -> Callable[[Sequence[Any]], T]:
+    """Generates a function calling the entity with the values as keyword arguments.
+
+    The keywords are written into the code of the function, so no dict is built per call.
+    Names which are python keywords are passed through a dict. If a name is repeated,
+    the last value is used.
+
+    :param constants: keyword arguments passed to the entity on every call
+    """
+    last_index = {name: i for i, name in enumerate(names)}
+    arguments = []
+    keyword_arguments = []
+    for name, i in last_index.items():
+        if not name.isidentifier():
+            raise ValueError(f"Field name {name!r} isn't a valid identifier")
+        if keyword.iskeyword(name):
+            keyword_arguments.append(f"{name!r}: values[{i}]")
+        else:
+            arguments.append(f"{name}=values[{i}]")
+    namespace = {"entity": entity}
+    for i, (name, value) in enumerate((constants or {}).items()):
+        namespace[f"constant_{i}"] = value
+        arguments.append(f"{name}=constant_{i}")
+    if keyword_arguments:
+        arguments.append(f"**{{{', '.join(keyword_arguments)}}}")
+    exec(
+        f"def construct(values):\n    return entity({', '.join(arguments)})\n",
+        namespace,
+    )
+    return namespace["construct"]
+
+
+def _normalized(
+    converter: Callable[[str], Any], normalize: Callable[[Any], Any]
+) -> Callable[[str], Any]:
+    def convert(text: str) -> Any:
+        value = converter(text)
+        return normalize(value) if value else value
+
+    return convert
+
+
+class TemplateParsePlan(Generic[T]):
+    """Template compiled once into the steps of parsing a response.
+
+    Fields are found by a grid index, their converters are resolved in advance
+    and the entity is built by a generated constructor. Conversion failures
+    are collected instead of being raised.
+    """
+
+    def __init__(
+        self,
+        template: Template,
+        entity: Callable[..., T],
+        *,
+        separator: str = " ",
+        strip_characters: Callable[[str], str] = str.strip,
+    ) -> None:
+        """
+        :param template: template to compile
+        :param entity: class of the entity, which is called with the fields as keyword arguments
+        :param separator: separator of the words of a field
+        :param strip_characters: function applied to the joined words of a field
+        """
+        self.template = template
+        self.entity = entity
+        self.separator = separator
+        self.strip_characters = strip_characters
+
+        # entities declaring NORMALIZERS get their fields normalized by the converters,
+        # and are told so, so they don't normalize them again
+        normalizers = getattr(entity, "NORMALIZERS", None)
+
+        self._index = TemplateGridIndex(template.objects)
+        self._fields = []
+        for template_object in template.objects:
+            if template_object.type not in CONVERTERS:
+                raise ValueError(
+                    f"Unknown type {template_object.type!r} of field {template_object.name!r}"
+                )
+            converter = CONVERTERS[template_object.type]
+            if normalizers and template_object.name in normalizers:
+                converter = _normalized(converter, normalizers[template_object.name])
+            self._fields.append((template_object.name, template_object.type, converter))
+        self._construct = make_constructor(
+            entity,
+            [template_object.name for template_object in template.objects],
+            {"normalized": True} if normalizers is not None else None,
+        )
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # the generated constructor can't be pickled, so the plan is compiled again
+        return {
+            "template": self.template,
+            "entity": self.entity,
+            "separator": self.separator,
+            "strip_characters": self.strip_characters,
+        }
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__init__(  # type: ignore[misc]
+            state["template"],
+            state["entity"],
+            separator=state["separator"],
+            strip_characters=state["strip_characters"],
+        )
+
+    def convert(
+        self, texts_of_objects: List[List[str]]
+    ) -> Tuple[T, List[FieldFailure]]:
+        """Converts the words of every template object and builds the entity."""
+        join = self.separator.join
+        strip_characters = self.strip_characters
+        values = []
+        failures = []
+        for (name, type_, converter), texts in zip(self._fields, texts_of_objects):
+            text = strip_characters(join(texts))
+            value = converter(text)
+            if value is None and text:
+                failures.append(FieldFailure(name=name, type=type_, text=text))
+            values.append(value)
+        return self._construct(values), failures
+
+    def execute(
+        self, text_infos: Iterable[Tuple[str, float, float]]
+    ) -> Tuple[T, List[FieldFailure]]:
+        """Returns the entity and the fields which couldn't be converted.
+
+        :param text_infos: texts and coordinates of their centers
+        """
+        return self.convert(self._index.assign(text_infos))
+
+    def execute_many(
+        self, texts: Sequence[str], centers: np.ndarray, offsets: np.ndarray
+    ) -> List[Tuple[T, List[FieldFailure]]]:
+        """Returns the entities of many documents, whose words are stacked together.
+
+        :param texts: words of all documents, one after another
+        :param centers: ``(n, 2)`` array of the centers of the words
+        :param offsets: index of the first word of every document and the total number
+            of words at the end
+        """
+        return [
+            self.convert(texts_of_objects)
+            for texts_of_objects in self._index.assign_many(texts, centers, offsets)
+        ]
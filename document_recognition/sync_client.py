@@ -1,6 +1,7 @@
 from typing import Optional
 
 from document_recognition.backends.base import BaseSyncBackend, PathLike
+from document_recognition.fetch import ImageFetcher, default_fetcher
 from document_recognition.photo_pre_processors.base import SyncPreProcessorType
 from document_recognition.recognizers.base import (
     BaseSyncRecognizer,
@@ -13,15 +14,22 @@ class SyncDocumentRecognition:
     def __init__(
         self,
         backend: BaseSyncBackend,
+        *,
+        fetcher: Optional[ImageFetcher] = None,
     ) -> None:
+        """
+        :param backend: sync backend
+        :param fetcher: downloads photos of urls which are pre processed. If None, a shared one is used
+        """
         self.backend = backend
+        self.fetcher = fetcher
 
     def recognize_document(
         self,
         image_path: PathLike,
         *,
         recognizer: SyncRecognizerType[T],
-        pre_processor_of_photo: Optional[SyncPreProcessorType] = None
+        pre_processor_of_photo: Optional[SyncPreProcessorType] = None,
     ) -> T:
         if pre_processor_of_photo:
             image_path = pre_processor_of_photo(image_path)
@@ -31,3 +39,25 @@ class SyncDocumentRecognition:
         recognized_document = recognizer(api_response)
 
         return recognized_document
+
+    def recognize_document_from_url(
+        self,
+        url: str,
+        *,
+        recognizer: SyncRecognizerType[T],
+        pre_processor_of_photo: Optional[SyncPreProcessorType] = None,
+    ) -> T:
+        """Recognizes the photo of the url.
+
+        If the photo is pre processed, it's downloaded here, otherwise the url is passed
+        to the backend, which may let the API fetch it.
+        """
+        if pre_processor_of_photo:
+            fetcher = self.fetcher or default_fetcher()
+            return self.recognize_document(
+                fetcher.fetch(url),
+                recognizer=recognizer,
+                pre_processor_of_photo=pre_processor_of_photo,
+            )
+
+        return recognizer(self.backend.recognize_document_from_url(url))
@@ -1,5 +1,4 @@
 import asyncio
-from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 from google.cloud.vision_v1 import ImageAnnotatorClient
@@ -11,14 +10,17 @@ from document_recognition.backends.synchronous.google_vision_backend import (
     GoogleVisionBackend,
 )
 from document_recognition.entities.drive_license import DriverLicense
+from document_recognition.photo_pre_processors.asynchronous import (
+    ProcessPoolPhotoPreProcessor,
+)
 from document_recognition.photo_pre_processors.synchronous.homography_cv2_ import (
     CV2HomographyPhotoPreProcessorByTemplate,
 )
+from document_recognition.recognizers.asynchronous import ProcessPoolRecognizer
 from document_recognition.recognizers.synchronous.driver_license_recognizer import (
     DriverLicenseRecognizerByTemplate,
 )
 from document_recognition.template import Template
-from document_recognition.utils import to_async
 
 BASE_DIR = Path(__file__).parent.resolve()
 
@@ -27,14 +29,17 @@ async def main() -> None:
     # pass template here, see example in tests/data
     template = Template.from_xml(BASE_DIR / "template.xml")
 
-    # create our recognizer
-    recognizer = to_async()(DriverLicenseRecognizerByTemplate(template=template))
-    # run in thread pool executor, although it's pointless because there isn't io operations
-    pre_processor = CV2HomographyPhotoPreProcessorByTemplate(
-        template=template,
-        percent=10,
+    # create our recognizer, it runs in process pool too
+    recognizer = ProcessPoolRecognizer(
+        DriverLicenseRecognizerByTemplate(template=template)
+    )
+    # run in process pool, so photos are aligned on all cores
+    pre_processor = ProcessPoolPhotoPreProcessor(
+        CV2HomographyPhotoPreProcessorByTemplate(
+            template=template,
+            percent=10,
+        )
     )
-    # unfortunately, we can't run cv2 in process pool executor because some objects are unpickable.
 
     document_recognizer = AsyncDocumentRecognition(
         backend=AsyncBackendWrapper(  # wrap backend to run in thread pool executor
@@ -3,6 +3,8 @@ from typing import Generator
 
 import pytest
 
+from document_recognition.backends import ApiResponse
+from document_recognition.backends.base import TextAnnotations, Vertices
 from document_recognition.photo_pre_processors.synchronous.homography_cv2_ import (
     CV2HomographyPhotoPreProcessorByTemplate,
 )
@@ -19,6 +21,41 @@ BASE_DIR = Path(__file__).parent
 TEMPLATE_XML = BASE_DIR / "data" / "template.xml"
 TEMPLATE_PNG = BASE_DIR / "data" / "template.png"
 
+RESPONSE = ApiResponse(
+    text_annotations=[
+        TextAnnotations(
+            text="БАБАЯН",
+            vertices=[Vertices(x=1, y=2), Vertices(x=3, y=4)],
+            locale="ru",
+            confidence=0.5,
+        ),
+        TextAnnotations(text="", vertices=[]),
+        TextAnnotations(text="2322803756", vertices=[Vertices(x=-5, y=70000)]),
+    ],
+    text="БАБАЯН\n2322803756",
+)
+
+PASSPORT_TEMPLATE = Template(
+    path="",
+    size=Size(width=400, height=200, depth=3),
+    objects=[
+        Data(name="serial_number", type="str", coordinates=Coordinates(0, 0, 100, 50)),
+        Data(name="number", type="str", coordinates=Coordinates(100, 0, 300, 50)),
+    ],
+)
+
+
+def word(text: str, x: float, y: float) -> TextAnnotations:
+    return TextAnnotations(
+        text=text,
+        vertices=[
+            Vertices(x=x - 5, y=y - 5),
+            Vertices(x=x + 5, y=y - 5),
+            Vertices(x=x + 5, y=y + 5),
+            Vertices(x=x - 5, y=y + 5),
+        ],
+    )
+
 
 @pytest.fixture
 def homography_cv2_pre_processor(
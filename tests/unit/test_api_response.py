@@ -0,0 +1,77 @@
+from io import BytesIO
+
+import numpy as np
+from google.cloud import vision
+
+from document_recognition.backends.base import (
+    ColumnarApiResponse,
+    TextAnnotations,
+    Vertices,
+)
+from document_recognition.backends.synchronous.google_vision_backend import (
+    GoogleVisionBackend,
+)
+from document_recognition.recognizers.synchronous.driver_license_recognizer import (
+    DriverLicenseRecognizerByTemplate,
+)
+
+ANNOTATIONS = [
+    ("RUS", [(81, 40), (128, 40), (128, 54), (81, 54)]),
+    ("Р", [(159, 110), (157, 212), (68, 210), (70, 108)]),
+    ("БАБАЯН", [(251, 70), (330, 72), (329, 90), (250, 88)]),
+]
+
+
+class FakeImageAnnotatorClient:
+    def annotate_image(self, payload) -> vision.AnnotateImageResponse:
+        return vision.AnnotateImageResponse(
+            text_annotations=[
+                vision.EntityAnnotation(
+                    description=text,
+                    locale="ru",
+                    confidence=0.5,
+                    bounding_poly=vision.BoundingPoly(
+                        vertices=[vision.Vertex(x=x, y=y) for x, y in vertices]
+                    ),
+                )
+                for text, vertices in ANNOTATIONS
+            ],
+            full_text_annotation=vision.TextAnnotation(text="RUS Р БАБАЯН"),
+        )
+
+
+def test_columnar_response_from_google_vision():
+    backend = GoogleVisionBackend(FakeImageAnnotatorClient(), columnar=True)
+
+    response = backend.recognize_document(BytesIO(b""))
+
+    assert isinstance(response, ColumnarApiResponse)
+    assert response.texts == ["RUS", "Р", "БАБАЯН"]
+    assert response.vertices.shape == (3, 4, 2)
+    assert response.text == "RUS Р БАБАЯН"
+    assert response.locale == ["ru", "ru", "ru"]
+    assert response.confidence.tolist() == [0.5, 0.5, 0.5]
+    assert response.bounding_boxes()[1].tolist() == [68, 108, 159, 212]
+    assert response.text_annotations[2] == TextAnnotations(
+        text="БАБАЯН",
+        vertices=[Vertices(x, y) for x, y in ANNOTATIONS[2][1]],
+        locale="ru",
+        confidence=0.5,
+    )
+
+
+def test_columnar_centers_match_object_centers():
+    text_annotations = [
+        TextAnnotations(text=text, vertices=[Vertices(x, y) for x, y in vertices])
+        for text, vertices in ANNOTATIONS
+    ]
+    text_annotations.append(
+        TextAnnotations(text="short", vertices=[Vertices(1, 2), Vertices(3, 4)])
+    )
+    response = ColumnarApiResponse.from_text_annotations(text_annotations)
+
+    expected = DriverLicenseRecognizerByTemplate._find_average_coordinates(
+        text_annotations
+    )
+
+    assert np.array_equal(response.centers(), [info[1:] for info in expected])
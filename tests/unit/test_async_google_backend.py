@@ -0,0 +1,91 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from typing import Any, Dict, List
+
+import pytest
+from google.api_core import exceptions
+from google.cloud import vision
+
+from document_recognition.backends import ColumnarApiResponse
+from document_recognition.backends.asynchronous.google_vision_backend import (
+    AsyncGoogleVisionBackend,
+)
+
+
+class FakeAsyncImageAnnotatorClient:
+    """Answers with one word per byte of the image, images with ``bad`` content fail."""
+
+    def __init__(self) -> None:
+        self.timeouts: List[Any] = []
+
+    async def batch_annotate_images(
+        self, request: Dict[str, Any], **kwargs: Any
+    ) -> vision.BatchAnnotateImagesResponse:
+        self.timeouts.append(kwargs.get("timeout"))
+        await asyncio.sleep(0.01)
+        (image_request,) = request["requests"]
+        content = image_request["image"]["content"]
+        if content == b"bad":
+            response = vision.AnnotateImageResponse(
+                error={"code": 3, "message": "Bad image data"}
+            )
+        else:
+            response = vision.AnnotateImageResponse(
+                text_annotations=[
+                    {
+                        "description": chr(byte),
+                        "bounding_poly": {"vertices": [{"x": i, "y": 0}]},
+                    }
+                    for i, byte in enumerate(content)
+                ],
+                full_text_annotation={"text": content.decode()},
+            )
+        return vision.BatchAnnotateImagesResponse(responses=[response])
+
+
+class CountingExecutor(ThreadPoolExecutor):
+    def __init__(self) -> None:
+        super().__init__(max_workers=1)
+        self.submitted = 0
+
+    def submit(self, *args: Any, **kwargs: Any):
+        self.submitted += 1
+        return super().submit(*args, **kwargs)
+
+
+def test_async_google_vision_backend(tmp_path):
+    path = tmp_path / "image.jpg"
+    path.write_bytes(b"file")
+    client = FakeAsyncImageAnnotatorClient()
+    executor = CountingExecutor()
+    backend = AsyncGoogleVisionBackend(
+        client, columnar=True, timeout=5, executor=executor, offload_threshold=10
+    )
+
+    async def main():
+        return await asyncio.gather(
+            *(backend.recognize_document(BytesIO(b"word")) for _ in range(100)),
+            backend.recognize_document(str(path), timeout=1),
+            backend.recognize_document(BytesIO(b"large response")),
+        )
+
+    try:
+        *small, from_file, large = asyncio.run(main())
+    finally:
+        executor.shutdown()
+
+    assert all(response.text == "word" for response in small)
+    assert isinstance(large, ColumnarApiResponse)
+    assert large.texts == list("large response")
+    assert from_file.text == "file"
+    assert sorted(client.timeouts, key=str) == [1] + [5] * 101
+    # reading the file and converting the large response
+    assert executor.submitted == 2
+
+
+def test_async_google_vision_backend_raises_image_errors():
+    backend = AsyncGoogleVisionBackend(FakeAsyncImageAnnotatorClient())
+
+    with pytest.raises(exceptions.InvalidArgument):
+        asyncio.run(backend.recognize_document(BytesIO(b"bad")))
@@ -0,0 +1,108 @@
+import asyncio
+import threading
+import time
+from io import BytesIO
+from pathlib import Path
+from typing import List, Optional
+
+from document_recognition.async_client import AsyncDocumentRecognition
+from document_recognition.backends import ApiResponse, PathLike
+from document_recognition.backends.asynchronous import AsyncBackendWrapper
+from document_recognition.photo_pre_processors.asynchronous import (
+    AsyncPhotoPreProcessorWrapper,
+)
+from document_recognition.photo_pre_processors.base import BaseSyncPhotoPreProcessor
+from tests.mocked_sync_client import MockedBackend
+
+
+class UpperCasePreProcessor(BaseSyncPhotoPreProcessor):
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.running = 0
+        self.max_running = 0
+        self.threads: List[int] = []
+
+    def __call__(
+        self, image_path: PathLike, destination: Optional[PathLike] = None
+    ) -> PathLike:
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+            self.threads.append(threading.get_ident())
+        time.sleep(0.01)
+        with self.lock:
+            self.running -= 1
+        return BytesIO(image_path.read().upper())
+
+
+def test_async_pre_processor_wrapper_limits_concurrency(tmp_path: Path):
+    source = tmp_path / "source.txt"
+    source.write_bytes(b"photo")
+    sync_pre_processor = UpperCasePreProcessor()
+    pre_processor = AsyncPhotoPreProcessorWrapper(sync_pre_processor, max_concurrency=2)
+
+    async def main():
+        return await asyncio.gather(
+            *(pre_processor(BytesIO(b"photo")) for _ in range(6)),
+            pre_processor(source, destination=tmp_path / "destination.txt"),
+        )
+
+    results = asyncio.run(main())
+
+    assert sync_pre_processor.max_running <= 2
+    assert all(result.read() == b"PHOTO" for result in results[:-1])
+    assert (tmp_path / "destination.txt").read_bytes() == b"PHOTO"
+
+
+def test_async_client_runs_sync_pre_processor_off_the_loop():
+    backend = MockedBackend()
+    backend.add_result(ApiResponse(text_annotations=[], text="text"))
+    document_recognizer = AsyncDocumentRecognition(backend=AsyncBackendWrapper(backend))
+    sync_pre_processor = UpperCasePreProcessor()
+
+    async def main():
+        return await document_recognizer.recognize_document(
+            BytesIO(b"photo"),
+            recognizer=lambda response: response.text,
+            pre_processor_of_photo=sync_pre_processor,
+        )
+
+    assert asyncio.run(main()) == "text"
+    assert sync_pre_processor.threads != [threading.get_ident()]
+
+
+def test_async_client_awaits_async_pre_processor():
+    backend = MockedBackend()
+    backend.add_result(ApiResponse(text_annotations=[], text="text"))
+    document_recognizer = AsyncDocumentRecognition(backend=AsyncBackendWrapper(backend))
+    sync_pre_processor = UpperCasePreProcessor()
+    pre_processor = AsyncPhotoPreProcessorWrapper(sync_pre_processor)
+
+    async def main():
+        return await document_recognizer.recognize_document(
+            BytesIO(b"photo"),
+            recognizer=lambda response: response.text,
+            pre_processor_of_photo=pre_processor,
+        )
+
+    assert asyncio.run(main()) == "text"
+    assert len(sync_pre_processor.threads) == 1
+
+
+class ThreadRecordingBytesIO(BytesIO):
+    def write(self, buffer) -> int:
+        self.writing_thread = threading.get_ident()
+        return super().write(buffer)
+
+
+def test_async_pre_processor_wrapper_writes_file_objects_off_the_loop():
+    pre_processor = AsyncPhotoPreProcessorWrapper(UpperCasePreProcessor())
+    destination = ThreadRecordingBytesIO()
+
+    result = asyncio.run(pre_processor(BytesIO(b"photo"), destination=destination))
+
+    assert result is destination
+    assert destination.read() == b"PHOTO"
+    assert destination.writing_thread != threading.get_ident()
+    # without an explicit limit, the photos in flight are still bounded
+    assert pre_processor.max_concurrency is not None
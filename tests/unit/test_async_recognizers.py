@@ -0,0 +1,145 @@
+import asyncio
+import multiprocessing
+import pickle
+from typing import Iterable, List
+
+import pytest
+
+from document_recognition.backends import ApiResponse
+from document_recognition.entities.passport import Passport
+from document_recognition.recognizers.asynchronous import (
+    AsyncRecognizerWrapper,
+    ProcessPoolRecognizer,
+)
+from document_recognition.recognizers.base import BaseSyncRecognizer
+from document_recognition.recognizers.synchronous.regex_recognizer import (
+    MultiPatternRecognizer,
+)
+from document_recognition.recognizers.synchronous.template_recognizer import (
+    TemplateRecognizer,
+)
+from tests.conftest import PASSPORT_TEMPLATE, word
+
+
+class TextLengthRecognizer(BaseSyncRecognizer[int]):
+    def __init__(self) -> None:
+        self.batch_sizes: List[int] = []
+
+    def __call__(self, response: ApiResponse) -> int:
+        if response.text is None:
+            raise ValueError("no text")
+        return len(response.text)
+
+    def recognize_batch(self, responses: Iterable[ApiResponse]) -> List[int]:
+        responses = list(responses)
+        self.batch_sizes.append(len(responses))
+        return [self(response) for response in responses]
+
+
+def test_async_recognizer_wrapper_micro_batches_calls():
+    recognizer = TextLengthRecognizer()
+    wrapper = AsyncRecognizerWrapper(recognizer, max_batch_size=4, linger=0.05)
+
+    async def main():
+        return await asyncio.gather(
+            *(
+                wrapper(ApiResponse(text_annotations=[], text="x" * i))
+                for i in range(10)
+            )
+        )
+
+    assert asyncio.run(main()) == list(range(10))
+    assert recognizer.batch_sizes == [4, 4, 2]
+
+
+def test_async_recognizer_wrapper_raises_errors_of_the_batch():
+    wrapper = AsyncRecognizerWrapper(TextLengthRecognizer())
+
+    async def main():
+        return await wrapper(ApiResponse(text_annotations=[]))
+
+    with pytest.raises(ValueError):
+        asyncio.run(main())
+
+
+def test_async_recognizer_wrapper_fails_only_bad_responses_of_the_batch():
+    recognizer = TextLengthRecognizer()
+    wrapper = AsyncRecognizerWrapper(recognizer, linger=0.05)
+    texts = ["a", None, "abc"]
+
+    async def main():
+        return await asyncio.gather(
+            *(wrapper(ApiResponse(text_annotations=[], text=text)) for text in texts),
+            return_exceptions=True,
+        )
+
+    first, error, third = asyncio.run(main())
+
+    assert (first, third) == (1, 3)
+    assert isinstance(error, ValueError)
+    assert recognizer.batch_sizes == [3, 1, 1, 1]
+
+
+class ShortBatchRecognizer(TextLengthRecognizer):
+    """Loses the last document of every batch."""
+
+    def recognize_batch(self, responses: Iterable[ApiResponse]) -> List[int]:
+        return super().recognize_batch(responses)[:-1]
+
+
+def test_async_recognizer_wrapper_fails_calls_without_results():
+    wrapper = AsyncRecognizerWrapper(ShortBatchRecognizer(), linger=0.05)
+
+    async def main():
+        return await asyncio.wait_for(
+            asyncio.gather(
+                *(
+                    wrapper(ApiResponse(text_annotations=[], text="ab"))
+                    for _ in range(3)
+                ),
+                return_exceptions=True,
+            ),
+            1.0,
+        )
+
+    errors = asyncio.run(main())
+
+    assert len(errors) == 3
+    assert all(isinstance(error, RuntimeError) for error in errors)
+
+
+def test_recognizers_with_generated_code_are_picklable():
+    recognizer = MultiPatternRecognizer(
+        Passport, {"serial_number": r"\d{2} \d{2}", "number": r"\d{6}"}
+    )
+    response = ApiResponse(text_annotations=[], text="03 15 084752")
+
+    assert pickle.loads(pickle.dumps(recognizer))(response) == recognizer(response)
+
+
+def test_process_pool_recognizer():
+    recognizer = ProcessPoolRecognizer(
+        TemplateRecognizer(PASSPORT_TEMPLATE, Passport),
+        max_workers=1,
+        mp_context=multiprocessing.get_context("spawn"),
+        max_batch_size=2,
+    )
+    responses = [
+        ApiResponse(text_annotations=[word("03 15", 50, 25), word(str(i), 200, 25)])
+        for i in range(5)
+    ]
+
+    async def main():
+        return (
+            await asyncio.gather(*(recognizer(response) for response in responses)),
+            await recognizer.recognize_batch(responses),
+        )
+
+    try:
+        single, batch = asyncio.run(main())
+    finally:
+        recognizer.shutdown()
+
+    expected = [Passport(serial_number="03 15", number=str(i)) for i in range(5)]
+    assert single == expected
+    assert batch == expected
@@ -0,0 +1,79 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from typing import Any, Dict, List
+
+import pytest
+from google.api_core import exceptions
+from google.cloud import vision
+
+from document_recognition.backends.synchronous.batching_google_vision_backend import (
+    BatchingGoogleVisionBackend,
+)
+
+
+class FakeBatchImageAnnotatorClient:
+    """Answers every image with its content as text, images with ``bad`` content fail."""
+
+    def __init__(self) -> None:
+        self.batch_sizes: List[int] = []
+        self._lock = threading.Lock()
+
+    def batch_annotate_images(
+        self, request: Dict[str, Any]
+    ) -> vision.BatchAnnotateImagesResponse:
+        with self._lock:
+            self.batch_sizes.append(len(request["requests"]))
+        responses = []
+        for image_request in request["requests"]:
+            content = image_request["image"]["content"].decode()
+            if content == "bad":
+                responses.append(
+                    vision.AnnotateImageResponse(
+                        error={"code": 3, "message": "Bad image data"}
+                    )
+                )
+            else:
+                responses.append(
+                    vision.AnnotateImageResponse(full_text_annotation={"text": content})
+                )
+        return vision.BatchAnnotateImagesResponse(responses=responses)
+
+
+def test_batching_backend_collects_concurrent_requests():
+    client = FakeBatchImageAnnotatorClient()
+    contents = [f"image {i}" for i in range(40)]
+
+    with BatchingGoogleVisionBackend(client, max_linger=0.2) as backend:
+        with ThreadPoolExecutor(max_workers=len(contents)) as executor:
+            responses = list(
+                executor.map(
+                    lambda content: backend.recognize_document(
+                        BytesIO(content.encode())
+                    ),
+                    contents,
+                )
+            )
+
+    assert [response.text for response in responses] == contents
+    assert sum(client.batch_sizes) == len(contents)
+    assert max(client.batch_sizes) <= 16
+    assert len(client.batch_sizes) < len(contents)
+
+
+def test_batching_backend_raises_errors_of_single_images(tmp_path):
+    path = tmp_path / "image.jpg"
+    path.write_bytes(b"from file")
+    client = FakeBatchImageAnnotatorClient()
+
+    with BatchingGoogleVisionBackend(client, max_linger=0.2) as backend:
+        bad = backend.submit(BytesIO(b"bad"))
+        good = backend.submit(str(path))
+
+        with pytest.raises(exceptions.InvalidArgument):
+            bad.result()
+        assert good.result().text == "from file"
+
+    assert client.batch_sizes == [2]
+    with pytest.raises(RuntimeError):
+        backend.submit(BytesIO(b"late"))
@@ -0,0 +1,146 @@
+import asyncio
+from io import BytesIO
+from typing import List
+
+import numpy as np
+import pytest
+
+from document_recognition.backends import (
+    ApiResponse,
+    BaseAsyncBackend,
+    BaseSyncBackend,
+    ColumnarApiResponse,
+)
+from document_recognition.backends.base import PathLike
+from document_recognition.backends import serialization
+from document_recognition.backends.cache import (
+    AsyncCachedBackend,
+    CachedBackend,
+    ResponseCache,
+)
+from tests.conftest import RESPONSE
+
+
+class CountingBackend(BaseSyncBackend):
+    def __init__(self) -> None:
+        self.contents: List[bytes] = []
+
+    def recognize_document(self, image_path: PathLike) -> ApiResponse:
+        self.contents.append(image_path.read())
+        return RESPONSE
+
+    def recognize_document_from_url(self, url: str) -> ApiResponse:
+        raise NotImplementedError
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.mark.parametrize("compress", [True, False])
+def test_serialization_round_trip(compress: bool):
+    data = serialization.dumps(RESPONSE, compress=compress)
+
+    assert serialization.loads(data) == RESPONSE
+
+
+def test_serialization_keeps_columnar_responses():
+    vertices = np.full((2, 4, 2), np.nan)
+    vertices[0] = [(0.5, 1), (2, 1), (2, 3), (0.5, 3)]
+    vertices[1, :2] = [(7, 8), (9, 10)]
+    response = ColumnarApiResponse(
+        texts=["a", "b"],
+        vertices=vertices,
+        text="a b",
+        confidence=np.array([0.9, np.nan]),
+    )
+
+    loaded = serialization.loads(serialization.dumps(response))
+
+    assert isinstance(loaded, ColumnarApiResponse)
+    assert loaded.texts == response.texts
+    np.testing.assert_array_equal(loaded.vertices, vertices)
+    np.testing.assert_array_equal(loaded.confidence, response.confidence)
+    assert loaded.text_annotations == response.text_annotations
+
+
+def test_serialization_rejects_broken_data():
+    data = serialization.dumps(RESPONSE, compress=False)
+
+    with pytest.raises(ValueError):
+        serialization.loads(data[:-3])
+    with pytest.raises(ValueError):
+        serialization.loads(b"not a response")
+
+
+def test_cached_backend_memory_and_disk_tiers(tmp_path):
+    backend = CountingBackend()
+    cached = CachedBackend(backend, ResponseCache(tmp_path, max_memory_items=1))
+
+    assert cached.recognize_document(BytesIO(b"first")) == RESPONSE
+    assert cached.recognize_document(BytesIO(b"first")) is RESPONSE
+    cached.recognize_document(BytesIO(b"second"))
+    # the first response is only on disk now
+    assert cached.recognize_document(BytesIO(b"first")) == RESPONSE
+
+    assert backend.contents == [b"first", b"second"]
+    assert cached.cache.stats.memory_hits == 1
+    assert cached.cache.stats.disk_hits == 1
+    assert cached.cache.stats.misses == 2
+
+    # responses survive the process
+    reopened = CachedBackend(CountingBackend(), ResponseCache(tmp_path))
+    assert reopened.recognize_document(BytesIO(b"second")) == RESPONSE
+    assert reopened.backend.contents == []
+
+
+def test_response_cache_ttl_and_size_eviction(tmp_path):
+    clock = Clock()
+    cache = ResponseCache(tmp_path, ttl=60, clock=clock)
+    cache.set("key", RESPONSE)
+    clock.now += 61
+
+    assert cache.get("key") is None
+    assert cache.stats.expirations == 1
+    assert not list(tmp_path.iterdir())
+
+    size = len(serialization.dumps(RESPONSE))
+    cache = ResponseCache(tmp_path, max_disk_bytes=2 * size, clock=clock)
+    for key in ("a", "b", "c"):
+        cache.set(key, RESPONSE)
+
+    assert cache.stats.evictions == 1
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "b.response",
+        "c.response",
+    ]
+
+
+def test_async_cached_backend(tmp_path):
+    class AsyncBackend(BaseAsyncBackend):
+        calls = 0
+
+        async def recognize_document(self, image_path: PathLike) -> ApiResponse:
+            self.calls += 1
+            return RESPONSE
+
+        async def recognize_document_from_url(self, url: str) -> ApiResponse:
+            raise NotImplementedError
+
+    path = tmp_path / "photo.jpg"
+    path.write_bytes(b"photo")
+    backend = AsyncBackend()
+    cached = AsyncCachedBackend(backend, ResponseCache(tmp_path / "cache"))
+
+    async def main():
+        first = await cached.recognize_document(str(path))
+        second = await cached.recognize_document(BytesIO(b"photo"))
+        return first, second
+
+    assert asyncio.run(main()) == (RESPONSE, RESPONSE)
+    assert backend.calls == 1
+    assert cached.cache.stats.hit_ratio == 0.5
@@ -0,0 +1,73 @@
+from io import BytesIO
+from typing import Any, Dict, List
+
+import cv2
+import numpy as np
+from google.cloud import vision
+
+from document_recognition.backends.synchronous.google_vision_backend import (
+    GoogleVisionBackend,
+)
+from document_recognition.image import DecodedImage
+from document_recognition.photo_pre_processors.synchronous.homography_cv2_ import (
+    CV2HomographyPhotoPreProcessorByTemplate,
+    read_image_from_pathlike,
+)
+from document_recognition.template import Template
+from tests.conftest import BASE_DIR
+
+IMAGE = BASE_DIR / "data" / "user_licenses" / "1.jpg"
+
+
+class FakeImageAnnotatorClient:
+    def __init__(self) -> None:
+        self.payloads: List[Dict[str, Any]] = []
+
+    def annotate_image(self, payload: Dict[str, Any]) -> vision.AnnotateImageResponse:
+        self.payloads.append(payload)
+        return vision.AnnotateImageResponse()
+
+
+def test_decoded_image_is_encoded_lazily_once():
+    pixels = cv2.imread(str(IMAGE))
+    image = DecodedImage(pixels, codec=".jpg", quality=30)
+
+    assert "encoded" not in vars(image)
+    assert read_image_from_pathlike(image) is pixels
+
+    content = image.read()
+    assert image.getbuffer().obj is image.encoded
+    assert content == image.read()
+    assert len(content) < len(DecodedImage(pixels, quality=95).read())
+    assert cv2.imdecode(np.frombuffer(content, np.uint8), 1).shape == pixels.shape
+
+
+def test_read_image_from_bytes_io_position():
+    content = IMAGE.read_bytes()
+    buffer = BytesIO(b"header" + content)
+    buffer.seek(len(b"header"))
+
+    assert read_image_from_pathlike(buffer).shape == cv2.imread(str(IMAGE)).shape
+    # the stream is consumed like with read()
+    assert buffer.tell() == len(b"header" + content)
+    # the buffer isn't exported anymore, so it can be resized
+    buffer.write(b"tail")
+
+
+def test_lazy_encoding_pre_processor_and_backend(template: Template):
+    pre_processor = CV2HomographyPhotoPreProcessorByTemplate(
+        template=template, lazy_encoding=True, codec=".png"
+    )
+    image = pre_processor(image_path=str(IMAGE))
+
+    assert isinstance(image, DecodedImage)
+    assert (image.width, image.height) == (template.size.width, template.size.height)
+
+    client = FakeImageAnnotatorClient()
+    GoogleVisionBackend(image_annotator_client=client).recognize_document(image)
+
+    content = client.payloads[0]["image"]["content"]
+    assert content.startswith(b"\x89PNG")
+    assert np.array_equal(
+        cv2.imdecode(np.frombuffer(content, np.uint8), 1), image.pixels
+    )
@@ -0,0 +1,126 @@
+import pickle
+
+import numpy as np
+import pytest
+from google.cloud import vision
+
+from document_recognition.backends import serialization
+from document_recognition.backends.base import ColumnarApiResponse
+from document_recognition.backends.lazy_response import LazyApiResponse
+from document_recognition.backends.synchronous.google_vision_backend import (
+    GoogleVisionBackend,
+    to_columnar_api_response,
+)
+
+SPACE = vision.TextAnnotation.DetectedBreak.BreakType.SPACE
+LINE_BREAK = vision.TextAnnotation.DetectedBreak.BreakType.LINE_BREAK
+
+
+def box(x: int, y: int, width: int, height: int):
+    corners = [(x, y), (x + width, y), (x + width, y + height), (x, y + height)]
+    return {"vertices": [{"x": cx, "y": cy} for cx, cy in corners]}
+
+
+def word(text: str, x: int, separator, confidence: float):
+    symbols = [{"text": symbol} for symbol in text]
+    symbols[-1]["property"] = {"detected_break": {"type_": separator}}
+    return {
+        "symbols": symbols,
+        "bounding_box": box(x, 0, 10 * len(text), 10),
+        "confidence": confidence,
+    }
+
+
+RESPONSE = vision.AnnotateImageResponse(
+    text_annotations=[
+        {"description": "John Smith", "bounding_poly": box(0, 0, 110, 10)},
+        {"description": "John", "bounding_poly": box(0, 0, 40, 10)},
+        {
+            "description": "Smith",
+            "bounding_poly": box(60, 0, 50, 10),
+            "confidence": 0.5,
+        },
+    ],
+    full_text_annotation={
+        "text": "John Smith\n",
+        "pages": [
+            {
+                "blocks": [
+                    {
+                        "bounding_box": box(0, 0, 110, 10),
+                        "confidence": 0.9,
+                        "paragraphs": [
+                            {
+                                "bounding_box": box(0, 0, 110, 10),
+                                "confidence": 0.8,
+                                "words": [
+                                    word("John", 0, SPACE, 0.99),
+                                    word("Smith", 60, LINE_BREAK, 0.7),
+                                ],
+                            }
+                        ],
+                    }
+                ]
+            }
+        ],
+    },
+)
+
+
+def test_lazy_response_converts_only_accessed_parts():
+    response = LazyApiResponse(RESPONSE)
+
+    assert response.text == "John Smith\n"
+    assert "texts" not in response.__dict__
+    assert "vertices" not in response.__dict__
+    assert "blocks" not in response.__dict__
+
+
+def test_lazy_response_matches_columnar_response():
+    response = LazyApiResponse(RESPONSE)
+    expected = to_columnar_api_response(RESPONSE)
+
+    assert response.texts == expected.texts
+    np.testing.assert_array_equal(response.vertices, expected.vertices)
+    np.testing.assert_array_equal(response.confidence, expected.confidence)
+    assert response.text_annotations == expected.text_annotations
+
+
+def test_lazy_response_blocks():
+    response = LazyApiResponse(RESPONSE).scaled(2, 3)
+
+    [block] = response.blocks
+    [paragraph] = block.paragraphs
+    assert block.text == paragraph.text == "John Smith"
+    assert (block.confidence, paragraph.confidence) == pytest.approx((0.9, 0.8))
+    assert [w.text for w in response.words] == ["John", "Smith"]
+    assert [w.confidence for w in response.words] == pytest.approx([0.99, 0.7])
+    assert (response.words[1].vertices[2].x, response.words[1].vertices[2].y) == (
+        220,
+        30,
+    )
+    assert response.vertices[2, 2].tolist() == [220, 30]
+
+
+def test_lazy_response_is_pickled_as_columnar_response():
+    response = LazyApiResponse(RESPONSE)
+
+    for loaded in [
+        pickle.loads(pickle.dumps(response)),
+        serialization.loads(serialization.dumps(response)),
+    ]:
+        assert type(loaded) is ColumnarApiResponse
+        assert loaded.texts == response.texts
+        assert loaded.text == response.text
+        np.testing.assert_array_equal(loaded.vertices, response.vertices)
+
+
+def test_backend_returns_lazy_response():
+    class Client:
+        def annotate_image(self, request):
+            return RESPONSE
+
+    response = GoogleVisionBackend(Client(), lazy=True).recognize_document("image.jpg")
+
+    assert isinstance(response, LazyApiResponse)
+    assert response.text == "John Smith\n"
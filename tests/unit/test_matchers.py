@@ -0,0 +1,56 @@
+import cv2
+import numpy as np
+import pytest
+
+from document_recognition.photo_pre_processors.synchronous.homography_cv2_ import (
+    CV2HomographyPhotoPreProcessorByTemplate,
+)
+from document_recognition.photo_pre_processors.synchronous.matchers_cv2_ import (
+    BruteForceMatcher,
+    FlannLshMatcher,
+    KnnRatioMatcher,
+    Matches,
+)
+from document_recognition.template import Template
+from tests.conftest import BASE_DIR
+
+IMAGE = BASE_DIR / "data" / "user_licenses" / "1.jpg"
+
+
+def test_best_matches_are_sorted_by_distance():
+    matches = Matches(
+        query_idx=np.arange(6, dtype=np.int32),
+        train_idx=np.arange(6, dtype=np.int32)[::-1],
+        distance=np.array([5, 1, 4, 2, 6, 3], dtype=np.float32),
+    )
+
+    best = matches.best(50)
+
+    assert best.distance.tolist() == [1, 2, 3]
+    assert best.query_idx.tolist() == [1, 3, 5]
+    assert best.train_idx.tolist() == [4, 2, 0]
+    assert len(matches.best(0)) == 0
+    assert len(matches.best(100)) == 6
+
+
+@pytest.mark.parametrize(
+    "matcher", [BruteForceMatcher(), FlannLshMatcher(), KnnRatioMatcher()]
+)
+def test_pre_processor_with_matcher(template: Template, matcher):
+    pre_processor = CV2HomographyPhotoPreProcessorByTemplate(
+        template=template, matcher=matcher
+    )
+
+    photo = pre_processor(image_path=str(IMAGE))
+    decode_img = cv2.imdecode(np.frombuffer(photo.getbuffer(), np.uint8), -1)
+
+    assert decode_img.shape[:2] == (template.size.height, template.size.width)
+
+
+def test_pre_processor_keeps_bf_alias(template: Template):
+    bf = cv2.BFMatcher(cv2.NORM_HAMMING, crossCheck=True)
+    pre_processor = CV2HomographyPhotoPreProcessorByTemplate(template=template, bf=bf)
+
+    assert pre_processor.bf is bf
+    pre_processor.bf = other = cv2.BFMatcher(cv2.NORM_HAMMING)
+    assert pre_processor.matcher.matcher is other
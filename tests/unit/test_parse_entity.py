@@ -3,7 +3,7 @@ from typing import Any, Dict
 
 import pytest
 
-from document_recognition.backends import ApiResponse
+from document_recognition.backends import ApiResponse, ColumnarApiResponse
 from document_recognition.backends.base import TextAnnotations, Vertices
 from document_recognition.entities.drive_license import DriverLicense
 from document_recognition.entities.passport import Passport
@@ -13,6 +13,7 @@ from document_recognition.recognizers.synchronous.driver_license_recognizer impo
 from document_recognition.recognizers.synchronous.passport_recognizer import (
     PassportRecognizerByRegularExpression,
 )
+from document_recognition.template import Template
 from tests.mocked_sync_client import MockedSyncDocumentRecognition
 
 
@@ -27,7 +28,7 @@ def dict_to_driver_license_with_sep(document: Dict[str, Any], sep: str):
 
 
 # TODO move parametrize to files
-@pytest.mark.parametrize(
+driver_license_cases = pytest.mark.parametrize(
     "response,document_entity",
     [
         (
@@ -719,12 +720,21 @@ def dict_to_driver_license_with_sep(document: Dict[str, Any], sep: str):
         ),
     ],
 )
+
+
+@driver_license_cases
+@pytest.mark.parametrize("columnar", [False, True])
 def test_driver_license_recognizer(
     document_recognizer: MockedSyncDocumentRecognition,
     driver_license_recognizer_by_template,
     response: ApiResponse,
     document_entity: Dict[str, Any],
+    columnar: bool,
 ) -> None:
+    if columnar:
+        response = ColumnarApiResponse.from_text_annotations(
+            response.text_annotations, response.text
+        )
     document_recognizer.add_result(response=response)
     document = document_recognizer.recognize_document(
         image_path="",
@@ -736,6 +746,28 @@ def test_driver_license_recognizer(
     )
 
 
+@driver_license_cases
+@pytest.mark.parametrize("columnar", [False, True])
+def test_driver_license_recognizer_recognizes_batches(
+    template: Template,
+    response: ApiResponse,
+    document_entity: Dict[str, Any],
+    columnar: bool,
+) -> None:
+    if columnar:
+        response = ColumnarApiResponse.from_text_annotations(
+            response.text_annotations, response.text
+        )
+    recognizer = DriverLicenseRecognizerByTemplate(template=template, batch_size=2)
+    empty_response = ApiResponse(text_annotations=[])
+
+    assert recognizer.recognize_batch([response, empty_response, response]) == [
+        recognizer(response),
+        recognizer(empty_response),
+        recognizer(response),
+    ]
+
+
 @pytest.mark.parametrize(
     "response,expected_result",
     [  # TODO: move to file
@@ -0,0 +1,115 @@
+from io import BytesIO
+from typing import Any, Dict
+
+import cv2
+import numpy as np
+import pytest
+from google.cloud import vision
+
+from document_recognition.backends import payload
+from document_recognition.backends.payload import PayloadPolicy
+from document_recognition.backends.synchronous.google_vision_backend import (
+    GoogleVisionBackend,
+)
+from document_recognition.image import DecodedImage, encode_image
+
+
+def noise(width: int, height: int) -> np.ndarray:
+    return np.random.default_rng(0).integers(0, 256, (height, width, 3), np.uint8)
+
+
+def decode(content: bytes) -> np.ndarray:
+    return cv2.imdecode(np.frombuffer(content, np.uint8), cv2.IMREAD_UNCHANGED)
+
+
+class FakeImageAnnotatorClient:
+    """Answers with one word covering the whole sent image."""
+
+    def __init__(self) -> None:
+        self.sent_shape = None
+
+    def annotate_image(self, request: Dict[str, Any]) -> vision.AnnotateImageResponse:
+        pixels = decode(request["image"]["content"])
+        self.sent_shape = pixels.shape
+        height, width = pixels.shape[:2]
+        corners = [(0, 0), (width, 0), (width, height), (0, height)]
+        return vision.AnnotateImageResponse(
+            text_annotations=[
+                {
+                    "description": "word",
+                    "bounding_poly": {
+                        "vertices": [{"x": x, "y": y} for x, y in corners]
+                    },
+                }
+            ],
+            full_text_annotation={"text": "word"},
+        )
+
+
+def test_payload_policy_sends_fitting_image_as_is():
+    content = encode_image(noise(64, 48)).tobytes()
+
+    prepared = PayloadPolicy(max_bytes=len(content)).prepare(BytesIO(content))
+
+    assert prepared.content == content
+    assert (prepared.scale_x, prepared.scale_y) == (1.0, 1.0)
+
+
+def test_payload_policy_limits_pixels_and_bytes():
+    policy = PayloadPolicy(
+        max_pixels=200 * 100, max_bytes=8000, codecs=[".webp", ".jpg"]
+    )
+
+    prepared = policy.prepare(DecodedImage(noise(800, 400), codec=".png"))
+
+    height, width = decode(prepared.content).shape[:2]
+    assert width * height <= 200 * 100
+    assert len(prepared.content) <= 8000
+    assert prepared.scale_x == pytest.approx(800 / width)
+    assert prepared.scale_y == pytest.approx(400 / height)
+
+
+def test_payload_policy_encodes_once_without_byte_budget(monkeypatch):
+    qualities = []
+
+    def counting_encode_image(pixels, codec=".jpg", quality=None):
+        qualities.append(quality)
+        return encode_image(pixels, codec, quality)
+
+    monkeypatch.setattr(payload, "encode_image", counting_encode_image)
+
+    PayloadPolicy(max_pixels=32 * 24, max_quality=90).prepare(
+        DecodedImage(noise(64, 48))
+    )
+
+    assert qualities == [90]
+
+
+def test_payload_policy_grayscale():
+    content = encode_image(noise(64, 48), ".png").tobytes()
+
+    prepared = PayloadPolicy(grayscale=True).prepare(BytesIO(content))
+
+    assert decode(prepared.content).ndim == 2
+
+
+def test_payload_policy_raises_if_budget_is_impossible():
+    with pytest.raises(ValueError):
+        PayloadPolicy(max_bytes=10).prepare(DecodedImage(noise(64, 48)))
+
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_backend_maps_vertices_to_original_image(columnar):
+    client = FakeImageAnnotatorClient()
+    backend = GoogleVisionBackend(
+        client, columnar=columnar, payload_policy=PayloadPolicy(max_pixels=300 * 150)
+    )
+
+    response = backend.recognize_document(DecodedImage(noise(1200, 600)))
+
+    assert client.sent_shape[:2] == (150, 300)
+    if columnar:
+        vertices = response.vertices[0].tolist()
+    else:
+        vertices = [[v.x, v.y] for v in response.text_annotations[0].vertices]
+    assert vertices == [[0, 0], [1200, 0], [1200, 600], [0, 600]]
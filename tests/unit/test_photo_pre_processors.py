@@ -1,4 +1,8 @@
+import asyncio
+import io
+import pickle
 import tempfile
+import threading
 from io import BytesIO
 from pathlib import Path
 
@@ -6,9 +10,14 @@ import cv2
 import numpy as np
 import pytest
 
+from document_recognition.photo_pre_processors.asynchronous import (
+    ProcessPoolPhotoPreProcessor,
+)
 from document_recognition.photo_pre_processors.synchronous.homography_cv2_ import (
     CV2HomographyPhotoPreProcessorByTemplate,
+    TemplateImage,
 )
+from document_recognition.photo_pre_processors.synchronous import homography_cv2_
 from document_recognition.template import Template
 from tests.conftest import BASE_DIR
 
@@ -57,3 +66,193 @@ def test_homography_cv2_photo_pre_processor_by_template_output(
         )
 
         assert destination.exists()
+
+
+def test_template_image_cache(
+    tmp_path: Path, template: Template, monkeypatch: pytest.MonkeyPatch
+):
+    process_cache = {}
+    monkeypatch.setattr(homography_cv2_, "_TEMPLATE_FEATURES", process_cache)
+    orb = cv2.ORB_create(nfeatures=5000)
+    template_image = TemplateImage(str(template.path), orb=orb, cache_dir=tmp_path)
+    kp, des = template_image.kp_and_des
+
+    assert len(list(tmp_path.glob("*.npy"))) == 2
+    # emulate a new process
+    process_cache.clear()
+
+    cached_template_image = TemplateImage(
+        str(template.path), orb=orb, cache_dir=tmp_path
+    )
+    cached_kp, cached_des = cached_template_image.kp_and_des
+
+    assert isinstance(cached_des, np.memmap)
+    assert np.array_equal(cached_des, des)
+    assert [k.pt for k in cached_kp] == pytest.approx([k.pt for k in kp])
+
+    other_template_image = TemplateImage(
+        str(template.path), orb=cv2.ORB_create(nfeatures=1000), cache_dir=tmp_path
+    )
+    assert other_template_image.cache_key != template_image.cache_key
+
+
+def test_homography_cv2_photo_pre_processor_coarse_to_fine(template: Template):
+    template_image = cv2.imread(str(template.path))
+    height, width = template_image.shape[:2]
+    corners = np.float32([[0, 0], [width, 0], [width, height], [0, height]])
+    photo_corners = corners * 4 + np.float32([[30, -20], [-40, 10], [20, 35], [0, 0]])
+    m = cv2.getPerspectiveTransform(corners, photo_corners + 100)
+    photo = cv2.warpPerspective(template_image, m, (width * 4 + 200, height * 4 + 200))
+
+    pre_processor = CV2HomographyPhotoPreProcessorByTemplate(
+        template=template, coarse_to_fine=True, refine=True
+    )
+    found = pre_processor._estimate_homography(photo).homography
+
+    mapped_corners = cv2.perspectiveTransform(
+        (photo_corners + 100).reshape(-1, 1, 2), found
+    )
+    assert np.abs(mapped_corners.reshape(-1, 2) - corners).max() < 5
+
+
+def test_homography_cv2_photo_pre_processor_adaptive_features(template: Template):
+    pre_processor = CV2HomographyPhotoPreProcessorByTemplate(
+        template=template, features_per_pixel=0.01
+    )
+
+    small = np.zeros((100, 100, 3), np.uint8)
+    large = np.zeros((3000, 4000, 3), np.uint8)
+
+    assert pre_processor._detector_for(small).getMaxFeatures() == 500
+    assert pre_processor._detector_for(large).getMaxFeatures() == 30000
+
+
+def test_homography_cv2_photo_pre_processor_pickle(
+    homography_cv2_pre_processor: CV2HomographyPhotoPreProcessorByTemplate,
+):
+    homography_cv2_pre_processor.warm_up()
+
+    restored = pickle.loads(pickle.dumps(homography_cv2_pre_processor))
+
+    assert "_keypoints_array_and_des" not in vars(restored.template_img)
+    assert restored.template_img.descriptors is (
+        homography_cv2_pre_processor.template_img.descriptors
+    )
+    assert isinstance(restored(image_path=str(IMAGES[0])), BytesIO)
+
+
+def test_process_pool_photo_pre_processor(
+    homography_cv2_pre_processor: CV2HomographyPhotoPreProcessorByTemplate,
+    template: Template,
+):
+    pre_processor = ProcessPoolPhotoPreProcessor(
+        homography_cv2_pre_processor, max_workers=1
+    )
+
+    read_threads = []
+
+    class File(io.FileIO):
+        def read(self, *args):
+            read_threads.append(threading.get_ident())
+            return super().read(*args)
+
+    async def main():
+        with File(IMAGES[0], "rb") as file:
+            return await asyncio.gather(
+                pre_processor(str(IMAGES[0])), pre_processor(file)
+            )
+
+    try:
+        results = asyncio.run(main())
+    finally:
+        pre_processor.shutdown()
+
+    # file objects are read off the event loop
+    assert read_threads and threading.get_ident() not in read_threads
+
+    for photo in results:
+        decode_img = cv2.imdecode(np.frombuffer(photo.getbuffer(), np.uint8), -1)
+        assert decode_img.shape[:2] == (template.size.height, template.size.width)
+
+
+def test_alignment_report(
+    homography_cv2_pre_processor: CV2HomographyPhotoPreProcessorByTemplate,
+):
+    img_scan, report = homography_cv2_pre_processor.align(str(IMAGES[0]))
+
+    assert img_scan.shape[:2] == (366, 617)
+    assert not report.skipped_features
+    assert not report.is_identity
+    assert 0 < report.inliers <= report.matches
+    assert 0 < report.inlier_ratio <= 1
+    assert report.reprojection_error < 5
+
+
+def test_already_aligned_scan(template: Template):
+    scan = cv2.resize(cv2.imread(str(template.path)), (1234, 732))
+
+    pre_processor = CV2HomographyPhotoPreProcessorByTemplate(template=template)
+    img_scan, report = pre_processor.align(BytesIO(cv2.imencode(".png", scan)[1]))
+    assert report.is_identity
+    assert not report.skipped_features
+    assert img_scan.shape[:2] == (366, 617)
+
+    pre_processor = CV2HomographyPhotoPreProcessorByTemplate(
+        template=template, precheck_threshold=0.9
+    )
+    img_scan, report = pre_processor.align(BytesIO(cv2.imencode(".png", scan)[1]))
+    assert report.is_identity
+    assert report.skipped_features
+    assert img_scan.shape[:2] == (366, 617)
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_homography_cv2_photo_pre_processor_process_many(
+    homography_cv2_pre_processor: CV2HomographyPhotoPreProcessorByTemplate,
+    template: Template,
+    ordered: bool,
+):
+    images = [str(IMAGES[0])] * 4
+
+    results = list(
+        homography_cv2_pre_processor.process_many(
+            iter(images), max_workers=2, ordered=ordered, max_in_flight=2
+        )
+    )
+
+    indexes = [index for index, _ in results]
+    if ordered:
+        assert indexes == [0, 1, 2, 3]
+    else:
+        assert sorted(indexes) == [0, 1, 2, 3]
+    expected = homography_cv2_pre_processor(str(IMAGES[0])).getvalue()
+    for _, photo in results:
+        assert photo.getvalue() == expected
+
+
+def test_homography_cv2_photo_pre_processor_process_many_limits_threads_per_photo(
+    homography_cv2_pre_processor: CV2HomographyPhotoPreProcessorByTemplate,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    align = homography_cv2_pre_processor.align
+    threads_in_align = []
+
+    def counting_align(image_path):
+        threads_in_align.append(cv2.getNumThreads())
+        return align(image_path)
+
+    monkeypatch.setattr(homography_cv2_pre_processor, "align", counting_align)
+    previous = cv2.getNumThreads()
+    cv2.setNumThreads(64)
+    try:
+        threads_between_results = [
+            cv2.getNumThreads()
+            for _ in homography_cv2_pre_processor.process_many(
+                [str(IMAGES[0])] * 3, max_workers=64, max_in_flight=1
+            )
+        ]
+    finally:
+        cv2.setNumThreads(previous)
+
+    assert threads_in_align == [1, 1, 1]
+    assert threads_between_results == [64, 64, 64]
@@ -0,0 +1,84 @@
+from io import BytesIO
+
+import pytest
+
+from document_recognition.backends import ApiResponse, BaseSyncBackend, PathLike
+from document_recognition.backends.corpus import CorpusReader, CorpusWriter
+from document_recognition.backends.synchronous.record_replay_backend import (
+    RecordingBackend,
+    ReplayBackend,
+)
+from document_recognition.sync_client import SyncDocumentRecognition
+from tests.conftest import RESPONSE
+
+
+class EchoBackend(BaseSyncBackend):
+    def recognize_document(self, image_path: PathLike) -> ApiResponse:
+        return ApiResponse(text_annotations=[], text=image_path.read().decode())
+
+    def recognize_document_from_url(self, url: str) -> ApiResponse:
+        return RESPONSE
+
+
+def test_record_and_replay(tmp_path):
+    path = tmp_path / "responses.corpus"
+    with CorpusWriter(path) as corpus:
+        recording = RecordingBackend(EchoBackend(), corpus)
+        for content in (b"first", b"second", b"first"):
+            recording.recognize_document(BytesIO(content))
+        recording.recognize_document_from_url("https://example.com/photo.jpg")
+
+    # appending to an existing corpus keeps the records
+    with CorpusWriter(path) as corpus:
+        RecordingBackend(EchoBackend(), corpus).recognize_document(BytesIO(b"third"))
+
+    with CorpusReader(path) as corpus:
+        replay = SyncDocumentRecognition(backend=ReplayBackend(corpus))
+        texts = [
+            replay.recognize_document(
+                BytesIO(content), recognizer=lambda response: response.text
+            )
+            for content in (b"third", b"first", b"second")
+        ]
+
+        assert texts == ["third", "first", "second"]
+        assert (
+            replay.backend.recognize_document_from_url("https://example.com/photo.jpg")
+            == RESPONSE
+        )
+        assert len(corpus) == 4
+        with pytest.raises(KeyError):
+            replay.backend.recognize_document(BytesIO(b"unknown"))
+
+
+def test_corpus_reader_ignores_cut_off_record(tmp_path):
+    path = tmp_path / "responses.corpus"
+    with CorpusWriter(path) as corpus:
+        recording = RecordingBackend(EchoBackend(), corpus)
+        recording.recognize_document(BytesIO(b"complete"))
+        recording.recognize_document(BytesIO(b"cut off"))
+    path.write_bytes(path.read_bytes()[:-5])
+
+    with CorpusReader(path) as corpus:
+        assert [response.text for _, response in corpus] == ["complete"]
+
+    (tmp_path / "other").write_bytes(b"not a corpus")
+    with pytest.raises(ValueError):
+        CorpusReader(tmp_path / "other")
+
+
+def test_corpus_writer_resumes_after_cut_off_record(tmp_path):
+    path = tmp_path / "responses.corpus"
+    with CorpusWriter(path) as corpus:
+        recording = RecordingBackend(EchoBackend(), corpus)
+        for content in (b"a", b"b"):
+            recording.recognize_document(BytesIO(content))
+    path.write_bytes(path.read_bytes()[:-5])
+
+    with CorpusWriter(path) as corpus:
+        recording = RecordingBackend(EchoBackend(), corpus)
+        for content in (b"c", b"d", b"e"):
+            recording.recognize_document(BytesIO(content))
+
+    with CorpusReader(path) as corpus:
+        assert [response.text for _, response in corpus] == ["a", "c", "d", "e"]
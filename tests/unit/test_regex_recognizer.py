@@ -0,0 +1,78 @@
+import dataclasses
+from typing import Optional
+
+import pytest
+
+from document_recognition.backends import ApiResponse
+from document_recognition.entities.passport import Passport
+from document_recognition.recognizers.synchronous.passport_recognizer import (
+    PassportRecognizerByRegularExpression,
+)
+from document_recognition.recognizers.synchronous.regex_recognizer import (
+    MultiPatternRecognizer,
+)
+
+PASSPORT_TEXT = """ФЕДЕРАЦИЯ
+230-024
+25.12.1994
+03 15 084752
+0310847524RUS9412251M<<<<<<<5150128230024<32
+"""
+
+
+@dataclasses.dataclass
+class Entity:
+    first: Optional[str] = None
+    second: Optional[str] = None
+    third: Optional[int] = None
+
+
+def test_multi_pattern_recognizer_matches_per_field_scans():
+    recognizer = MultiPatternRecognizer(
+        Passport, {"serial_number": r"\d{2}[ \t]+\d{2}", "number": r"\d{6}"}
+    )
+    response = ApiResponse(text_annotations=[], text=PASSPORT_TEXT)
+
+    assert recognizer(response) == Passport(serial_number="03 15", number="084752")
+    assert recognizer(response) == PassportRecognizerByRegularExpression()(response)
+
+
+@pytest.mark.parametrize(
+    "text,expected",
+    [
+        # the leftmost match wins
+        ("b1 a2", Entity(first="a2", second="b1")),
+        # at the same position the field declared first wins
+        ("ab", Entity(first="ab")),
+        # matches don't overlap
+        ("ab b", Entity(first="ab", second="b")),
+        # a found field doesn't hide the other fields
+        ("a1 a2 b3", Entity(first="a1", second="b3")),
+        ("", Entity()),
+    ],
+)
+def test_multi_pattern_recognizer_resolves_overlaps(text: str, expected: Entity):
+    recognizer = MultiPatternRecognizer(Entity, {"first": r"a\w?", "second": r"b\w?"})
+
+    assert recognizer.parse(text) == expected
+
+
+def test_multi_pattern_recognizer_post_processes_and_allows_named_groups():
+    recognizer = MultiPatternRecognizer(
+        Entity,
+        {"first": r"(?P<letter>[a-z])-", "third": r"\d+"},
+        post_processors={"third": int},
+    )
+
+    assert recognizer.parse("x- 42") == Entity(first="x-", third=42)
+
+
+def test_multi_pattern_recognizer_continues_after_empty_match():
+    recognizer = MultiPatternRecognizer(Entity, {"first": r"x*", "second": r"y"})
+
+    assert recognizer.parse("ay") == Entity(first="", second="y")
+
+
+def test_multi_pattern_recognizer_rejects_unknown_post_processors():
+    with pytest.raises(ValueError):
+        MultiPatternRecognizer(Entity, {"first": "a"}, post_processors={"second": str})
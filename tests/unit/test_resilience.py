@@ -0,0 +1,182 @@
+import asyncio
+from io import BytesIO
+from typing import List
+
+import pytest
+from google.api_core import exceptions
+
+from document_recognition.backends.asynchronous.resilience import (
+    AIMDLimiter,
+    LatencyTracker,
+    ResilientBackend,
+    TokenBucket,
+)
+from document_recognition.backends.base import ApiResponse, BaseAsyncBackend
+from tests.mocked_sync_client import MockedBackend
+
+
+class FakeBackend(BaseAsyncBackend):
+    """Answers with the image content after the next latency, raising the next errors first."""
+
+    def __init__(self, latencies=(), errors=()) -> None:
+        self.latencies = list(latencies)
+        self.errors = list(errors)
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.cancelled = 0
+
+    async def recognize_document(self, image_path) -> ApiResponse:
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latencies.pop(0) if self.latencies else 0.001)
+            if self.errors:
+                raise self.errors.pop(0)
+            return ApiResponse(text_annotations=[], text=image_path.read().decode())
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        finally:
+            self.in_flight -= 1
+
+
+def test_resilient_backend_retries_retryable_errors():
+    backend = FakeBackend(
+        errors=[
+            exceptions.ResourceExhausted("quota"),
+            exceptions.ServiceUnavailable(""),
+        ]
+    )
+    limiter = AIMDLimiter(8)
+    resilient = ResilientBackend(backend, limiter=limiter, base_delay=0.001)
+
+    response = asyncio.run(resilient.recognize_document(BytesIO(b"text")))
+
+    # the image is sent again on every attempt
+    assert response.text == "text"
+    assert backend.calls == 3
+    assert limiter.limit < 8
+
+
+def test_resilient_backend_raises_other_errors_at_once():
+    backend = FakeBackend(errors=[exceptions.InvalidArgument("bad image")])
+    resilient = ResilientBackend(backend, base_delay=0.001)
+
+    with pytest.raises(exceptions.InvalidArgument):
+        asyncio.run(resilient.recognize_document(BytesIO(b"text")))
+    assert backend.calls == 1
+
+
+def test_resilient_backend_retries_timeouts():
+    backend = FakeBackend(latencies=[1.0, 1.0])
+    resilient = ResilientBackend(
+        backend, timeout=0.02, max_attempts=2, base_delay=0.001
+    )
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(resilient.recognize_document(BytesIO(b"text")))
+    assert (backend.calls, backend.cancelled) == (2, 2)
+
+
+def test_resilient_backend_limits_concurrency():
+    backend = FakeBackend(latencies=[0.01] * 20)
+    resilient = ResilientBackend(backend, limiter=AIMDLimiter(3, max_limit=3))
+
+    async def main() -> List[ApiResponse]:
+        return await asyncio.gather(
+            *(resilient.recognize_document(BytesIO(b"%d" % i)) for i in range(20))
+        )
+
+    responses = asyncio.run(main())
+
+    assert [r.text for r in responses] == [str(i) for i in range(20)]
+    assert backend.max_in_flight == 3
+
+
+def test_aimd_limiter_adjusts_limit():
+    async def main() -> AIMDLimiter:
+        limiter = AIMDLimiter(4, min_limit=1, max_limit=8)
+        for _ in range(4):
+            await limiter.acquire()
+            limiter.release()
+        assert limiter.limit == pytest.approx(5, abs=0.2)
+        await limiter.acquire()
+        limiter.release(overloaded=True)
+        return limiter
+
+    assert int(asyncio.run(main()).limit) == 2
+
+
+def test_aimd_limiter_grants_slots_in_fifo_order():
+    async def main() -> List[str]:
+        limiter = AIMDLimiter(1, max_limit=1)
+        granted = []
+
+        async def request(name: str) -> None:
+            await limiter.acquire()
+            granted.append(name)
+            await asyncio.sleep(0)
+            limiter.release()
+
+        await limiter.acquire()
+        waiting = [asyncio.ensure_future(request(name)) for name in "BC"]
+        await asyncio.sleep(0)
+        # D is scheduled before the slot is released, but it arrives after B and C
+        waiting.append(asyncio.ensure_future(request("D")))
+        limiter.release()
+        await asyncio.gather(*waiting)
+        return granted
+
+    assert asyncio.run(main()) == ["B", "C", "D"]
+
+
+def test_aimd_limiter_keeps_limit_on_other_outcomes():
+    async def main() -> float:
+        limiter = AIMDLimiter(4)
+        await limiter.acquire()
+        limiter.release(succeeded=False)
+        return limiter.limit
+
+    assert asyncio.run(main()) == 4
+
+
+def test_token_bucket_delays_requests_over_rate():
+    now = [0.0]
+    bucket = TokenBucket(rate=10, burst=2, clock=lambda: now[0])
+
+    assert [bucket.reserve() for _ in range(4)] == pytest.approx([0, 0, 0.1, 0.2])
+    now[0] = 1.0
+    assert bucket.reserve() == 0
+
+
+def test_resilient_backend_hedges_slow_requests():
+    tracker = LatencyTracker(min_samples=1)
+    tracker.add(0.01)
+    # the first request hangs, the hedged one is fast
+    backend = FakeBackend(latencies=[5.0, 0.001])
+    resilient = ResilientBackend(backend, hedge_quantile=0.95, latency_tracker=tracker)
+
+    limit = resilient.limiter.limit
+
+    async def main() -> ApiResponse:
+        response = await resilient.recognize_document(BytesIO(b"text"))
+        await asyncio.sleep(0)  # let the losing request be cancelled
+        return response
+
+    response = asyncio.run(asyncio.wait_for(main(), 1.0))
+
+    assert response.text == "text"
+    assert (backend.calls, backend.cancelled) == (2, 1)
+    # only the winner counts as a success
+    assert resilient.limiter.limit == pytest.approx(limit + 1 / limit)
+    assert resilient.limiter.in_flight == 0
+
+
+def test_resilient_backend_wraps_sync_backends():
+    backend = MockedBackend()
+    response = backend.add_result(ApiResponse(text_annotations=[], text="text"))
+    resilient = ResilientBackend(backend)
+
+    assert asyncio.run(resilient.recognize_document(BytesIO(b"text"))) == response
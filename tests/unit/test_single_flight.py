@@ -0,0 +1,150 @@
+import asyncio
+from io import BytesIO
+
+import pytest
+
+from document_recognition.async_client import AsyncDocumentRecognition
+from document_recognition.backends import ApiResponse, BaseAsyncBackend, PathLike
+from document_recognition.backends.asynchronous.single_flight import (
+    SingleFlightBackend,
+)
+from document_recognition.utils import SingleFlight
+
+
+class SlowBackend(BaseAsyncBackend):
+    def __init__(self) -> None:
+        self.contents = []
+
+    async def recognize_document(self, image_path: PathLike) -> ApiResponse:
+        content = image_path.read()
+        self.contents.append(content)
+        await asyncio.sleep(0.05)
+        return ApiResponse(text_annotations=[], text=content.decode())
+
+    async def recognize_document_from_url(self, url: str) -> ApiResponse:
+        raise NotImplementedError
+
+
+def test_single_flight_shares_results_and_errors():
+    flights = SingleFlight()
+    calls = []
+
+    async def call(value):
+        calls.append(value)
+        await asyncio.sleep(0.01)
+        if value == "error":
+            raise ValueError(value)
+        return value
+
+    async def main():
+        results = await asyncio.gather(
+            flights.do("a", lambda: call("a")),
+            flights.do("a", lambda: call("a")),
+            flights.do("b", lambda: call("b")),
+            flights.do("e", lambda: call("error")),
+            flights.do("e", lambda: call("error")),
+            return_exceptions=True,
+        )
+        # finished calls are forgotten, so the next one runs again
+        return results, await flights.do("a", lambda: call("a")), len(flights)
+
+    results, again, in_flight = asyncio.run(main())
+
+    assert results[:3] == ["a", "a", "b"]
+    assert all(isinstance(error, ValueError) for error in results[3:])
+    assert again == "a"
+    assert calls == ["a", "b", "error", "a"]
+    assert in_flight == 0
+
+
+def test_single_flight_cancellation():
+    flights = SingleFlight()
+    started = []
+    cancelled = []
+
+    async def call():
+        started.append(True)
+        try:
+            await asyncio.sleep(0.05)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+        return "done"
+
+    async def main():
+        first = asyncio.ensure_future(flights.do("key", call))
+        second = asyncio.ensure_future(flights.do("key", call))
+        await asyncio.sleep(0)
+        # a cancelled waiter doesn't affect the others
+        first.cancel()
+        assert await second == "done"
+        with pytest.raises(asyncio.CancelledError):
+            await first
+
+        # the call is cancelled when nobody waits for it
+        third = asyncio.ensure_future(flights.do("key", call))
+        await asyncio.sleep(0.01)
+        third.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await third
+        await asyncio.sleep(0)
+
+    asyncio.run(main())
+
+    assert len(started) == 2
+    assert cancelled == [True]
+    assert len(flights) == 0
+
+
+def test_single_flight_backend_sends_same_image_once():
+    backend = SlowBackend()
+    single_flight_backend = SingleFlightBackend(backend)
+
+    async def main():
+        return await asyncio.gather(
+            *(
+                single_flight_backend.recognize_document(BytesIO(content))
+                for content in (b"photo", b"photo", b"other", b"photo")
+            )
+        )
+
+    responses = asyncio.run(main())
+
+    assert [response.text for response in responses] == [
+        "photo",
+        "photo",
+        "other",
+        "photo",
+    ]
+    assert sorted(backend.contents) == [b"other", b"photo"]
+
+
+def test_async_client_deduplicates_pipelines():
+    pre_processed = []
+
+    async def pre_processor(image_path: PathLike) -> PathLike:
+        pre_processed.append(image_path)
+        await asyncio.sleep(0.01)
+        return image_path
+
+    def recognizer(response: ApiResponse) -> str:
+        return response.text
+
+    backend = SlowBackend()
+    client = AsyncDocumentRecognition(backend, deduplicate=True)
+
+    async def main():
+        return await asyncio.gather(
+            *(
+                client.recognize_document(
+                    BytesIO(b"photo"),
+                    recognizer=recognizer,
+                    pre_processor_of_photo=pre_processor,
+                )
+                for _ in range(3)
+            )
+        )
+
+    assert asyncio.run(main()) == ["photo"] * 3
+    assert len(pre_processed) == 1
+    assert backend.contents == [b"photo"]
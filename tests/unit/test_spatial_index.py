@@ -0,0 +1,67 @@
+import random
+from typing import List, Tuple
+
+import numpy as np
+
+from document_recognition.recognizers.spatial_index import TemplateGridIndex
+from document_recognition.template import Coordinates, Data, Template
+
+
+def naive_assign(
+    objects: List[Data], text_infos: List[Tuple[str, float, float]]
+) -> List[List[str]]:
+    return [
+        [
+            text
+            for text, x_center, y_center in text_infos
+            if o.coordinates.x_min <= x_center <= o.coordinates.x_max
+            if o.coordinates.y_min <= y_center <= o.coordinates.y_max
+        ]
+        for o in objects
+    ]
+
+
+def test_grid_index_matches_naive_assignment(template: Template):
+    rng = random.Random(0)
+    objects = list(template.objects)
+    for i in range(30):
+        x, y = rng.randint(0, 600), rng.randint(0, 350)
+        coordinates = Coordinates(x, y, x + rng.randint(0, 100), y + rng.randint(0, 40))
+        objects.append(Data(name=f"field_{i}", type="str", coordinates=coordinates))
+    edges = [
+        value for o in objects for value in (o.coordinates.x_min, o.coordinates.x_max)
+    ]
+    text_infos = [
+        (
+            str(i),
+            rng.choice(edges) if i % 3 else rng.uniform(0, 700),
+            rng.uniform(0, 400),
+        )
+        for i in range(2000)
+    ]
+
+    index = TemplateGridIndex(objects)
+
+    assert index.assign(text_infos) == naive_assign(objects, text_infos)
+
+
+def test_grid_index_assigns_many_documents_at_once(template: Template):
+    rng = random.Random(1)
+    documents = [
+        [
+            (f"{d}-{i}", rng.uniform(0, 700), rng.uniform(0, 400))
+            for i in range(rng.randint(0, 300))
+        ]
+        for d in range(20)
+    ]
+    texts = [text for text_infos in documents for text, _, _ in text_infos]
+    centers = np.array(
+        [(x, y) for text_infos in documents for _, x, y in text_infos]
+    ).reshape(-1, 2)
+    offsets = np.cumsum([0] + [len(text_infos) for text_infos in documents])
+
+    index = TemplateGridIndex(template.objects)
+
+    assert index.assign_many(texts, centers, offsets) == [
+        index.assign(text_infos) for text_infos in documents
+    ]
@@ -0,0 +1,85 @@
+import dataclasses
+from datetime import datetime
+from typing import Optional
+
+import pytest
+
+from document_recognition.entities.drive_license import DriverLicense
+from document_recognition.recognizers.template_plan import (
+    FieldFailure,
+    TemplateParsePlan,
+    make_constructor,
+)
+from document_recognition.template import Template
+from document_recognition.utils import date_or_none, type_or_none
+
+
+@dataclasses.dataclass
+class Entity:
+    name: Optional[str] = None
+    code: Optional[int] = None
+
+
+@pytest.mark.parametrize(
+    "value", ["01.07.1980", "1.7.1980", "29.02.2000", "29.02.1900", "31.04.2020", ""]
+)
+def test_date_or_none_is_compatible_with_strptime(value: str):
+    try:
+        expected = datetime.strptime(value, "%d.%m.%Y")
+    except ValueError:
+        expected = None
+
+    assert date_or_none(value) == expected
+    assert type_or_none(value, "datetime") == expected
+
+
+def test_make_constructor_uses_the_last_repeated_name():
+    construct = make_constructor(Entity, ["name", "code", "name"])
+
+    assert construct(["first", 1, "last"]) == Entity(name="last", code=1)
+
+
+def test_make_constructor_passes_keywords_through_dict():
+    construct = make_constructor(dict, ["class", "code", "from"], {"flag": True})
+
+    assert construct(["A", 1, "B"]) == {
+        "class": "A",
+        "code": 1,
+        "from": "B",
+        "flag": True,
+    }
+
+
+def test_plan_applies_normalizers_of_the_entity(template: Template):
+    text_infos = [("ИВАН", 300, 120), ("МОСКВА.", 300, 300)]
+
+    document, _ = TemplateParsePlan(template, DriverLicense).execute(text_infos)
+    fields, _ = TemplateParsePlan(template, dict).execute(text_infos)
+
+    assert (document.name, document.abode) == ("Иван", "Москва")
+    # the same as normalizing in __post_init__
+    assert document == DriverLicense(**fields)
+
+
+def test_plan_reports_failures(template: Template):
+    plan = TemplateParsePlan(template, dict)
+
+    document, failures = plan.execute(
+        [("ИВАН", 300, 120), ("12.34.2000", 300, 155), ("12AB", 300, 270)]
+    )
+
+    assert document["name"] == "ИВАН"
+    assert document["birthday"] is None
+    assert document["code"] is None
+    assert document["abode"] == ""
+    assert failures == [
+        FieldFailure(name="birthday", type="datetime", text="12.34.2000"),
+        FieldFailure(name="code", type="int", text="12AB"),
+    ]
+
+
+def test_plan_rejects_unknown_types(template: Template):
+    template.objects[0].type = "bytes"
+
+    with pytest.raises(ValueError):
+        TemplateParsePlan(template, dict)
@@ -0,0 +1,43 @@
+import copy
+
+import pytest
+
+from document_recognition.backends import ApiResponse
+from document_recognition.entities.drive_license import DriverLicense
+from document_recognition.entities.passport import Passport
+from document_recognition.recognizers.synchronous.template_recognizer import (
+    TemplateRecognizer,
+)
+from document_recognition.template import Template
+from tests.conftest import PASSPORT_TEMPLATE, word
+
+
+def test_template_recognizer_builds_any_dataclass():
+    recognizer = TemplateRecognizer(PASSPORT_TEMPLATE, Passport)
+    response = ApiResponse(
+        text_annotations=[
+            word("03", 20, 25),
+            word("15", 60, 25),
+            word("084752", 200, 25),
+            word("RUS", 350, 150),
+        ]
+    )
+
+    assert recognizer(response) == Passport(serial_number="03 15", number="084752")
+    assert recognizer.recognize_batch([response]) == [recognizer(response)]
+
+
+def test_template_recognizer_shares_plans_of_equal_templates(template: Template):
+    first = TemplateRecognizer(template, DriverLicense)
+    second = TemplateRecognizer(copy.deepcopy(template), DriverLicense)
+    other_entity = TemplateRecognizer(PASSPORT_TEMPLATE, Passport)
+
+    assert first.plan is second.plan
+    assert first.plan is not other_entity.plan
+
+
+def test_template_recognizer_validates_field_names():
+    with pytest.raises(ValueError, match="serial_number"):
+        TemplateRecognizer(PASSPORT_TEMPLATE, DriverLicense)
+    with pytest.raises(TypeError):
+        TemplateRecognizer(PASSPORT_TEMPLATE, dict)
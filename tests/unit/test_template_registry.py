@@ -0,0 +1,64 @@
+from io import BytesIO
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pytest
+
+from document_recognition.photo_pre_processors.synchronous.homography_cv2_ import (
+    CV2HomographyPhotoPreProcessorByTemplate,
+)
+from document_recognition.photo_pre_processors.synchronous.template_registry_cv2_ import (
+    CV2TemplateRegistry,
+)
+from document_recognition.template import Size, Template
+from tests.conftest import BASE_DIR
+
+IMAGE = BASE_DIR / "data" / "user_licenses" / "1.jpg"
+
+
+@pytest.fixture()
+def other_template(tmp_path: Path) -> Template:
+    rng = np.random.default_rng(0)
+    image = np.full((300, 500, 3), 255, np.uint8)
+    for _ in range(60):
+        x, y = rng.integers(0, 450), rng.integers(0, 250)
+        color = tuple(int(c) for c in rng.integers(0, 200, 3))
+        cv2.rectangle(image, (x, y), (x + 40, y + 40), color, -1)
+        cv2.putText(image, "QZ", (x, y), cv2.FONT_HERSHEY_SIMPLEX, 1, color, 2)
+    path = tmp_path / "other.png"
+    cv2.imwrite(str(path), image)
+    return Template(path=path, size=Size(width=500, height=300, depth=3), objects=[])
+
+
+@pytest.fixture()
+def registry(template: Template, other_template: Template) -> CV2TemplateRegistry:
+    return CV2TemplateRegistry(
+        [
+            CV2HomographyPhotoPreProcessorByTemplate(template=other_template),
+            CV2HomographyPhotoPreProcessorByTemplate(template=template),
+        ]
+    )
+
+
+def test_registry_classifies_photo(registry: CV2TemplateRegistry, template: Template):
+    match = registry.classify(str(IMAGE))
+
+    assert match.index == 1
+    assert match.template is template
+    assert match.votes[1] > match.votes[0]
+
+
+def test_registry_aligns_photo_to_the_winner(
+    registry: CV2TemplateRegistry, other_template: Template
+):
+    image = cv2.imread(str(other_template.path))
+    photo = cv2.copyMakeBorder(image, 50, 50, 80, 80, cv2.BORDER_CONSTANT)
+
+    match, result = registry.pre_process(
+        BytesIO(cv2.imencode(".png", photo)[1].tobytes())
+    )
+
+    assert match.template is other_template
+    decode_img = cv2.imdecode(np.frombuffer(result.getbuffer(), np.uint8), -1)
+    assert decode_img.shape[:2] == (300, 500)